@@ -14,17 +14,115 @@ class Settings(BaseSettings):
     # Gemini API
     GEMINI_API_KEY: str
     GEMINI_MODEL: str = "gemini-2.5-pro"
+    GEMINI_FAST_MODEL: str = "gemini-2.5-flash"  # "gemini_fast" LLM backend
     GEMINI_EMBEDDING_MODEL: str = "models/embedding-001"
+    GEMINI_API_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
+    GEMINI_TIMEOUT_SECONDS: float = 60.0
+    GEMINI_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    GEMINI_MAX_CONNECTIONS: int = 100  # pooled keep-alive connections
+    GEMINI_GENERATION_CONCURRENCY: int = 16  # in-flight calls to GEMINI_MODEL
+    GEMINI_EMBEDDING_CONCURRENCY: int = 8  # in-flight calls to GEMINI_EMBEDDING_MODEL
+
+    # LLM backend routing
+    LLM_DEFAULT_BACKEND: str = "gemini"  # gemini | gemini_fast | local | stub
+    LLM_ROUTES: str = ""  # call_site=backend pairs, e.g. "study_guide.topics=gemini_fast,study_guide.segment=local"
+    LOCAL_LLM_MODEL: str = "google/flan-t5-base"  # Hugging Face model for the "local" backend
+    LOCAL_LLM_TASK: str = "text2text-generation"  # or text-generation for decoder-only models
+    LOCAL_LLM_MAX_NEW_TOKENS: int = 256
+
+    # Outbound LLM scheduler (calls to Gemini generation models)
+    LLM_REQUESTS_PER_MINUTE: int = 150  # 0 disables the limit
+    LLM_TOKENS_PER_MINUTE: int = 2000000  # prompt tokens; 0 disables the limit
+    LLM_MAX_IN_FLIGHT: int = 16
+    LLM_INTERACTIVE_CALL_SITES: str = "chat"  # served before all other call sites
+    LLM_RATE_LIMIT_BACKOFF_SECONDS: float = 5.0  # pause after a 429 without Retry-After
+
+    # LLM resilience (remote backends)
+    LLM_DEADLINE_SECONDS: float = 120.0  # per call, across all attempts
+    LLM_INTERACTIVE_DEADLINE_SECONDS: float = 30.0
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 0.5  # full-jitter exponential backoff
+    LLM_RETRY_MAX_SECONDS: float = 8.0
+    LLM_HEDGE_ENABLED: bool = False  # duplicate calls slower than the recent p95
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before failing fast
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    LLM_FALLBACK_CACHE_SIZE: int = 256  # last good responses served on failure; 0 disables
+    LLM_FALLBACK_BACKEND: str = ""  # e.g. local or stub; empty disables
+
+    # Embeddings
+    EMBEDDING_BACKEND: str = "gemini"  # gemini | local; changing it needs a reindex (new CHROMA_COLLECTION_NAME)
+    EMBEDDING_BATCH_SIZE: int = 100  # Gemini batchEmbedContents limit
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_CACHE_SIZE: int = 10000  # in-process LRU entries; 0 disables
+    EMBEDDING_CACHE_DB_PATH: str = "./embedding_cache.db"  # SQLite tier; empty disables
+    EMBEDDING_CACHE_DB_MAX_ENTRIES: int = 200000
+    LOCAL_EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"  # sentence-transformers model for the "local" backend
+    LOCAL_EMBEDDING_RUNTIME: str = "torch"  # torch | onnx | openvino (sentence-transformers[onnx] / [openvino])
+    LOCAL_EMBEDDING_ONNX_FILE: str = ""  # e.g. onnx/model_qint8_avx512_vnni.onnx for a quantized export
+    LOCAL_EMBEDDING_QUANTIZE: bool = False  # dynamic int8 quantization (torch runtime)
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 32
+    LOCAL_EMBEDDING_QUERY_PREFIX: str = "Represent this sentence for searching relevant passages: "
+    LOCAL_EMBEDDING_DOCUMENT_PREFIX: str = ""
+    LOCAL_EMBEDDING_WARM_UP: bool = True  # load the model on startup
 
     # ChromaDB
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
-    CHROMA_COLLECTION_NAME: str = "eduassist_documents"
+    CHROMA_COLLECTION_NAME: str = "eduassist_documents"  # prefix of the per-course collections
+    CHROMA_WARM_START: bool = False  # load every course's index on startup
 
     # RAG Settings
     RAG_CHUNK_SIZE: int = 512
     RAG_CHUNK_OVERLAP: int = 50
+    RAG_CHUNK_STRATEGY: str = "window"  # window | sentence | heading | token
+    RAG_CHUNK_MAX_TOKENS: int = 512  # budget for the token strategy
     RAG_TOP_K: int = 5
     RAG_CONFIDENCE_THRESHOLD: float = 0.6
+    RAG_INGEST_BATCH_SIZE: int = 500  # chunks per ChromaDB add() call
+    RAG_RETRIEVAL_MODE: str = "hybrid"  # dense | hybrid (dense + BM25, fused by RRF)
+    RAG_HYBRID_CANDIDATES: int = 20  # depth of each ranking before fusion
+    RAG_HYBRID_DENSE_WEIGHT: float = 1.0
+    RAG_HYBRID_LEXICAL_WEIGHT: float = 1.0
+    RAG_HYBRID_RRF_K: int = 60
+    RAG_HYBRID_BUDGET_MS: float = 100.0  # BM25 leg; dense-only results if exceeded
+    RAG_BM25_K1: float = 1.5
+    RAG_BM25_B: float = 0.75
+    RAG_RERANK_ENABLED: bool = False  # rerank a larger pool before building the chat prompt
+    RAG_RERANK_BACKEND: str = "cross-encoder"  # cross-encoder | overlap
+    RAG_RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RAG_RERANK_CANDIDATES: int = 20
+    RAG_RERANK_TOP_N: int = 3
+    RAG_CONTEXT_TOKEN_BUDGET: int = 1500  # context tokens kept after reranking
+
+    # Semantic answer cache for chat (per course)
+    ANSWER_CACHE_SIMILARITY: float = 0.95  # min cosine similarity to reuse an answer
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_MAX_ENTRIES: int = 500  # per course; 0 disables
+
+    # Study guides
+    STUDY_GUIDE_SEGMENT_CONCURRENCY: int = 4  # segments analyzed at once per guide
+    YOUTUBE_MAX_WORKERS: int = 8  # threads for blocking pytube/transcript calls
+    YOUTUBE_TIMEOUT_SECONDS: float = 20.0
+    YOUTUBE_CACHE_DB_PATH: str = "./youtube_cache.db"  # empty keeps the cache in memory
+    YOUTUBE_METADATA_TTL_SECONDS: float = 86400.0  # 1 day
+    YOUTUBE_CAPTIONS_TTL_SECONDS: float = 21600.0  # 6 hours
+    YOUTUBE_TRANSCRIPT_TTL_SECONDS: float = 604800.0  # 7 days
+
+    # PDF Parsing
+    PDF_PARSE_WORKERS: int = 0  # worker processes; 0 = one per CPU core
+    PDF_PARSE_SHARD_PAGES: int = 20  # minimum pages per parallel shard
+
+    # Ingestion job queue
+    INGEST_WORKER_CONCURRENCY: int = 2
+    INGEST_MAX_ATTEMPTS: int = 3
+    INGEST_RETRY_BASE_SECONDS: float = 30.0
+    INGEST_POLL_INTERVAL_SECONDS: float = 5.0
+    INGEST_JOB_LEASE_SECONDS: float = 600.0
+
+    # Extracted text cache (empty directory disables it)
+    TEXT_CACHE_DIR: str = "./text_cache"
+    TEXT_CACHE_MAX_BYTES: int = 536870912  # 512MB
 
     # File Upload
     UPLOAD_DIR: str = "uploads"
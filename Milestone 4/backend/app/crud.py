@@ -2,11 +2,12 @@
 Database CRUD operations
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 from passlib.context import CryptContext
 from app.models import SlideDeck, Slide
 from app.schemas import SlideDeckStatus
-from typing import List, Optional
+from typing import List, Optional, Set
+from datetime import datetime
 
 from . import models, schemas
 
@@ -64,7 +65,8 @@ async def create_document(
     file_path: str,
     file_type: str,
     file_size: int,
-    user_id: int
+    user_id: int,
+    content_hash: Optional[str] = None
 ) -> models.Document:
     """Create a new document"""
     db_document = models.Document(
@@ -72,6 +74,7 @@ async def create_document(
         file_path=file_path,
         file_type=file_type,
         file_size=file_size,
+        content_hash=content_hash,
         course_id=document.course_id,
         uploaded_by=user_id
     )
@@ -99,6 +102,85 @@ async def update_document_processed(
     return document
 
 
+async def replace_document_file(
+    db: AsyncSession,
+    document_id: int,
+    file_path: str,
+    file_type: str,
+    file_size: int,
+    content_hash: str,
+    title: Optional[str] = None
+) -> models.Document:
+    """Point a document at new file content; it stays unprocessed until re-indexed"""
+    result = await db.execute(select(models.Document).where(models.Document.id == document_id))
+    document = result.scalar_one_or_none()
+
+    if document:
+        document.file_path = file_path
+        document.file_type = file_type
+        document.file_size = file_size
+        document.content_hash = content_hash
+        document.processed = False
+        if title:
+            document.title = title
+        await db.commit()
+        await db.refresh(document)
+
+    return document
+
+
+async def get_embedding_ids_in_use(
+    db: AsyncSession,
+    course_id: int,
+    exclude_document_id: int
+) -> Set[str]:
+    """Chunk ids referenced by the other documents of a course"""
+    result = await db.execute(
+        select(models.Document.embedding_ids).where(
+            models.Document.course_id == course_id,
+            models.Document.id != exclude_document_id,
+            models.Document.is_deleted == False
+        )
+    )
+    return {chunk_id for ids in result.scalars() if ids for chunk_id in ids}
+
+
+async def get_document(db: AsyncSession, document_id: int) -> Optional[models.Document]:
+    """Get document by ID"""
+    result = await db.execute(
+        select(models.Document).where(
+            models.Document.id == document_id,
+            models.Document.is_deleted == False
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_document_by_hash(
+    db: AsyncSession,
+    content_hash: str,
+    course_id: int,
+    exclude_document_id: Optional[int] = None
+) -> Optional[models.Document]:
+    """
+    Get a document with identical content in a course
+
+    Processed documents are preferred; otherwise the earliest upload still
+    being ingested is returned.
+    """
+    query = select(models.Document).where(
+        models.Document.content_hash == content_hash,
+        models.Document.course_id == course_id,
+        models.Document.is_deleted == False
+    )
+    if exclude_document_id is not None:
+        query = query.where(models.Document.id != exclude_document_id)
+    result = await db.execute(
+        query.order_by(models.Document.processed.desc(), models.Document.id).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
 async def get_documents(db: AsyncSession, course_id: Optional[int] = None) -> List[models.Document]:
     """Get documents, optionally filtered by course"""
     query = select(models.Document).where(models.Document.is_deleted == False)
@@ -108,6 +190,52 @@ async def get_documents(db: AsyncSession, course_id: Optional[int] = None) -> Li
     return result.scalars().all()
 
 
+# Ingestion Job CRUD
+async def create_ingestion_job(
+    db: AsyncSession,
+    document_id: int,
+    max_attempts: int
+) -> models.IngestionJob:
+    """Queue a document for ingestion"""
+    db_job = models.IngestionJob(
+        document_id=document_id,
+        max_attempts=max_attempts
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+
+async def get_latest_ingestion_job(db: AsyncSession, document_id: int) -> Optional[models.IngestionJob]:
+    """Get the most recent ingestion job for a document"""
+    result = await db.execute(
+        select(models.IngestionJob)
+        .where(models.IngestionJob.document_id == document_id)
+        .order_by(models.IngestionJob.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_course_index_version(db: AsyncSession, course_id: int) -> Optional[datetime]:
+    """
+    When ingestion last completed for a course's documents
+
+    Changes whenever the course's indexed content changes, in any process,
+    so per-process caches can compare it to detect stale entries.
+    """
+    result = await db.execute(
+        select(func.max(models.IngestionJob.finished_at))
+        .join(models.Document, models.Document.id == models.IngestionJob.document_id)
+        .where(
+            models.Document.course_id == course_id,
+            models.IngestionJob.status == models.IngestionJobStatus.COMPLETED
+        )
+    )
+    return result.scalar_one_or_none()
+
+
 # Conversation CRUD
 async def create_conversation(
     db: AsyncSession,
@@ -5,6 +5,7 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import jwt
@@ -13,6 +14,16 @@ from .config import settings
 from .database import init_db, get_db
 from . import crud, schemas
 from .routers import knowledge, study_guide, assessment, slide_deck
+from .services.answer_cache import answer_cache
+from .services.gemini_client import gemini_client
+from .services.llm_resilience import llm_resilience
+from .services.llm_scheduler import llm_scheduler
+from .services.metrics import metrics
+from .services.pdf_parsing_service import pdf_parsing_service
+from .services.rag_service import rag_service
+from .services.ingestion_queue import ingestion_queue
+from .services.async_youtube_service import async_youtube_service
+from .services.youtube_service import youtube_service
 from .routers.slide_deck import router as slide_deck_router
 from app.routers.workflow_agent import router as workflow_agent_router
 from app.routers.feedback import router as feedback_router
@@ -25,9 +36,25 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting EduAssist API...")
     await init_db()
     print("✅ Database initialized")
+    if gemini_client.local_embeddings is not None and settings.LOCAL_EMBEDDING_WARM_UP:
+        seconds = await asyncio.to_thread(gemini_client.local_embeddings.warm_up)
+        print(f"✅ Local embedding model {settings.LOCAL_EMBEDDING_MODEL} loaded in {seconds:.1f}s")
+    if settings.CHROMA_WARM_START:
+        warm = await asyncio.to_thread(rag_service.warm_up)
+        print(
+            f"✅ Vector store warmed: {warm['collections']} courses, "
+            f"{warm['chunks']} chunks in {warm['seconds']}s"
+        )
+    ingestion_queue.start()
     yield
     # Shutdown
     print("👋 Shutting down EduAssist API...")
+    await ingestion_queue.stop()
+    pdf_parsing_service.shutdown()
+    async_youtube_service.shutdown()
+    await gemini_client.transport.aclose()
+    gemini_client.embedding_cache.close()
+    youtube_service.cache.close()
 
 
 # Create FastAPI app
@@ -144,3 +171,17 @@ async def health_check():
             "rag": "operational"
         }
     }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Cache hit/miss counters, LLM queue depths and latency percentiles"""
+    return {
+        "embedding_cache": gemini_client.embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "youtube_cache": youtube_service.cache.stats(),
+        "retrieval": rag_service.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_resilience": llm_resilience.stats(),
+        "latency": metrics.snapshot()
+    }
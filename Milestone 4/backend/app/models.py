@@ -68,6 +68,7 @@ class Document(Base):
     file_path = Column(String(500), nullable=False)
     file_type = Column(String(50), nullable=False)
     file_size = Column(Integer, nullable=False)
+    content_hash = Column(String(64), index=True, nullable=True)  # SHA-256 of file bytes
 
     # Processing status
     processed = Column(Boolean, default=False)
@@ -89,6 +90,42 @@ class Document(Base):
     uploader = relationship("User", back_populates="documents")
 
 
+class IngestionJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class IngestionJob(Base):
+    """Queued parse/embed/index job for an uploaded document"""
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+
+    # Queue state
+    status = Column(Enum(IngestionJobStatus), default=IngestionJobStatus.QUEUED, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    next_run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # RUNNING jobs past this are reclaimed
+    error = Column(Text, nullable=True)
+
+    # Progress
+    pages_parsed = Column(Integer, default=0)
+    chunks_total = Column(Integer, default=0)
+    chunks_embedded = Column(Integer, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    document = relationship("Document", backref="ingestion_jobs")
+
+
 class Conversation(Base):
     """Conversation between student and AI assistant"""
     __tablename__ = "conversations"
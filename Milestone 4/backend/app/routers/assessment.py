@@ -4,13 +4,14 @@ app/routers/assessment.py
 """
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from ..database import get_db
 from ..dependencies import get_current_user
 from .. import crud, schemas, models
-from ..services.assessment_service import assessment_service
+from ..services.assessment_service import assessment_service, REFERENCE_CONTEXT_CHARS
+from ..services.pdf_parsing_service import pdf_parsing_service
 
 router = APIRouter(prefix="/assessments", tags=["Assessment Generator"])
 
@@ -24,7 +25,8 @@ async def process_assessment_generation(
     question_types: List[str],
     total_questions: int,
     reference_document_ids: List[int],
-    db: AsyncSession
+    db: AsyncSession,
+    course_id: Optional[int] = None
 ):
     """Background task to generate assessment"""
     try:
@@ -34,13 +36,15 @@ async def process_assessment_generation(
             for doc_id in reference_document_ids:
                 doc = await crud.get_document(db, doc_id)
                 if doc and doc.file_path:
-                    # Read document
+                    # Read document (only as many pages as the prompt can use)
                     try:
-                        with open(doc.file_path, 'rb') as f:
-                            content = f.read()
-                            if doc.file_type == 'application/pdf':
-                                text = assessment_service.extract_text_from_pdf(content)
-                                reference_materials.append(text)
+                        if doc.file_type == 'application/pdf':
+                            text = await pdf_parsing_service.extract_text(
+                                doc.file_path,
+                                doc.file_type,
+                                max_chars=REFERENCE_CONTEXT_CHARS
+                            )
+                            reference_materials.append(text)
                     except Exception as e:
                         print(f"Error reading document {doc_id}: {e}")
 
@@ -50,7 +54,8 @@ async def process_assessment_generation(
             difficulty_level=difficulty_level,
             question_types=question_types,
             total_questions=total_questions,
-            reference_materials=reference_materials
+            reference_materials=reference_materials,
+            course_id=course_id
         )
 
         # Save questions
@@ -118,7 +123,8 @@ async def create_assessment(
         question_types=[qt.value for qt in assessment.question_types],
         total_questions=assessment.total_questions,
         reference_document_ids=assessment.reference_document_ids,
-        db=db
+        db=db,
+        course_id=assessment.course_id
     )
 
     return db_assessment
@@ -2,17 +2,27 @@
 Knowledge Assistant API Endpoints
 """
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict, List
 import os
+import asyncio
+import json
+import time
 import aiofiles
 from datetime import datetime
 
-from ..database import get_db
+from ..database import AsyncSessionLocal, get_db
 from ..dependencies import get_current_user, validate_file_upload
 from .. import crud, schemas, models
+from ..services.answer_cache import answer_cache
 from ..services.rag_service import rag_service
+from ..services.reranker import rerank_stage
+from ..services.ingestion_queue import ingestion_queue
+from ..services.text_cache import hash_bytes
 from ..services.gemini_client import gemini_client
+from ..services.llm_backend import llm_router
+from ..services.metrics import metrics
 from ..config import settings
 
 router = APIRouter(prefix="/knowledge", tags=["Knowledge Assistant"])
@@ -29,7 +39,15 @@ async def upload_document(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Upload and process a document for RAG knowledge base
+    Upload a document for the RAG knowledge base
+
+    The file is stored and queued for ingestion; the response returns
+    immediately with processed=false. Re-uploading one of your own files
+    for the course returns the existing document. A file another user
+    already uploaded gets its own document that reuses the stored chunks:
+    it is processed at once if the other copy is indexed, otherwise its
+    job waits for that ingestion to finish. Chunks shared with other
+    documents or courses reuse their stored embeddings.
     """
     # Validate file
     validate_file_upload(file)
@@ -45,6 +63,12 @@ async def upload_document(
             detail=f"File too large. Max size: {settings.MAX_FILE_SIZE} bytes"
         )
 
+    # Identical file already uploaded for this course
+    content_hash = await asyncio.to_thread(hash_bytes, content)
+    existing = await crud.get_document_by_hash(db=db, content_hash=content_hash, course_id=course_id)
+    if existing and existing.uploaded_by == current_user.id:
+        return existing
+
     # Save file
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     file_path = os.path.join(
@@ -65,27 +89,92 @@ async def upload_document(
         file_path=file_path,
         file_type=file.content_type,
         file_size=file_size,
-        user_id=current_user.id
+        user_id=current_user.id,
+        content_hash=content_hash
     )
 
-    # Process document with RAG
-    try:
-        embedding_ids = await rag_service.process_document(
-            file_content=content,
-            file_type=file.content_type,
+    # Another user's copy is already indexed: share its chunks
+    if existing and existing.processed:
+        return await crud.update_document_processed(
+            db=db,
             document_id=document.id,
-            course_id=course_id
+            embedding_ids=list(existing.embedding_ids or [])
         )
 
-        # Update document as processed
-        document = await crud.update_document_processed(
-            db=db,
-            document_id=document.id,
-            embedding_ids=embedding_ids
+    # Parse, embed and index in the background; poll /documents/{id}/status
+    await ingestion_queue.enqueue(db=db, document_id=document.id)
+
+    return document
+
+
+@router.put("/documents/{document_id}", response_model=schemas.DocumentResponse)
+async def update_document(
+    document_id: int,
+    file: UploadFile = File(...),
+    title: str = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Replace a document's file and re-index it incrementally
+
+    Re-indexing diffs the new chunks against the stored chunk hashes: only
+    new or changed chunks are embedded, chunks that disappeared are deleted
+    from the vector store, and embedding_ids is replaced when the job
+    completes. Poll /documents/{id}/status for progress.
+    """
+    document = await crud.get_document(db=db, document_id=document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if document.uploaded_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    job = await crud.get_latest_ingestion_job(db=db, document_id=document_id)
+    if job and job.status in (models.IngestionJobStatus.QUEUED, models.IngestionJobStatus.RUNNING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document is still being indexed"
         )
-    except Exception as e:
-        print(f"Error processing document: {e}")
-        # Document created but not processed
+
+    validate_file_upload(file)
+    content = await file.read()
+    file_size = len(content)
+    if file_size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max size: {settings.MAX_FILE_SIZE} bytes"
+        )
+
+    # Same bytes as the current version: nothing to re-index
+    content_hash = await asyncio.to_thread(hash_bytes, content)
+    if content_hash == document.content_hash:
+        return document
+
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(
+        settings.UPLOAD_DIR,
+        f"{datetime.now().timestamp()}_{file.filename}"
+    )
+    async with aiofiles.open(file_path, 'wb') as f:
+        await f.write(content)
+
+    old_file_path = document.file_path
+    document = await crud.replace_document_file(
+        db=db,
+        document_id=document_id,
+        file_path=file_path,
+        file_type=file.content_type,
+        file_size=file_size,
+        content_hash=content_hash,
+        title=title
+    )
+    await ingestion_queue.enqueue(db=db, document_id=document.id)
+
+    try:
+        os.remove(old_file_path)
+    except OSError:
+        pass
 
     return document
 
@@ -101,6 +190,25 @@ async def list_documents(
     return documents
 
 
+@router.get("/documents/{document_id}/status", response_model=schemas.DocumentStatusResponse)
+async def get_document_status(
+    document_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Get ingestion status and progress for a document"""
+    document = await crud.get_document(db=db, document_id=document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    job = await crud.get_latest_ingestion_job(db=db, document_id=document_id)
+    return schemas.DocumentStatusResponse(
+        document_id=document.id,
+        processed=document.processed,
+        job=job
+    )
+
+
 # ============ Conversation Management ============
 
 @router.post("/conversations", response_model=schemas.ConversationResponse, status_code=status.HTTP_201_CREATED)
@@ -138,50 +246,52 @@ async def get_conversation(
 
 # ============ Chat / Query ============
 
-@router.post("/chat", response_model=schemas.ChatQueryResponse)
-async def chat_query(
-    query: schemas.ChatQueryRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
-):
-    """
-    Process a chat query using RAG
+CHAT_SYSTEM_INSTRUCTION = """You are an educational AI assistant. Answer the student's question based on the provided context from course materials. 
+If the context doesn't contain enough information, say so clearly. Always be helpful and educational."""
 
-    Steps:
-    1. Query knowledge base for relevant context
-    2. Generate response with Gemini
-    3. Save message to conversation
-    4. Return response with confidence score
-    """
-    # Get or create conversation
+CHAT_ERROR_RESPONSE = "I apologize, but I encountered an error processing your question. Please try again or contact your TA."
+
+
+async def _get_or_create_conversation(
+    query: schemas.ChatQueryRequest,
+    db: AsyncSession,
+    current_user: models.User
+) -> models.Conversation:
     if query.conversation_id:
         conversation = await crud.get_conversation(db=db, conversation_id=query.conversation_id)
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
-    else:
-        conversation = await crud.create_conversation(
-            db=db,
-            course_id=query.course_id,
-            student_id=current_user.id
-        )
-
-    # Save user message
-    await crud.create_message(
+        return conversation
+    return await crud.create_conversation(
         db=db,
-        conversation_id=conversation.id,
-        sender_type=models.SenderType.STUDENT,
-        content=query.query
-    )
-
-    # Query RAG knowledge base
-    relevant_docs = await rag_service.query(
-        query_text=query.query,
         course_id=query.course_id,
-        top_k=settings.RAG_TOP_K
+        student_id=current_user.id
     )
 
+
+async def _build_rag_prompt(query: schemas.ChatQueryRequest, query_embedding: List[float]) -> tuple:
+    """Retrieve context and build the prompt; returns (prompt, confidence_score, sources)"""
+    if settings.RAG_RERANK_ENABLED:
+        # Rerank a larger pool and keep the best chunks within the token budget
+        candidates = await rag_service.query(
+            query_text=query.query,
+            course_id=query.course_id,
+            top_k=settings.RAG_RERANK_CANDIDATES,
+            query_embedding=query_embedding
+        )
+        relevant_docs = await rerank_stage.rerank(query.query, candidates)
+        context_docs = relevant_docs
+    else:
+        relevant_docs = await rag_service.query(
+            query_text=query.query,
+            course_id=query.course_id,
+            top_k=settings.RAG_TOP_K,
+            query_embedding=query_embedding
+        )
+        context_docs = relevant_docs[:3]
+
     # Build context from relevant documents
-    context = "\n\n".join([doc["text"] for doc in relevant_docs[:3]])
+    context = "\n\n".join([doc["text"] for doc in context_docs])
 
     # Calculate confidence (average similarity from top results)
     if relevant_docs:
@@ -191,10 +301,6 @@ async def chat_query(
     else:
         confidence_score = 0.0
 
-    # Generate response with Gemini
-    system_instruction = """You are an educational AI assistant. Answer the student's question based on the provided context from course materials. 
-If the context doesn't contain enough information, say so clearly. Always be helpful and educational."""
-
     prompt = f"""Context from course materials:
 {context}
 
@@ -202,15 +308,71 @@ Student Question: {query.query}
 
 Please provide a clear, educational answer based on the context above."""
 
-    try:
-        ai_response = await gemini_client.generate_completion(
-            prompt=prompt,
-            system_instruction=system_instruction,
-            temperature=0.7
-        )
-    except Exception as e:
-        ai_response = f"I apologize, but I encountered an error processing your question. Please try again or contact your TA."
-        confidence_score = 0.0
+    sources = {"documents": [doc["metadata"] for doc in context_docs]}
+    return prompt, confidence_score, sources
+
+
+@router.post("/chat", response_model=schemas.ChatQueryResponse)
+async def chat_query(
+    query: schemas.ChatQueryRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Process a chat query using RAG
+
+    Steps:
+    1. Reuse a cached answer to a near-identical question in the course
+    2. Otherwise query knowledge base for relevant context
+    3. Generate response with the chat LLM backend
+    4. Save message to conversation
+    5. Return response with confidence score
+    """
+    conversation = await _get_or_create_conversation(query, db, current_user)
+
+    # Save user message
+    await crud.create_message(
+        db=db,
+        conversation_id=conversation.id,
+        sender_type=models.SenderType.STUDENT,
+        content=query.query
+    )
+
+    # Embed once: used for the answer cache and the vector search
+    query_embedding = (await gemini_client.generate_embeddings(
+        [query.query],
+        task_type="retrieval_query"
+    ))[0]
+
+    # Answers cached before the course was last re-indexed (by any instance) are stale
+    index_version = await crud.get_course_index_version(db=db, course_id=query.course_id)
+    cached = answer_cache.lookup(query.course_id, query_embedding, version=index_version)
+    if cached:
+        ai_response, confidence_score, sources = cached.answer, cached.confidence_score, cached.sources
+    else:
+        prompt, confidence_score, sources = await _build_rag_prompt(query, query_embedding)
+
+        # Generate response with the backend routed to "chat"
+        try:
+            ai_response = await llm_router.generate(
+                "chat",
+                prompt=prompt,
+                system_instruction=CHAT_SYSTEM_INSTRUCTION,
+                temperature=0.7,
+                course_id=query.course_id
+            )
+            answer_cache.store(
+                course_id=query.course_id,
+                query_text=query.query,
+                embedding=query_embedding,
+                answer=ai_response,
+                confidence_score=confidence_score,
+                sources=sources,
+                version=index_version
+            )
+        except Exception as e:
+            ai_response = CHAT_ERROR_RESPONSE
+            confidence_score = 0.0
 
     # Save AI response
     ai_message = await crud.create_message(
@@ -219,7 +381,7 @@ Please provide a clear, educational answer based on the context above."""
         sender_type=models.SenderType.AI,
         content=ai_response,
         confidence_score=confidence_score,
-        sources={"documents": [doc["metadata"] for doc in relevant_docs[:3]]}
+        sources=sources
     )
 
     # Determine if should escalate
@@ -230,3 +392,133 @@ Please provide a clear, educational answer based on the context above."""
         should_escalate=should_escalate,
         confidence_score=confidence_score
     )
+
+
+def _sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_query_stream(
+    query: schemas.ChatQueryRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Streaming variant of /chat using Server-Sent Events
+
+    Events:
+    - start: {"conversation_id"}
+    - token: {"text"} for each piece of the answer as the model produces it
+    - done: {"message_id", "confidence_score", "should_escalate", "sources"}
+      once the AI message has been saved
+    - error: {"detail"} if generation failed; the fallback answer is saved
+
+    If the client disconnects, the answer generated so far (or the
+    fallback answer) is still saved to the conversation.
+    """
+    started = time.perf_counter()
+    conversation = await _get_or_create_conversation(query, db, current_user)
+    await crud.create_message(
+        db=db,
+        conversation_id=conversation.id,
+        sender_type=models.SenderType.STUDENT,
+        content=query.query
+    )
+
+    query_embedding = (await gemini_client.generate_embeddings(
+        [query.query],
+        task_type="retrieval_query"
+    ))[0]
+    # Answers cached before the course was last re-indexed (by any instance) are stale
+    index_version = await crud.get_course_index_version(db=db, course_id=query.course_id)
+    cached = answer_cache.lookup(query.course_id, query_embedding, version=index_version)
+    if cached:
+        prompt, confidence_score, sources = None, cached.confidence_score, cached.sources
+    else:
+        prompt, confidence_score, sources = await _build_rag_prompt(query, query_embedding)
+    conversation_id = conversation.id
+
+    async def save_answer(ai_response: str, confidence_score: float) -> models.Message:
+        # The request's session may already be closed once streaming starts
+        async with AsyncSessionLocal() as stream_db:
+            return await crud.create_message(
+                db=stream_db,
+                conversation_id=conversation_id,
+                sender_type=models.SenderType.AI,
+                content=ai_response,
+                confidence_score=confidence_score,
+                sources=sources
+            )
+
+    async def events():
+        nonlocal confidence_score
+        pieces = []
+        failed = False
+        saved = False
+        try:
+            yield _sse_event("start", {"conversation_id": conversation_id})
+
+            if cached:
+                pieces.append(cached.answer)
+                metrics.observe("chat_stream_ttft", time.perf_counter() - started)
+                yield _sse_event("token", {"text": cached.answer})
+            else:
+                try:
+                    async for text in llm_router.stream(
+                        "chat",
+                        prompt=prompt,
+                        system_instruction=CHAT_SYSTEM_INSTRUCTION,
+                        temperature=0.7,
+                        course_id=query.course_id
+                    ):
+                        if not pieces:
+                            metrics.observe("chat_stream_ttft", time.perf_counter() - started)
+                        pieces.append(text)
+                        yield _sse_event("token", {"text": text})
+                except Exception as e:
+                    print(f"❌ Streaming chat error: {e}")
+                    failed = True
+                    yield _sse_event("error", {"detail": CHAT_ERROR_RESPONSE})
+
+            ai_response = CHAT_ERROR_RESPONSE if failed else "".join(pieces)
+            if failed:
+                confidence_score = 0.0
+            elif not cached:
+                answer_cache.store(
+                    course_id=query.course_id,
+                    query_text=query.query,
+                    embedding=query_embedding,
+                    answer=ai_response,
+                    confidence_score=confidence_score,
+                    sources=sources,
+                    version=index_version
+                )
+
+            saved = True
+            ai_message = await asyncio.shield(save_answer(ai_response, confidence_score))
+            metrics.observe("chat_stream_total", time.perf_counter() - started)
+
+            yield _sse_event("done", {
+                "message_id": ai_message.id,
+                "confidence_score": confidence_score,
+                "should_escalate": confidence_score < settings.RAG_CONFIDENCE_THRESHOLD,
+                "sources": sources,
+            })
+        finally:
+            if not saved:
+                # The client disconnected mid-answer: keep what was generated
+                try:
+                    partial = "".join(pieces) if not failed else ""
+                    await asyncio.shield(save_answer(
+                        partial or CHAT_ERROR_RESPONSE,
+                        confidence_score if partial else 0.0
+                    ))
+                except Exception as e:
+                    print(f"❌ Could not save interrupted chat answer: {e}")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -4,13 +4,15 @@ app/routers/study_guide.py
 """
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..database import get_db
 from ..dependencies import get_current_user
 from .. import crud, schemas, models
 from ..services.youtube_service import youtube_service
+from ..services.async_youtube_service import async_youtube_service, YouTubeTimeoutError
 from ..services.study_guide_service import study_guide_service
+from ..services.transcript_index import TranscriptIndex
 
 router = APIRouter(prefix="/study-guides", tags=["Study Guide Generator"])
 
@@ -31,11 +33,8 @@ async def get_video_info(
         # Extract video ID
         video_id = youtube_service.extract_video_id(url)
 
-        # Get metadata
-        metadata = youtube_service.get_video_metadata(url)
-
-        # Check captions
-        has_captions = youtube_service.check_captions_available(video_id)
+        # Get metadata and check captions (concurrently, off the event loop)
+        metadata, has_captions = await async_youtube_service.get_video_info(url, video_id)
 
         return {
             "video_id": video_id,
@@ -45,6 +44,8 @@ async def get_video_info(
             "has_captions": has_captions
         }
 
+    except YouTubeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -59,19 +60,21 @@ async def process_study_guide_generation(
     video_id: str,
     priority_segments: List[dict],
     title: str,
-    db: AsyncSession
+    db: AsyncSession,
+    course_id: Optional[int] = None
 ):
     """Background task to generate study guide"""
     try:
         # Get transcript
-        transcript = youtube_service.get_transcript(video_id)
+        transcript = await async_youtube_service.get_transcript(video_id)
 
         # Generate study guide
         result = await study_guide_service.generate_study_guide(
             video_id=video_id,
             transcript=transcript,
             priority_segments=priority_segments,
-            title=title
+            title=title,
+            course_id=course_id
         )
 
         # Update study guide with content
@@ -129,11 +132,9 @@ async def create_study_guide(
         # Extract video ID
         video_id = youtube_service.extract_video_id(guide.youtube_url)
 
-        # Get video metadata
-        metadata = youtube_service.get_video_metadata(guide.youtube_url)
-
-        # Check captions available
-        if not youtube_service.check_captions_available(video_id):
+        # Get video metadata and check captions available
+        metadata, has_captions = await async_youtube_service.get_video_info(guide.youtube_url, video_id)
+        if not has_captions:
             raise HTTPException(
                 status_code=400,
                 detail="Video does not have captions available"
@@ -161,11 +162,16 @@ async def create_study_guide(
             video_id=video_id,
             priority_segments=priority_segments_dict,
             title=guide.title,
-            db=db
+            db=db,
+            course_id=guide.course_id
         )
 
         return db_guide
 
+    except HTTPException:
+        raise
+    except YouTubeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -251,17 +257,20 @@ async def get_video_transcript(
     Used by frontend to show transcript before creating study guide
     """
     try:
-        transcript = youtube_service.get_transcript(video_id)
+        transcript = await async_youtube_service.get_transcript(video_id)
 
         if end:
-            # Extract segment
-            text = youtube_service.extract_segment_transcript(
-                transcript, start, end
-            )
-            return {"text": text, "segments": transcript[start:end]}
+            # Extract segment (captions overlapping start..end seconds)
+            index = TranscriptIndex(transcript)
+            return {
+                "text": index.text_between(start, end),
+                "segments": index.entries_between(start, end)
+            }
 
         return {"segments": transcript}
 
+    except YouTubeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -54,12 +54,44 @@ class DocumentResponse(BaseModel):
     file_path: str
     file_type: str
     file_size: int
+    content_hash: Optional[str] = None
     processed: bool
     course_id: int
     uploaded_by: int
     uploaded_at: datetime
 
 
+class IngestionJobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class IngestionJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    document_id: int
+    status: IngestionJobStatus
+    attempts: int
+    max_attempts: int
+    next_run_at: Optional[datetime] = None
+    error: Optional[str] = None
+    pages_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class DocumentStatusResponse(BaseModel):
+    document_id: int
+    processed: bool
+    job: Optional[IngestionJobResponse] = None
+
+
 # Conversation Schemas
 class ConversationCreate(BaseModel):
     course_id: int
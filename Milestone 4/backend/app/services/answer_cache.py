@@ -0,0 +1,147 @@
+"""
+Semantic Answer Cache - reuse chat answers for near-identical questions
+app/services/answer_cache.py
+"""
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+import threading
+import time
+
+import numpy as np
+
+from ..config import settings
+
+
+# Default for callers that don't track index versions
+_UNVERSIONED = object()
+
+
+class CachedAnswer(NamedTuple):
+    """A previously generated chat answer"""
+    query_text: str
+    answer: str
+    confidence_score: float
+    sources: Dict
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """
+    Per-course cache of answered questions, matched by embedding similarity
+
+    A question hits when its cosine similarity to a recent question in the
+    same course is at least similarity_threshold. Entries expire after
+    ttl_seconds, each course keeps at most max_entries, and a course's
+    entries are dropped whenever its document set changes.
+
+    The cache lives in one process. Callers pass the course's index
+    version (crud.get_course_index_version, shared through the database)
+    to lookup and store; when it differs from the version the entries were
+    stored under, they are dropped, so re-indexing done by another process
+    or instance also invalidates this one.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 500
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[int, Deque[tuple]] = {}  # course_id -> (unit vector, CachedAnswer)
+        self._versions: Dict[int, Any] = {}  # course_id -> index version of its entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, course_id: int, embedding: List[float], version: Any = _UNVERSIONED) -> Optional[CachedAnswer]:
+        """Best cached answer for a question embedding, or None"""
+        if self.max_entries <= 0:
+            return None
+
+        query = self._unit(embedding)
+        with self._lock:
+            if version is not _UNVERSIONED:
+                if self._versions.get(course_id, version) != version:
+                    # Re-indexed since these answers were stored (maybe elsewhere)
+                    self._drop(course_id)
+                self._versions[course_id] = version
+            entries = self._entries.get(course_id)
+            if entries:
+                # Entries are in insertion order, so expired ones are at the front
+                cutoff = time.time() - self.ttl_seconds
+                while entries and entries[0][1].created_at < cutoff:
+                    entries.popleft()
+
+            if not entries:
+                self.misses += 1
+                return None
+
+            similarities = np.stack([vector for vector, _ in entries]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entries[best][1]
+
+    def store(
+        self,
+        course_id: int,
+        query_text: str,
+        embedding: List[float],
+        answer: str,
+        confidence_score: float,
+        sources: Dict,
+        version: Any = _UNVERSIONED
+    ) -> None:
+        """Remember an answer generated for a course at an index version"""
+        if self.max_entries <= 0:
+            return
+
+        entry = CachedAnswer(query_text, answer, confidence_score, sources, time.time())
+        with self._lock:
+            if version is not _UNVERSIONED:
+                if self._versions.setdefault(course_id, version) != version:
+                    return  # the course was re-indexed while this answer was generated
+            entries = self._entries.setdefault(course_id, deque(maxlen=self.max_entries))
+            entries.append((self._unit(embedding), entry))
+
+    def invalidate(self, course_id: int) -> None:
+        """Drop a course's answers (its documents changed)"""
+        with self._lock:
+            self._drop(course_id)
+
+    def _drop(self, course_id: int) -> None:
+        self._versions.pop(course_id, None)
+        if self._entries.pop(course_id, None):
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the metrics endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": sum(len(entries) for entries in self._entries.values()),
+        }
+
+
+# Singleton instance
+answer_cache = SemanticAnswerCache(
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES
+)
@@ -2,12 +2,14 @@
 Assessment Generator Service
 app/services/assessment_service.py
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
-import PyPDF2
-import io
 
-from .gemini_client import gemini_client
+from .llm_backend import llm_router
+from .text_extraction import DocumentSource, iter_pdf_pages, join_pages
+
+# Characters of reference material included in the generation prompt
+REFERENCE_CONTEXT_CHARS = 3000
 
 
 class AssessmentService:
@@ -19,7 +21,8 @@ class AssessmentService:
         difficulty_level: str,
         question_types: List[str],
         total_questions: int,
-        reference_materials: List[str]  # List of text content from PDFs
+        reference_materials: List[str],  # List of text content from PDFs
+        course_id: Optional[int] = None
     ) -> List[Dict]:
         """
         Generate complete assessment with questions
@@ -30,6 +33,7 @@ class AssessmentService:
             question_types: List of types to generate
             total_questions: Number of questions
             reference_materials: Text extracted from reference documents
+            course_id: Course the assessment belongs to (for fair LLM scheduling)
 
         Returns:
             List of generated questions
@@ -48,9 +52,11 @@ class AssessmentService:
 
         # Generate questions
         try:
-            response = await gemini_client.generate_completion(
+            response = await llm_router.generate(
+                "assessment.questions",
                 prompt=system_prompt,
-                temperature=0.8
+                temperature=0.8,
+                course_id=course_id
             )
 
             # Parse response into structured questions
@@ -115,7 +121,7 @@ class AssessmentService:
 {types_str}
 
 **Reference Material:**
-{context[:3000] if context else "No specific reference material provided. Use general knowledge."}
+{context[:REFERENCE_CONTEXT_CHARS] if context else "No specific reference material provided. Use general knowledge."}
 
 **Output Format (STRICT JSON):**
 Generate a JSON array of questions. Each question must follow this exact format:
@@ -279,17 +285,16 @@ Generate the questions now as a JSON array:
 
         return base_marks.get(question_type, 1) * difficulty_multiplier.get(difficulty, 1)
 
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract text from PDF"""
-        try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            reader = PyPDF2.PdfReader(pdf_file)
-
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+    def extract_text_from_pdf(self, source: DocumentSource, max_chars: Optional[int] = None) -> str:
+        """
+        Extract text from PDF
 
-            return text
+        Args:
+            source: PDF file path or bytes
+            max_chars: Stop parsing once this much text has been extracted
+        """
+        try:
+            return join_pages(iter_pdf_pages(source), max_chars=max_chars)
         except Exception as e:
             print(f"Error extracting PDF text: {e}")
             return ""
@@ -0,0 +1,77 @@
+"""
+Async YouTube Service - runs blocking YouTube calls in a bounded thread pool
+app/services/async_youtube_service.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+
+from ..config import settings
+from .youtube_service import YouTubeService, youtube_service
+
+
+class YouTubeTimeoutError(Exception):
+    """A YouTube fetch did not finish within its timeout"""
+
+
+class AsyncYouTubeService:
+    """
+    Async facade over YouTubeService
+
+    pytube and youtube_transcript_api are blocking, so each call runs in a
+    bounded thread pool and the event loop keeps serving other requests.
+    A call that takes longer than timeout raises YouTubeTimeoutError; its
+    thread finishes in the background, and the pool size caps how many
+    such fetches can pile up.
+    """
+
+    def __init__(self, service: YouTubeService, max_workers: int = 8, timeout: float = 20.0):
+        self.service = service
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="youtube")
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the thread pool (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), partial(fn, *args))
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise YouTubeTimeoutError(f"YouTube did not respond within {self.timeout:g}s") from None
+
+    async def get_video_metadata(self, url: str) -> Dict:
+        return await self._run(self.service.get_video_metadata, url)
+
+    async def check_captions_available(self, video_id: str) -> bool:
+        return await self._run(self.service.check_captions_available, video_id)
+
+    async def get_transcript(self, video_id: str, languages: Optional[List[str]] = None) -> List[Dict]:
+        return await self._run(self.service.get_transcript, video_id, languages or ['en'])
+
+    async def get_video_info(self, url: str, video_id: str) -> Tuple[Dict, bool]:
+        """Metadata and caption availability, fetched concurrently"""
+        return tuple(await asyncio.gather(
+            self.get_video_metadata(url),
+            self.check_captions_available(video_id)
+        ))
+
+
+# Singleton instance
+async_youtube_service = AsyncYouTubeService(
+    youtube_service,
+    max_workers=settings.YOUTUBE_MAX_WORKERS,
+    timeout=settings.YOUTUBE_TIMEOUT_SECONDS
+)
@@ -0,0 +1,341 @@
+"""
+Chunking Engine - pluggable, streaming chunking strategies
+app/services/chunking.py
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+import math
+import re
+
+from .text_extraction import Page
+
+
+class Chunk(NamedTuple):
+    """
+    A chunk of document text
+
+    char_start / char_end are offsets into the document text as produced by
+    join_pages (pages joined with a newline); page_start / page_end are
+    1-based page numbers.
+    """
+    text: str
+    char_start: int
+    char_end: int
+    page_start: int
+    page_end: int
+    heading: Optional[str] = None
+
+    def metadata(self) -> Dict:
+        """Offsets for vector-store metadata (no None values)"""
+        meta = {
+            "char_start": self.char_start,
+            "char_end": self.char_end,
+            "page_start": self.page_start,
+            "page_end": self.page_end,
+        }
+        if self.heading:
+            meta["heading"] = self.heading
+        return meta
+
+
+class Chunker(ABC):
+    """Turns a stream of pages into a stream of chunks"""
+
+    name: str = ""
+
+    @abstractmethod
+    def chunk(self, pages: Iterable[Page]) -> Iterator[Chunk]:
+        """Yield chunks in document order"""
+
+
+# ============ Word Window ============
+
+_WORD = re.compile(r"\S+")
+
+
+class WindowChunker(Chunker):
+    """Fixed-size word windows with overlap (the original RAG chunker)"""
+
+    name = "window"
+
+    def __init__(self, chunk_size: int = 512, overlap: int = 50):
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    def chunk(self, pages: Iterable[Page]) -> Iterator[Chunk]:
+        step = self.chunk_size - self.overlap
+        window = []  # (word, start, end, page_number)
+        new_words = 0
+        for word in _iter_words(pages):
+            window.append(word)
+            new_words += 1
+            if len(window) == self.chunk_size:
+                yield _window_chunk(window)
+                window = window[step:]
+                new_words = 0
+        if new_words:
+            yield _window_chunk(window)
+
+
+def _iter_words(pages: Iterable[Page]) -> Iterator[tuple]:
+    offset = 0
+    for page in pages:
+        for match in _WORD.finditer(page.text):
+            yield match.group(), offset + match.start(), offset + match.end(), page.page_number
+        offset += len(page.text) + 1
+
+
+def _window_chunk(window: List[tuple]) -> Chunk:
+    return Chunk(
+        text=" ".join(w[0] for w in window),
+        char_start=window[0][1],
+        char_end=window[-1][2],
+        page_start=window[0][3],
+        page_end=window[-1][3],
+    )
+
+
+# ============ Sentence / Paragraph / Heading Units ============
+
+class _Unit(NamedTuple):
+    """A sentence or heading with its absolute span"""
+    text: str
+    raw: str
+    start: int
+    end: int
+    page: int
+    is_heading: bool
+    paragraph_start: bool
+
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_SENTENCE = re.compile(r"\S.*?(?:[.!?]+[\"')\]]*(?=\s)|$)", re.DOTALL)
+_NUMBERED_HEADING = re.compile(r"^\d+(\.\d+)*\.?\s+\S")
+_KEYWORD_HEADING = re.compile(r"^(chapter|section|unit|lecture|module|part|week|appendix)\b", re.IGNORECASE)
+
+
+def is_heading(line: str) -> bool:
+    """Heuristic heading detection for extracted text lines"""
+    line = line.strip()
+    if not line or line.endswith((".", ",", ";", ":", "?", "!")):
+        return False
+    if line.startswith("#"):
+        return True
+    words = line.split()
+    if len(words) > 10:
+        return False
+    if _NUMBERED_HEADING.match(line) or _KEYWORD_HEADING.match(line):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+
+def _iter_units(pages: Iterable[Page]) -> Iterator[_Unit]:
+    """Split pages into heading and sentence units, flagging paragraph starts"""
+    offset = 0
+    for page in pages:
+        text = page.text
+        position = 0
+        for block_end in [m.start() for m in _PARAGRAPH_BREAK.finditer(text)] + [len(text)]:
+            paragraph_start = True
+            block_start = position
+            line_start = position
+            # Headings are whole lines; the text between them is split into sentences
+            for line in text[position:block_end].split("\n"):
+                line_end = line_start + len(line)
+                if is_heading(line):
+                    yield from _sentences(text, block_start, line_start, offset, page.page_number, paragraph_start)
+                    stripped = line.strip().lstrip("#").strip()
+                    yield _Unit(stripped, line, offset + line_start, offset + line_end,
+                                page.page_number, True, True)
+                    paragraph_start = True
+                    block_start = line_end + 1
+                line_start = line_end + 1
+            yield from _sentences(text, block_start, block_end, offset, page.page_number, paragraph_start)
+            position = block_end
+        offset += len(text) + 1
+
+
+def _sentences(text: str, start: int, end: int, offset: int, page: int, paragraph_start: bool) -> Iterator[_Unit]:
+    first = paragraph_start
+    for match in _SENTENCE.finditer(text, start, max(start, end)):
+        raw = match.group()
+        normalized = " ".join(raw.split())
+        if not normalized:
+            continue
+        yield _Unit(normalized, raw, offset + match.start(), offset + match.end(), page, False, first)
+        first = False
+
+
+# ============ Sentence Packing Strategies ============
+
+class SentenceChunker(Chunker):
+    """
+    Packs whole sentences into chunks of at most max_size
+
+    Chunks prefer to end at paragraph boundaries, and the last
+    overlap_sentences sentences are repeated at the start of the next chunk.
+    Sentences longer than max_size are split on word boundaries.
+    """
+
+    name = "sentence"
+    split_on_headings = False
+
+    def __init__(self, max_size: int = 512, overlap_sentences: int = 1):
+        self.max_size = max_size
+        self.overlap_sentences = overlap_sentences
+
+    def size(self, text: str) -> int:
+        """Size of a text in budget units (words)"""
+        return len(text.split())
+
+    def chunk(self, pages: Iterable[Page]) -> Iterator[Chunk]:
+        current: List[_Unit] = []
+        current_size = 0
+        heading: Optional[str] = None
+
+        for unit in self._bounded_units(pages):
+            if unit.is_heading and self.split_on_headings:
+                if current:
+                    yield self._make_chunk(current, heading)
+                current, current_size = [], 0
+                heading = unit.text
+                continue
+
+            unit_size = self.size(unit.text)
+            paragraph_break = unit.paragraph_start and current_size >= self.max_size // 2
+            if current and (current_size + unit_size > self.max_size or paragraph_break):
+                yield self._make_chunk(current, heading)
+                current = self._overlap_tail(current, unit_size)
+                current_size = sum(self.size(u.text) for u in current)
+
+            current.append(unit)
+            current_size += unit_size
+
+        if current:
+            yield self._make_chunk(current, heading)
+
+    def _overlap_tail(self, units: List[_Unit], next_size: int) -> List[_Unit]:
+        """Last sentences to repeat, if they fit alongside the next unit"""
+        if not self.overlap_sentences:
+            return []
+        tail = [u for u in units[-self.overlap_sentences:] if not u.is_heading]
+        if sum(self.size(u.text) for u in tail) + next_size > self.max_size:
+            return []
+        return tail
+
+    def _bounded_units(self, pages: Iterable[Page]) -> Iterator[_Unit]:
+        """Units, with any single sentence over max_size split by words"""
+        for unit in _iter_units(pages):
+            if unit.is_heading or self.size(unit.text) <= self.max_size:
+                yield unit
+                continue
+            piece: List[re.Match] = []
+            for match in _WORD.finditer(unit.raw):
+                if piece and self.size(" ".join(m.group() for m in piece + [match])) > self.max_size:
+                    yield self._piece_unit(unit, piece)
+                    piece = []
+                piece.append(match)
+            if piece:
+                yield self._piece_unit(unit, piece)
+
+    @staticmethod
+    def _piece_unit(unit: _Unit, matches: List[re.Match]) -> _Unit:
+        text = " ".join(m.group() for m in matches)
+        return _Unit(text, text, unit.start + matches[0].start(), unit.start + matches[-1].end(),
+                     unit.page, False, False)
+
+    def _make_chunk(self, units: List[_Unit], heading: Optional[str]) -> Chunk:
+        body = " ".join(u.text for u in units)
+        return Chunk(
+            text=f"{heading}\n{body}" if heading else body,
+            char_start=units[0].start,
+            char_end=units[-1].end,
+            page_start=units[0].page,
+            page_end=units[-1].page,
+            heading=heading,
+        )
+
+
+class HeadingChunker(SentenceChunker):
+    """
+    Sentence packing that never crosses a heading
+
+    Every chunk belongs to one section; the section heading is prepended to
+    the chunk text and recorded in its metadata.
+    """
+
+    name = "heading"
+    split_on_headings = True
+
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate subword token count without a tokenizer
+
+    Counts punctuation marks as one token and words as one token per four
+    characters, which tracks BPE/WordPiece counts for English prose.
+    """
+    return sum(
+        max(1, math.ceil(len(token) / 4)) if token[0].isalnum() or token[0] == "_" else 1
+        for token in _TOKEN.findall(text)
+    )
+
+
+class TokenBudgetChunker(SentenceChunker):
+    """Sentence packing measured in (estimated) model tokens rather than words"""
+
+    name = "token"
+
+    def __init__(
+        self,
+        max_tokens: int = 512,
+        overlap_sentences: int = 1,
+        token_counter: Optional[Callable[[str], int]] = None
+    ):
+        super().__init__(max_size=max_tokens, overlap_sentences=overlap_sentences)
+        self.token_counter = token_counter or estimate_tokens
+
+    def size(self, text: str) -> int:
+        return self.token_counter(text)
+
+
+# ============ Registry ============
+
+CHUNKING_STRATEGIES = {
+    WindowChunker.name: WindowChunker,
+    SentenceChunker.name: SentenceChunker,
+    HeadingChunker.name: HeadingChunker,
+    TokenBudgetChunker.name: TokenBudgetChunker,
+}
+
+
+def build_chunker(
+    strategy: str,
+    chunk_size: int = 512,
+    overlap: int = 50,
+    max_tokens: int = 512
+) -> Chunker:
+    """
+    Create a chunker by strategy name
+
+    Args:
+        strategy: One of CHUNKING_STRATEGIES
+        chunk_size: Words per chunk (window, sentence, heading)
+        overlap: Words of overlap for the window strategy
+        max_tokens: Token budget for the token strategy
+    """
+    if strategy == WindowChunker.name:
+        return WindowChunker(chunk_size=chunk_size, overlap=overlap)
+    if strategy in (SentenceChunker.name, HeadingChunker.name):
+        return CHUNKING_STRATEGIES[strategy](max_size=chunk_size)
+    if strategy == TokenBudgetChunker.name:
+        return TokenBudgetChunker(max_tokens=max_tokens)
+    raise ValueError(
+        f"Unknown chunking strategy: {strategy}. Choose from {', '.join(CHUNKING_STRATEGIES)}"
+    )
@@ -0,0 +1,165 @@
+"""
+Embedding Cache - in-process LRU with an optional SQLite tier
+app/services/embedding_cache.py
+"""
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, case-folded, single spaces"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def embedding_cache_key(text: str, model: str, task_type: str) -> str:
+    """Cache key for one text embedded by one model for one task type"""
+    material = f"{model}\x00{task_type}\x00{normalize_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+
+    Lookups check an in-process LRU first, then the SQLite file (if
+    configured); disk hits are promoted into memory. Vectors are stored on
+    disk as float32 blobs, and the oldest-used rows are pruned once the table
+    grows past max_disk_entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 200000
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_entries = 0
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._db.commit()
+            self._disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for the keys that are present"""
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                    continue
+                self._memory.move_to_end(key)
+                found[key] = vector
+                self.memory_hits += 1
+
+            if missing and self._db is not None:
+                from_disk = self._read_disk(missing)
+                for key, vector in from_disk.items():
+                    found[key] = vector
+                    self._remember(key, vector)
+                self.disk_hits += len(from_disk)
+                missing = [key for key in missing if key not in from_disk]
+
+            self.misses += len(set(missing))
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """Store vectors in both tiers"""
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, list(vector))
+            if self._db is not None:
+                self._write_disk(items)
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        if found:
+            now = time.time()
+            self._db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            self._db.commit()
+        return found
+
+    def _write_disk(self, items: Dict[str, List[float]]) -> None:
+        now = time.time()
+        cursor = self._db.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+        )
+        self._disk_entries += max(cursor.rowcount, 0)
+        if self._disk_entries > self.max_disk_entries:
+            excess = self._disk_entries - self.max_disk_entries
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._disk_entries -= excess
+        self._db.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the metrics endpoint"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_entries,
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection (called on application shutdown)"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,125 @@
+"""
+Embedding Service - Batched embedding pipeline
+app/services/embedding_service.py
+"""
+from typing import Awaitable, Callable, List, Optional, Sequence
+import asyncio
+import hashlib
+import math
+import re
+
+# Async callable that embeds one batch of texts and returns one vector per text
+EmbedBatchFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+# Async callback receiving the number of texts embedded so far
+ProgressFn = Callable[[int], Awaitable[None]]
+
+
+class BatchedEmbedder:
+    """Groups texts into provider-sized batches and embeds them concurrently"""
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        batch_size: int = 100,
+        max_concurrency: int = 4
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.embed_batch = embed_batch
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    async def embed(
+        self,
+        texts: Sequence[str],
+        on_progress: Optional[ProgressFn] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts in batches
+
+        Args:
+            texts: Texts to embed
+            on_progress: Called after each batch with the running total
+
+        Returns:
+            One embedding per text, in the same order as the input
+        """
+        if not texts:
+            return []
+
+        batches = [
+            list(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = 0
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            nonlocal done
+            async with semaphore:
+                vectors = await self.embed_batch(batch)
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Embedding provider returned {len(vectors)} vectors for {len(batch)} texts"
+                )
+            done += len(batch)
+            if on_progress is not None:
+                await on_progress(done)
+            return vectors
+
+        # gather() returns results in submission order, so flattening keeps input order
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+class FakeEmbedder:
+    """
+    Deterministic offline embedder for tests and benchmarks
+
+    Produces hashed bag-of-words vectors, so texts sharing words end up close
+    in cosine space. An optional per-batch latency simulates a provider round
+    trip, and the call counters make batching and concurrency observable.
+    """
+
+    _token_pattern = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = 256, latency: float = 0.0):
+        self.dimension = dimension
+        self.latency = latency
+        self.calls = 0
+        self.texts_embedded = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch, simulating a provider round trip"""
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            self.texts_embedded += len(texts)
+            return [self.embed_text(text) for text in texts]
+        finally:
+            self.in_flight -= 1
+
+    def embed_text(self, text: str) -> List[float]:
+        """Embed a single text synchronously"""
+        vector = [0.0] * self.dimension
+        for token in self._token_pattern.findall(text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[index] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            # Empty text: fixed unit vector so cosine distance stays defined
+            vector[0] = 1.0
+            return vector
+        return [v / norm for v in vector]
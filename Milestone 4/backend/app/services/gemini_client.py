@@ -1,90 +1,184 @@
 """
 Gemini API Client Service
 """
-import google.generativeai as genai
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 import asyncio
-from functools import wraps
+from functools import partial
 
 from ..config import settings
+from .embedding_cache import EmbeddingCache, embedding_cache_key
+from .embedding_service import BatchedEmbedder, ProgressFn
+from .gemini_transport import GeminiTransport
+from .local_embeddings import LocalEmbeddingModel
 
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-def async_wrap(func):
-    """Wrapper to make sync Gemini calls async"""
-    @wraps(func)
-    async def run(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
-    return run
 
 class GeminiClient:
-    """Gemini API client for text generation and embeddings"""
+    """
+    Gemini API client for text generation and embeddings
+
+    With EMBEDDING_BACKEND=local, embeddings come from a sentence-transformers
+    model on the CPU instead of the Gemini API; caching and batching work
+    the same way.
+    """
 
-    def __init__(self):
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    def __init__(
+        self,
+        transport: Optional[GeminiTransport] = None,
+        local_embeddings: Optional[LocalEmbeddingModel] = None
+    ):
+        self.model = settings.GEMINI_MODEL
         self.embedding_model = settings.GEMINI_EMBEDDING_MODEL
+        if local_embeddings is None and settings.EMBEDDING_BACKEND == "local":
+            local_embeddings = LocalEmbeddingModel(
+                settings.LOCAL_EMBEDDING_MODEL,
+                backend=settings.LOCAL_EMBEDDING_RUNTIME,
+                onnx_file=settings.LOCAL_EMBEDDING_ONNX_FILE,
+                quantize=settings.LOCAL_EMBEDDING_QUANTIZE,
+                batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+                query_prefix=settings.LOCAL_EMBEDDING_QUERY_PREFIX,
+                document_prefix=settings.LOCAL_EMBEDDING_DOCUMENT_PREFIX
+            )
+        self.local_embeddings = local_embeddings
+        self.transport = transport or GeminiTransport(
+            api_key=settings.GEMINI_API_KEY,
+            base_url=settings.GEMINI_API_BASE_URL,
+            timeout=settings.GEMINI_TIMEOUT_SECONDS,
+            connect_timeout=settings.GEMINI_CONNECT_TIMEOUT_SECONDS,
+            max_connections=settings.GEMINI_MAX_CONNECTIONS,
+            model_concurrency={
+                self.model: settings.GEMINI_GENERATION_CONCURRENCY,
+                self.embedding_model: settings.GEMINI_EMBEDDING_CONCURRENCY,
+            }
+        )
+        # Cache keys include the model, so local and remote vectors never mix
+        self.embedding_cache_model = (
+            self.local_embeddings.cache_name if self.local_embeddings is not None else self.embedding_model
+        )
+        self.embedding_cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            db_path=settings.EMBEDDING_CACHE_DB_PATH or None,
+            max_disk_entries=settings.EMBEDDING_CACHE_DB_MAX_ENTRIES
+        )
+        self._embedders: Dict[str, BatchedEmbedder] = {}
+
+    def _embedder(self, task_type: str) -> BatchedEmbedder:
+        """Batched embedder for one task type"""
+        if task_type not in self._embedders:
+            if self.local_embeddings is not None:
+                # One model on the CPU: batches run one after another
+                batch_size, max_concurrency = settings.LOCAL_EMBEDDING_BATCH_SIZE, 1
+            else:
+                batch_size, max_concurrency = settings.EMBEDDING_BATCH_SIZE, settings.EMBEDDING_MAX_CONCURRENCY
+            self._embedders[task_type] = BatchedEmbedder(
+                partial(self._embed_batch, task_type=task_type),
+                batch_size=batch_size,
+                max_concurrency=max_concurrency
+            )
+        return self._embedders[task_type]
 
     async def generate_completion(
         self,
         prompt: str,
         system_instruction: Optional[str] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        model: Optional[str] = None
     ) -> str:
-        """Generate text completion"""
-        try:
-            if system_instruction:
-                full_prompt = f"{system_instruction}\n\n{prompt}"
-            else:
-                full_prompt = prompt
+        """Generate text completion (with GEMINI_MODEL unless model is given)"""
+        if system_instruction:
+            full_prompt = f"{system_instruction}\n\n{prompt}"
+        else:
+            full_prompt = prompt
 
-            response = await self._generate_async(full_prompt, temperature=temperature)
-            return response.text
+        return await self.transport.generate(
+            model or self.model,
+            full_prompt,
+            generation_config=self._generation_config(temperature)
+        )
 
-        except Exception as e:
-            print(f"Error generating completion: {e}")
-            raise
+    async def stream_completion(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Generate a completion, yielding text pieces as the model produces them"""
+        if system_instruction:
+            full_prompt = f"{system_instruction}\n\n{prompt}"
+        else:
+            full_prompt = prompt
 
-    @async_wrap
-    def _generate_async(self, prompt: str, **kwargs):
-        """Async wrapper for generation"""
-        generation_config = {
-            "temperature": kwargs.get("temperature", 0.7),
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": 8192,
+        async for text in self.transport.stream_generate(
+            model or self.model,
+            full_prompt,
+            generation_config=self._generation_config(temperature)
+        ):
+            yield text
+
+    @staticmethod
+    def _generation_config(temperature: float) -> Dict:
+        return {
+            "temperature": temperature,
+            "topP": 0.95,
+            "topK": 40,
+            "maxOutputTokens": 8192,
         }
-        return self.model.generate_content(prompt, generation_config=generation_config)
 
-    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for texts"""
+    async def generate_embeddings(
+        self,
+        texts: List[str],
+        on_progress: Optional[ProgressFn] = None,
+        task_type: str = "retrieval_document"
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for texts (batched, order-preserving)
+
+        Cached vectors are reused; only cache misses reach the API (or
+        the local model).
+
+        Args:
+            texts: Texts to embed
+            on_progress: Called with the running number of texts done
+            task_type: "retrieval_document" for chunks, "retrieval_query" for questions
+        """
+        if not texts:
+            return []
+
+        keys = [embedding_cache_key(text, self.embedding_cache_model, task_type) for text in texts]
+        cached = await asyncio.to_thread(self.embedding_cache.get_many, keys)
+
+        # Embed each missing key once, even if it repeats in the input
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        hits = len(texts) - sum(1 for key in keys if key not in cached)
+        if on_progress is not None and hits:
+            await on_progress(hits)
+
+        async def progress_after_hits(done: int) -> None:
+            if on_progress is not None:
+                await on_progress(hits + done)
+
         try:
-            embeddings = []
-            for text in texts:
-                result = await self._embed_async(text)
-                embeddings.append(result['embedding'])
-            return embeddings
+            vectors = await self._embedder(task_type).embed(
+                list(missing.values()),
+                on_progress=progress_after_hits
+            )
         except Exception as e:
             print(f"Error generating embeddings: {e}")
             raise
 
-    @async_wrap
-    def _embed_async(self, text: str):
-        """Async wrapper for embedding"""
-        return genai.embed_content(
-            model=self.embedding_model,
-            content=text,
-            task_type="retrieval_document"
-        )
+        fresh = dict(zip(missing, vectors))
+        await asyncio.to_thread(self.embedding_cache.put_many, fresh)
+        return [cached[key] if key in cached else fresh[key] for key in keys]
+
+    async def _embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """Embed one provider-sized batch in a single round trip"""
+        if self.local_embeddings is not None:
+            return await self.local_embeddings.embed_batch(texts, task_type=task_type)
+        return await self.transport.embed(self.embedding_model, texts, task_type=task_type)
 
 # Singleton instance
 gemini_client = GeminiClient()
-
-async def get_gemini_content(prompt: str, response_format: str = 'text', **kwargs):
-    """Unified async interface for Gemini LLM completion (used by other services)"""
-    result = await gemini_client.generate_completion(prompt)
-    if response_format == "json":
-        import json
-        return json.loads(result)
-    return result
@@ -0,0 +1,250 @@
+"""
+Gemini Transport - native asyncio REST client for the Gemini API
+app/services/gemini_transport.py
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import itertools
+import json
+
+import httpx
+
+
+class LLMError(Exception):
+    """An LLM provider call failed"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMTimeoutError(LLMError):
+    """The call did not finish within its timeout"""
+
+
+class LLMRateLimitError(LLMError):
+    """The provider rejected the call with 429; retry_after is in seconds if given"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class LLMServerError(LLMError):
+    """The provider returned a 5xx response"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _model_path(model: str) -> str:
+    """'models/embedding-001' and 'embedding-001' both map to 'models/embedding-001'"""
+    return model if model.startswith("models/") else f"models/{model}"
+
+
+class GeminiTransport:
+    """
+    Pooled async HTTP transport for the Gemini REST API
+
+    Pooled httpx clients keep connections alive across calls. Each model
+    has its own semaphore, so e.g. slow generation calls cannot starve
+    embeddings, and concurrency is set explicitly instead of by a thread
+    pool size. Cancelling the awaiting task aborts the HTTP request and
+    releases the model's slot.
+
+    Connections are spread over several small httpx pools used round-robin:
+    httpx scans its whole pool on every request and response, which gets
+    quadratically slower past a few dozen connections in one pool.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_connections: int = 100,
+        connections_per_pool: int = 16,
+        default_concurrency: int = 16,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.connections_per_pool = max(1, min(connections_per_pool, max_connections))
+        self.default_concurrency = default_concurrency
+        self.model_concurrency = {
+            _model_path(model): limit for model, limit in (model_concurrency or {}).items()
+        }
+        self._transport = transport
+        self._clients: List[httpx.AsyncClient] = []
+        self._next_client = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Next pooled client, creating the pools on first use"""
+        if not self._clients:
+            pools = -(-self.max_connections // self.connections_per_pool)
+            per_pool = -(-self.max_connections // pools)
+            self._clients = [
+                httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers={"x-goog-api-key": self.api_key},
+                    timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(max_connections=per_pool, max_keepalive_connections=per_pool),
+                    transport=self._transport
+                )
+                for _ in range(pools)
+            ]
+            self._next_client = itertools.cycle(self._clients)
+        return next(self._next_client)
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._semaphores:
+            limit = self.model_concurrency.get(model, self.default_concurrency)
+            self._semaphores[model] = asyncio.Semaphore(limit)
+        return self._semaphores[model]
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called on application shutdown)"""
+        clients, self._clients = self._clients, []
+        for client in clients:
+            await client.aclose()
+
+    async def _post(self, model: str, method: str, body: Dict, timeout: Optional[float]) -> Dict:
+        model = _model_path(model)
+        async with self._semaphore(model):
+            try:
+                response = await self._get_client().post(
+                    f"/{model}:{method}",
+                    json=body,
+                    timeout=self._timeout(timeout)
+                )
+            except httpx.TimeoutException as e:
+                raise LLMTimeoutError(f"{model}:{method} timed out") from e
+            except httpx.TransportError as e:
+                raise LLMError(f"{model}:{method} failed: {e}") from e
+            self._raise_for_status(response)
+            return response.json()
+
+    def _timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        return httpx.Timeout(timeout or self.timeout, connect=self.connect_timeout)
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        if response.status_code < 400:
+            return
+        try:
+            detail = response.json().get("error", {}).get("message", response.text)
+        except ValueError:
+            detail = response.text
+        if response.status_code == 429:
+            raise LLMRateLimitError(
+                f"Rate limited: {detail}",
+                retry_after=parse_retry_after(response.headers.get("retry-after"))
+            )
+        if response.status_code >= 500:
+            raise LLMServerError(f"Server error {response.status_code}: {detail}", response.status_code)
+        raise LLMError(f"Request failed {response.status_code}: {detail}", response.status_code)
+
+    @staticmethod
+    def _generate_body(prompt: str, generation_config: Optional[Dict]) -> Dict:
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if generation_config:
+            body["generationConfig"] = generation_config
+        return body
+
+    @staticmethod
+    def _candidate_text(payload: Dict) -> str:
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        generation_config: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """Generate a completion and return its text"""
+        payload = await self._post(model, "generateContent", self._generate_body(prompt, generation_config), timeout)
+        if not payload.get("candidates"):
+            reason = payload.get("promptFeedback", {}).get("blockReason", "no candidates")
+            raise LLMError(f"Empty response: {reason}")
+        return self._candidate_text(payload)
+
+    async def stream_generate(
+        self,
+        model: str,
+        prompt: str,
+        generation_config: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Generate a completion, yielding text pieces as they arrive (SSE)"""
+        model = _model_path(model)
+        async with self._semaphore(model):
+            try:
+                async with self._get_client().stream(
+                    "POST",
+                    f"/{model}:streamGenerateContent",
+                    params={"alt": "sse"},
+                    json=self._generate_body(prompt, generation_config),
+                    timeout=self._timeout(timeout)
+                ) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        self._raise_for_status(response)
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        text = self._candidate_text(json.loads(line[5:]))
+                        if text:
+                            yield text
+            except httpx.TimeoutException as e:
+                raise LLMTimeoutError(f"{model}:streamGenerateContent timed out") from e
+            except httpx.TransportError as e:
+                raise LLMError(f"{model}:streamGenerateContent failed: {e}") from e
+
+    async def embed(
+        self,
+        model: str,
+        texts: List[str],
+        task_type: str = "retrieval_document",
+        timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        """Embed a batch of texts in one batchEmbedContents call"""
+        model_path = _model_path(model)
+        body = {
+            "requests": [
+                {
+                    "model": model_path,
+                    "content": {"parts": [{"text": text}]},
+                    "taskType": task_type.upper(),
+                }
+                for text in texts
+            ]
+        }
+        payload = await self._post(model_path, "batchEmbedContents", body, timeout)
+        return [embedding["values"] for embedding in payload.get("embeddings", [])]
@@ -0,0 +1,256 @@
+"""
+Document Ingestion Queue - durable, Postgres-backed job queue
+app/services/ingestion_queue.py
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import asyncio
+import random
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from .. import crud
+from ..models import Document, IngestionJob, IngestionJobStatus
+from .answer_cache import answer_cache
+from .rag_service import rag_service
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class IngestionQueue:
+    """
+    Runs document ingestion jobs stored in the ingestion_jobs table
+
+    Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    app instances can share one queue. A claimed job holds a lease that is
+    renewed as it reports progress; jobs whose lease expires (e.g. the
+    process died) are picked up again. Failures are retried with
+    exponential backoff until max_attempts is reached. A document whose
+    file is identical to one already indexed in its course reuses that
+    document's chunks; one whose twin is still being ingested waits for it.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        concurrency: int = 2,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 30.0,
+        poll_interval_seconds: float = 5.0,
+        lease_seconds: float = 600.0
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    async def enqueue(self, db: AsyncSession, document_id: int) -> IngestionJob:
+        """Queue a document and wake an idle worker"""
+        job = await crud.create_ingestion_job(db=db, document_id=document_id, max_attempts=self.max_attempts)
+        self._wakeup.set()
+        return job
+
+    def start(self) -> None:
+        """Start worker tasks (called on application startup)"""
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"ingestion-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel worker tasks; interrupted jobs are reclaimed after their lease"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker_loop(self) -> None:
+        while not self._stopping:
+            try:
+                job_id = await self._claim_next_job()
+            except Exception as e:
+                print(f"❌ Ingestion queue error: {e}")
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                # e.g. the database went away mid-job; the worker keeps going and
+                # the job is picked up again once its lease expires
+                print(f"❌ Ingestion job {job_id} crashed: {e}")
+
+    async def _claim_next_job(self) -> Optional[int]:
+        """Atomically move the next due job to RUNNING and return its id"""
+        now = _utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(IngestionJob)
+                .where(or_(
+                    and_(
+                        IngestionJob.status == IngestionJobStatus.QUEUED,
+                        IngestionJob.next_run_at <= now
+                    ),
+                    and_(
+                        IngestionJob.status == IngestionJobStatus.RUNNING,
+                        IngestionJob.lease_expires_at < now
+                    )
+                ))
+                .order_by(IngestionJob.next_run_at, IngestionJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+
+            job.status = IngestionJobStatus.RUNNING
+            job.attempts += 1
+            job.started_at = now
+            job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            await db.commit()
+            return job.id
+
+    async def run_job(self, job_id: int) -> None:
+        """Run one claimed job and record its outcome"""
+        async with self.session_factory() as db:
+            job = await db.get(IngestionJob, job_id)
+            document = await db.get(Document, job.document_id)
+
+            async def report_progress(**fields) -> None:
+                for name, value in fields.items():
+                    setattr(job, name, value)
+                job.lease_expires_at = _utcnow() + timedelta(seconds=self.lease_seconds)
+                await db.commit()
+
+            try:
+                if document is None or document.is_deleted:
+                    raise ValueError(f"Document {job.document_id} no longer exists")
+
+                twin = None
+                if document.content_hash:
+                    twin = await crud.get_document_by_hash(
+                        db=db,
+                        content_hash=document.content_hash,
+                        course_id=document.course_id,
+                        exclude_document_id=document.id
+                    )
+                if twin is not None and not twin.processed and twin.id < document.id:
+                    twin_job = await crud.get_latest_ingestion_job(db=db, document_id=twin.id)
+                    if twin_job and twin_job.status in (IngestionJobStatus.QUEUED, IngestionJobStatus.RUNNING):
+                        # An earlier upload of the same file is being ingested;
+                        # wait for it instead of embedding the chunks twice
+                        job.status = IngestionJobStatus.QUEUED
+                        job.attempts -= 1
+                        job.next_run_at = _utcnow() + timedelta(seconds=self.poll_interval_seconds)
+                        job.lease_expires_at = None
+                        await db.commit()
+                        return
+
+                # Unchanged chunks keep their ids and stored embeddings, so a
+                # replaced file only embeds chunks whose content hash is new
+                previous_ids = list(document.embedding_ids or [])
+                if twin is not None and twin.processed:
+                    # Identical file already indexed for the course: share its chunks
+                    embedding_ids = list(twin.embedding_ids or [])
+                else:
+                    embedding_ids = await rag_service.process_document(
+                        file_path=document.file_path,
+                        file_type=document.file_type,
+                        document_id=document.id,
+                        course_id=document.course_id,
+                        progress=report_progress
+                    )
+                obsolete_ids = await self._obsolete_chunk_ids(db, document, previous_ids, embedding_ids)
+                await crud.update_document_processed(
+                    db=db,
+                    document_id=document.id,
+                    embedding_ids=embedding_ids
+                )
+                if obsolete_ids:
+                    rag_service.delete_chunks(obsolete_ids, course_id=document.course_id)
+                    print(f"🗑️ Document {document.id}: removed {len(obsolete_ids)} obsolete chunks")
+                # Cached chat answers may cite the old document set; other
+                # processes notice through the job's finished_at (the course's
+                # index version) once this job is committed
+                answer_cache.invalidate(document.course_id)
+                job.status = IngestionJobStatus.COMPLETED
+                job.error = None
+                job.finished_at = _utcnow()
+                print(f"✅ Document {job.document_id} ingested (job {job.id})")
+
+            except Exception as e:
+                await db.rollback()
+                job = await db.get(IngestionJob, job_id)
+                job.error = str(e)
+                if job.attempts >= job.max_attempts:
+                    job.status = IngestionJobStatus.FAILED
+                    job.finished_at = _utcnow()
+                    print(f"❌ Ingestion job {job.id} failed permanently: {e}")
+                else:
+                    job.status = IngestionJobStatus.QUEUED
+                    job.next_run_at = _utcnow() + timedelta(seconds=self._retry_delay(job.attempts))
+                    print(f"⚠️ Ingestion job {job.id} attempt {job.attempts} failed, retrying: {e}")
+
+            job.lease_expires_at = None
+            await db.commit()
+
+    async def _obsolete_chunk_ids(
+        self,
+        db: AsyncSession,
+        document: Document,
+        previous_ids: List[str],
+        current_ids: List[str]
+    ) -> List[str]:
+        """
+        Chunk ids a re-indexed document no longer uses and may delete
+
+        Only chunks this document created (doc_{id}_ prefix) are deleted, and
+        only if no other document in the course still references them.
+        """
+        current = set(current_ids)
+        prefix = f"doc_{document.id}_"
+        candidates = [i for i in previous_ids if i not in current and i.startswith(prefix)]
+        if not candidates:
+            return []
+        in_use = await crud.get_embedding_ids_in_use(
+            db=db,
+            course_id=document.course_id,
+            exclude_document_id=document.id
+        )
+        return [i for i in candidates if i not in in_use]
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter"""
+        delay = self.retry_base_seconds * (2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+
+# Singleton instance
+ingestion_queue = IngestionQueue(
+    session_factory=AsyncSessionLocal,
+    concurrency=settings.INGEST_WORKER_CONCURRENCY,
+    max_attempts=settings.INGEST_MAX_ATTEMPTS,
+    retry_base_seconds=settings.INGEST_RETRY_BASE_SECONDS,
+    poll_interval_seconds=settings.INGEST_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.INGEST_JOB_LEASE_SECONDS
+)
@@ -0,0 +1,167 @@
+"""
+Lexical Index - in-process BM25 over course chunks and rank fusion
+app/services/lexical_index.py
+"""
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import heapq
+import math
+import re
+import threading
+
+# Words and identifiers such as "3.2", "heap_sort" or "cs-201"
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-][a-z0-9]+)*")
+_PART_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased terms of a text
+
+    Identifiers are kept whole ("theorem 3.2" gives "3.2") and their parts
+    are added too, so "heap_sort" also matches a query for "sort".
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        parts = _PART_PATTERN.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a set of chunks
+
+    Keeps an inverted index of term -> {chunk_id: term frequency}.
+    Adding an existing chunk id replaces it. Thread-safe, so searches can
+    run in a worker thread while ingestion adds chunks.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        with self._lock:
+            for chunk_id, text in zip(ids, texts):
+                self._remove(chunk_id)
+                terms = Counter(tokenize(text))
+                self._terms[chunk_id] = terms
+                self._lengths[chunk_id] = sum(terms.values())
+                self._total_length += self._lengths[chunk_id]
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[chunk_id] = count
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for chunk_id in ids:
+                self._remove(chunk_id)
+
+    def _remove(self, chunk_id: str) -> None:
+        terms = self._terms.pop(chunk_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(chunk_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[chunk_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Best chunks for a query as (chunk_id, score), highest first"""
+        with self._lock:
+            count = len(self._terms)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        # Ties broken by chunk id, so rankings don't depend on insertion order
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+class LexicalIndexStore:
+    """
+    One BM25 index per course, built on first use
+
+    loader(course_id) returns the course's stored (ids, texts), so an
+    index is rebuilt from the vector store after a restart. Chunks added
+    or deleted later are applied to indexes that are already loaded.
+    """
+
+    def __init__(self, loader: Callable[[int], Tuple[List[str], List[str]]], k1: float = 1.5, b: float = 0.75):
+        self.loader = loader
+        self.k1 = k1
+        self.b = b
+        self._indexes: Dict[int, BM25Index] = {}
+        self._lock = threading.Lock()
+
+    def get(self, course_id: int) -> BM25Index:
+        with self._lock:
+            index = self._indexes.get(course_id)
+            if index is None:
+                index = BM25Index(self.k1, self.b)
+                index.add(*self.loader(course_id))
+                self._indexes[course_id] = index
+            return index
+
+    def add(self, course_id: int, ids: Sequence[str], texts: Sequence[str]) -> None:
+        with self._lock:
+            index = self._indexes.get(course_id)
+            if index is not None:
+                index.add(ids, texts)
+
+    def remove(self, ids: Sequence[str], course_id: Optional[int] = None) -> None:
+        """Drop chunks from a course's index, or from every index if course_id is None"""
+        with self._lock:
+            if course_id is None:
+                indexes = list(self._indexes.values())
+            else:
+                indexes = [self._indexes[course_id]] if course_id in self._indexes else []
+            for index in indexes:
+                index.remove(ids)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "courses_indexed": len(self._indexes),
+                "chunks_indexed": sum(len(index) for index in self._indexes.values()),
+            }
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    weights: Optional[Sequence[float]] = None,
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists with weighted reciprocal rank fusion
+
+    Each id scores sum(weight / (k + rank)) over the rankings it appears
+    in (rank starting at 1). Returns (id, score), highest first.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
@@ -0,0 +1,381 @@
+"""
+LLM Backends - provider-agnostic text generation with per-call-site routing
+app/services/llm_backend.py
+"""
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import AsyncIterator, Callable, Dict, Optional
+import asyncio
+import hashlib
+import time
+
+from ..config import settings
+from .chunking import estimate_tokens
+from .gemini_client import GeminiClient, gemini_client
+from .gemini_transport import LLMError
+from .llm_resilience import ResilienceLayer, llm_resilience
+from .llm_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, LLMScheduler, llm_scheduler
+from .metrics import metrics
+
+# Words of the prompt echoed back by the stub backend
+STUB_REPLY_WORDS = 40
+
+
+def _full_prompt(prompt: str, system_instruction: Optional[str]) -> str:
+    return f"{system_instruction}\n\n{prompt}" if system_instruction else prompt
+
+
+class LLMBackend(ABC):
+    """A text generation provider"""
+
+    name = "base"
+    remote = False  # calls count against a provider quota and go through the scheduler
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        """Generate a completion and return its text"""
+
+    async def stream(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Yield the completion in pieces; backends without streaming yield it whole"""
+        yield await self.generate(prompt, system_instruction, temperature)
+
+
+class GeminiBackend(LLMBackend):
+    """Gemini over the shared REST transport, optionally with a different model"""
+
+    name = "gemini"
+    remote = True
+
+    def __init__(self, client: GeminiClient, model: Optional[str] = None):
+        self.client = client
+        self.model = model
+
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        return await self.client.generate_completion(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            model=self.model
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        async for text in self.client.stream_completion(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            model=self.model
+        ):
+            yield text
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline backend for development, tests and benchmarks
+
+    The reply depends only on the prompt: prompts asking for JSON get an
+    empty JSON list, anything else gets a tagged echo of its first words.
+    Pass reply to script the responses instead.
+    """
+
+    name = "stub"
+
+    def __init__(self, reply: Optional[Callable[[str], str]] = None):
+        self.reply = reply or self.default_reply
+
+    @staticmethod
+    def default_reply(prompt: str) -> str:
+        if "JSON" in prompt:
+            return "[]"
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"[stub {digest}] " + " ".join(prompt.split()[:STUB_REPLY_WORDS])
+
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        return self.reply(_full_prompt(prompt, system_instruction))
+
+    async def stream(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        words = (await self.generate(prompt, system_instruction, temperature)).split(" ")
+        for i, word in enumerate(words):
+            yield word if i == len(words) - 1 else word + " "
+
+
+class LocalModelBackend(LLMBackend):
+    """
+    Hugging Face transformers model running on the CPU
+
+    The model is loaded on first use, and generation runs in a worker
+    thread one call at a time so it doesn't block the event loop.
+    transformers is only imported when this backend is used.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name: str,
+        task: str = "text2text-generation",
+        max_new_tokens: int = 256
+    ):
+        self.model_name = model_name
+        self.task = task
+        self.max_new_tokens = max_new_tokens
+        self._pipeline = None
+        self._lock = asyncio.Lock()
+
+    def _load(self):
+        try:
+            from transformers import pipeline
+        except ImportError as e:
+            raise LLMError("The local LLM backend needs the transformers package") from e
+        return pipeline(self.task, model=self.model_name, device="cpu")
+
+    def _run(self, prompt: str, temperature: float) -> str:
+        if self._pipeline is None:
+            self._pipeline = self._load()
+        kwargs = {"max_new_tokens": self.max_new_tokens, "do_sample": temperature > 0}
+        if temperature > 0:
+            kwargs["temperature"] = temperature
+        if self.task == "text-generation":
+            kwargs["return_full_text"] = False
+        return self._pipeline(prompt, **kwargs)[0]["generated_text"].strip()
+
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        async with self._lock:
+            return await asyncio.to_thread(self._run, _full_prompt(prompt, system_instruction), temperature)
+
+
+def parse_call_sites(spec: str) -> set:
+    """Parse a comma-separated list of call sites"""
+    return {site.strip() for site in spec.split(",") if site.strip()}
+
+
+def parse_routes(spec: str) -> Dict[str, str]:
+    """Parse "call_site=backend,call_site=backend" into a dict"""
+    routes = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        call_site, sep, backend = item.partition("=")
+        if not sep or not call_site.strip() or not backend.strip():
+            raise ValueError(f"Invalid LLM route {item.strip()!r}; expected call_site=backend")
+        routes[call_site.strip()] = backend.strip()
+    return routes
+
+
+class LLMRouter:
+    """
+    Picks a backend for each call site
+
+    Call sites are dotted names such as "chat" or "study_guide.topics".
+    A call site without its own route falls back to its parent
+    ("study_guide"), then to the default backend.
+
+    Calls to remote backends go through the resilience layer (deadline,
+    retries, hedging, circuit breaker), and each attempt waits for the
+    scheduler, at interactive priority for interactive call sites and
+    background priority for the rest. If a remote call still fails, the
+    fallback backend answers instead when one is configured.
+
+    Call sites: chat, assessment.questions, study_guide.segment,
+    study_guide.guide, study_guide.topics, slide_deck.slides,
+    workflow_agent.decision
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, LLMBackend],
+        default: str,
+        routes: Optional[Dict[str, str]] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        interactive_call_sites: Optional[set] = None,
+        resilience: Optional[ResilienceLayer] = None,
+        interactive_deadline_seconds: Optional[float] = None,
+        fallback: Optional[str] = None
+    ):
+        routes = routes or {}
+        unknown = {default, *routes.values(), *([fallback] if fallback else [])} - set(backends)
+        if unknown:
+            raise ValueError(f"Unknown LLM backend(s): {', '.join(sorted(unknown))}")
+        self.backends = backends
+        self.default = default
+        self.routes = routes
+        self.scheduler = scheduler
+        self.interactive_call_sites = interactive_call_sites or set()
+        self.resilience = resilience
+        self.interactive_deadline_seconds = interactive_deadline_seconds
+        self.fallback = fallback
+
+    def _lookup(self, call_site: str, table) -> Optional[str]:
+        """call_site or its nearest dotted parent present in table"""
+        site = call_site
+        while site:
+            if site in table:
+                return site
+            site = site.rpartition(".")[0]
+        return None
+
+    def backend_name_for(self, call_site: str) -> str:
+        """Name of the backend routed to call_site"""
+        site = self._lookup(call_site, self.routes)
+        return self.routes[site] if site else self.default
+
+    def backend_for(self, call_site: str) -> LLMBackend:
+        """Backend routed to call_site"""
+        return self.backends[self.backend_name_for(call_site)]
+
+    def priority_for(self, call_site: str) -> int:
+        """Scheduler priority class of call_site"""
+        if self._lookup(call_site, self.interactive_call_sites):
+            return PRIORITY_INTERACTIVE
+        return PRIORITY_BACKGROUND
+
+    def _deadline(self, call_site: str) -> Optional[float]:
+        if self.priority_for(call_site) == PRIORITY_INTERACTIVE:
+            return self.interactive_deadline_seconds
+        return None
+
+    def _fallback_for(self, name: str) -> Optional[LLMBackend]:
+        if self.fallback and self.fallback != name:
+            return self.backends[self.fallback]
+        return None
+
+    def _slot(self, backend: LLMBackend, call_site: str, prompt: str, system_instruction: Optional[str], course_id: Optional[int]):
+        if self.scheduler is None or not backend.remote:
+            return nullcontext()
+        return self.scheduler.slot(
+            self.priority_for(call_site),
+            course_id,
+            estimate_tokens(_full_prompt(prompt, system_instruction))
+        )
+
+    @staticmethod
+    def _cache_key(name: str, prompt: str, system_instruction: Optional[str], temperature: float) -> str:
+        text = f"{name}\0{temperature}\0{_full_prompt(prompt, system_instruction)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    async def generate(
+        self,
+        call_site: str,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        course_id: Optional[int] = None
+    ) -> str:
+        """Generate a completion with the call site's backend"""
+        started = time.perf_counter()
+        name = self.backend_name_for(call_site)
+        backend = self.backends[name]
+
+        async def attempt() -> str:
+            async with self._slot(backend, call_site, prompt, system_instruction, course_id):
+                return await backend.generate(prompt, system_instruction, temperature)
+
+        if self.resilience is None or not backend.remote:
+            text = await attempt()
+        else:
+            try:
+                text = await self.resilience.call(
+                    name,
+                    attempt,
+                    cache_key=self._cache_key(name, prompt, system_instruction, temperature),
+                    deadline_seconds=self._deadline(call_site)
+                )
+            except LLMError as e:
+                fallback = self._fallback_for(name)
+                if fallback is None:
+                    raise
+                print(f"⚠️ {call_site}: {name} failed ({e}); using {self.fallback}")
+                text = await fallback.generate(prompt, system_instruction, temperature)
+        metrics.observe(f"llm.{call_site}", time.perf_counter() - started)
+        return text
+
+    async def stream(
+        self,
+        call_site: str,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        course_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion with the call site's backend"""
+        name = self.backend_name_for(call_site)
+        backend = self.backends[name]
+
+        async def open_stream() -> AsyncIterator[str]:
+            async with self._slot(backend, call_site, prompt, system_instruction, course_id):
+                async for text in backend.stream(prompt, system_instruction, temperature):
+                    yield text
+
+        if self.resilience is None or not backend.remote:
+            async for text in open_stream():
+                yield text
+            return
+
+        started = False
+        try:
+            async for text in self.resilience.stream(name, open_stream, deadline_seconds=self._deadline(call_site)):
+                started = True
+                yield text
+        except LLMError as e:
+            fallback = self._fallback_for(name)
+            if started or fallback is None:
+                raise
+            print(f"⚠️ {call_site}: {name} failed ({e}); using {self.fallback}")
+            async for text in fallback.stream(prompt, system_instruction, temperature):
+                yield text
+
+
+# Singleton instance
+llm_router = LLMRouter(
+    backends={
+        "gemini": GeminiBackend(gemini_client),
+        "gemini_fast": GeminiBackend(gemini_client, model=settings.GEMINI_FAST_MODEL),
+        "local": LocalModelBackend(
+            settings.LOCAL_LLM_MODEL,
+            task=settings.LOCAL_LLM_TASK,
+            max_new_tokens=settings.LOCAL_LLM_MAX_NEW_TOKENS
+        ),
+        "stub": StubBackend(),
+    },
+    default=settings.LLM_DEFAULT_BACKEND,
+    routes=parse_routes(settings.LLM_ROUTES),
+    scheduler=llm_scheduler,
+    interactive_call_sites=parse_call_sites(settings.LLM_INTERACTIVE_CALL_SITES),
+    resilience=llm_resilience,
+    interactive_deadline_seconds=settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+    fallback=settings.LLM_FALLBACK_BACKEND or None
+)
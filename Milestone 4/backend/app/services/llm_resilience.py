@@ -0,0 +1,373 @@
+"""
+LLM Resilience - deadlines, retries, hedging and circuit breaking for LLM calls
+app/services/llm_resilience.py
+"""
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+import asyncio
+import random
+import time
+
+from ..config import settings
+from .gemini_transport import LLMError, LLMTimeoutError
+from .metrics import percentile
+
+
+class CircuitOpenError(LLMError):
+    """The backend's circuit is open; the call was not attempted"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, 429s, 5xx and connection failures are worth retrying; 4xx are not"""
+    if not isinstance(error, LLMError) or isinstance(error, CircuitOpenError):
+        return False
+    return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+
+
+def _record_outcome(breaker: "CircuitBreaker", error: Optional[BaseException]) -> None:
+    """Only outage-like failures count against the breaker; 429s mean the backend is up"""
+    if error is None or not isinstance(error, LLMError):
+        breaker.record_success()
+    elif error.status_code == 429:
+        breaker.record_inconclusive()
+    elif is_retryable(error):
+        breaker.record_failure()
+    else:
+        breaker.record_success()  # the backend answered; the request was bad
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After failure_threshold failures in a row the circuit opens and calls
+    fail fast. After reset_seconds one probe call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now"""
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_inconclusive(self) -> None:
+        """The call neither proved nor disproved health; free the probe slot"""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            self._probing = False
+
+
+class _BackendState:
+    """Breaker and recent successful attempt latencies of one backend"""
+
+    def __init__(self, breaker: CircuitBreaker, window: int):
+        self.breaker = breaker
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+
+class ResilienceLayer:
+    """
+    Wraps calls to remote LLM backends
+
+    - Each call has a deadline covering all of its attempts.
+    - Retryable failures are retried with full-jitter exponential backoff.
+    - With hedging on, a duplicate attempt starts once the first has run
+      longer than the backend's recent hedge_percentile latency; the first
+      success wins and the other attempt is cancelled.
+    - A circuit breaker per backend fails calls fast during an outage.
+    - The last good response for each prompt is kept, and served when a
+      call fails or the circuit is open.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: float = 120.0,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 8.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+        fallback_cache_size: int = 256,
+        latency_window: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.fallback_cache_size = fallback_cache_size
+        self.latency_window = latency_window
+        self.clock = clock
+        self.rng = rng
+
+        self._backends: Dict[str, _BackendState] = {}
+        self._responses: "OrderedDict[str, str]" = OrderedDict()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cached_fallbacks = 0
+
+    def _state(self, backend: str) -> _BackendState:
+        if backend not in self._backends:
+            self._backends[backend] = _BackendState(
+                CircuitBreaker(self.breaker_failure_threshold, self.breaker_reset_seconds, self.clock),
+                self.latency_window
+            )
+        return self._backends[backend]
+
+    def retry_delay(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number attempt (1-based)"""
+        return self.rng() * min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempt - 1))
+
+    def hedge_delay(self, backend: str) -> Optional[float]:
+        """When to send a duplicate attempt, or None if hedging is off or unwarranted"""
+        latencies = self._state(backend).latencies
+        if not self.hedge or len(latencies) < self.hedge_min_samples:
+            return None
+        return percentile(sorted(latencies), self.hedge_percentile)
+
+    def _remember(self, cache_key: Optional[str], text: str) -> None:
+        if cache_key is None or self.fallback_cache_size <= 0:
+            return
+        self._responses[cache_key] = text
+        self._responses.move_to_end(cache_key)
+        while len(self._responses) > self.fallback_cache_size:
+            self._responses.popitem(last=False)
+
+    async def call(
+        self,
+        backend: str,
+        attempt: Callable[[], Awaitable[str]],
+        cache_key: Optional[str] = None,
+        deadline_seconds: Optional[float] = None
+    ) -> str:
+        """
+        Run attempt() under the deadline, retry, hedge and breaker policy
+
+        Raises the last LLMError (LLMTimeoutError once the deadline passes,
+        CircuitOpenError while the circuit is open) unless a cached
+        response for cache_key can be served instead.
+        """
+        deadline = deadline_seconds or self.deadline_seconds
+        try:
+            text = await asyncio.wait_for(self._with_retries(backend, attempt), timeout=deadline)
+        except asyncio.TimeoutError:
+            error = LLMTimeoutError(f"{backend} call exceeded its {deadline:g}s deadline")
+        except LLMError as e:
+            error = e
+        else:
+            self._remember(cache_key, text)
+            return text
+
+        if cache_key is not None and cache_key in self._responses:
+            self.cached_fallbacks += 1
+            return self._responses[cache_key]
+        raise error
+
+    async def _with_retries(self, backend: str, attempt: Callable[[], Awaitable[str]]) -> str:
+        state = self._state(backend)
+        for number in range(1, self.max_attempts + 1):
+            if not state.breaker.allow():
+                raise CircuitOpenError(f"{backend} circuit is open")
+            probe = state.breaker.state == CircuitBreaker.HALF_OPEN
+            try:
+                text = await self._hedged(backend, attempt)
+            except LLMError as e:
+                _record_outcome(state.breaker, e)
+                if not is_retryable(e) or number == self.max_attempts:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry_delay(number))
+            except asyncio.CancelledError:
+                if probe:
+                    state.breaker.record_failure()  # the probe didn't answer in time
+                raise
+            else:
+                _record_outcome(state.breaker, None)
+                return text
+
+    async def _timed(self, backend: str, attempt: Callable[[], Awaitable[str]]) -> str:
+        started = self.clock()
+        text = await attempt()
+        self._state(backend).latencies.append(self.clock() - started)
+        return text
+
+    async def _hedged(self, backend: str, attempt: Callable[[], Awaitable[str]]) -> str:
+        """One attempt, plus a duplicate if the first runs past the hedge delay"""
+        delay = self.hedge_delay(backend)
+        if delay is None:
+            return await self._timed(backend, attempt)
+
+        first = asyncio.ensure_future(self._timed(backend, attempt))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedges += 1
+                pending.add(asyncio.ensure_future(self._timed(backend, attempt)))
+
+            error = None
+            while True:
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if succeeded[0] is not first:
+                        self.hedge_wins += 1
+                    return succeeded[0].result()
+                error = next(iter(done)).exception() if done else error
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(
+        self,
+        backend: str,
+        open_stream: Callable[[], AsyncIterator[str]],
+        deadline_seconds: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream with deadline, breaker and retries; once a piece has been
+        yielded the stream is committed and later failures are raised as
+        they are
+
+        The stream is driven by a task of its own, so it can be cancelled
+        when the deadline passes (raised as LLMTimeoutError) without
+        stepping the backend's generator from different tasks.
+        """
+        deadline = deadline_seconds or self.deadline_seconds
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for text in self._stream_with_retries(backend, open_stream):
+                    queue.put_nowait((text, None))
+            except Exception as e:
+                queue.put_nowait((None, e))
+            else:
+                queue.put_nowait((None, None))
+
+        task = asyncio.create_task(pump())
+        try:
+            while True:
+                # Pieces already received are passed on even if the consumer is
+                # slow; only waiting on the backend counts against the deadline
+                try:
+                    text, error = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    try:
+                        text, error = await asyncio.wait_for(queue.get(), timeout=max(expires_at - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        raise LLMTimeoutError(f"{backend} stream exceeded its {deadline:g}s deadline") from None
+                if error is not None:
+                    raise error
+                if text is None:
+                    return
+                yield text
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _stream_with_retries(
+        self,
+        backend: str,
+        open_stream: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        state = self._state(backend)
+        for number in range(1, self.max_attempts + 1):
+            if not state.breaker.allow():
+                raise CircuitOpenError(f"{backend} circuit is open")
+            started = False
+            try:
+                async for text in open_stream():
+                    started = True
+                    yield text
+            except LLMError as e:
+                _record_outcome(state.breaker, e)
+                if started or not is_retryable(e) or number == self.max_attempts:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry_delay(number))
+            except (GeneratorExit, asyncio.CancelledError):
+                # The consumer went away or the deadline passed; pieces so far
+                # show the backend was up
+                if started:
+                    state.breaker.record_success()
+                else:
+                    state.breaker.record_inconclusive()
+                raise
+            else:
+                _record_outcome(state.breaker, None)
+                return
+
+    def stats(self) -> Dict:
+        """Retry, hedge, fallback and breaker counters for the metrics endpoint"""
+        return {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "cached_fallbacks": self.cached_fallbacks,
+            "circuits": {name: state.breaker.state for name, state in sorted(self._backends.items())},
+        }
+
+
+# Singleton instance
+llm_resilience = ResilienceLayer(
+    deadline_seconds=settings.LLM_DEADLINE_SECONDS,
+    max_attempts=settings.LLM_MAX_ATTEMPTS,
+    retry_base_seconds=settings.LLM_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.LLM_RETRY_MAX_SECONDS,
+    hedge=settings.LLM_HEDGE_ENABLED,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    breaker_failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    breaker_reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+    fallback_cache_size=settings.LLM_FALLBACK_CACHE_SIZE
+)
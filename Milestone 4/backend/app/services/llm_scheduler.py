@@ -0,0 +1,223 @@
+"""
+LLM Scheduler - rate limiting, priorities and fair queuing for outbound LLM calls
+app/services/llm_scheduler.py
+"""
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+import asyncio
+import time
+
+from ..config import settings
+from .gemini_transport import LLMRateLimitError
+from .metrics import metrics
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+
+class TokenBucket:
+    """Refills at per_minute (scaled by the caller's rate factor) up to capacity"""
+
+    def __init__(self, per_minute: float, capacity: float, now: float):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, capacity)
+        self.level = self.capacity
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float, factor: float) -> float:
+        """Seconds until amount is available; 0 if it is available now"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute * factor / 60)
+        self.updated = now
+        # A request larger than the bucket waits for a full bucket, not forever
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / (self.per_minute * factor)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "course_id", "tokens", "enqueued_at")
+
+    def __init__(self, future, priority, course_id, tokens, enqueued_at):
+        self.future = future
+        self.priority = priority
+        self.course_id = course_id
+        self.tokens = tokens
+        self.enqueued_at = enqueued_at
+
+
+class LLMScheduler:
+    """
+    Central gate for outbound LLM calls
+
+    A call waits until both token buckets (requests and prompt tokens per
+    minute) have room and fewer than max_in_flight calls are running.
+    Waiting calls are served strictly by priority class, and round-robin
+    across courses within a class, so one course's large job can't hold
+    up everyone else's.
+
+    Rates adapt to the provider (AIMD): each 429 halves them and pauses
+    dispatch for the Retry-After period, and each success restores a
+    little of the configured rate.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_in_flight: int = 16,
+        burst_seconds: float = 60.0,
+        backoff_seconds: float = 5.0,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+        min_rate_factor: float = 0.05,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        now = clock()
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute * burst_seconds / 60, now) \
+            if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute * burst_seconds / 60, now) \
+            if tokens_per_minute > 0 else None
+        self.max_in_flight = max_in_flight
+        self.backoff_seconds = backoff_seconds
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_rate_factor = min_rate_factor
+
+        self.rate_factor = 1.0
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._paused_until = 0.0
+        # One queue per priority class: course_id -> waiters, in round-robin order
+        self._queues: List[OrderedDict] = [OrderedDict() for _ in PRIORITY_NAMES]
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND, course_id: Optional[int] = None, tokens: int = 1) -> None:
+        """Wait for a slot; every acquire must be paired with release()"""
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, course_id, tokens, self.clock())
+        self._queues[priority].setdefault(course_id, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()  # granted just as the caller gave up
+            else:
+                self._remove(waiter)
+            raise
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        """Return a slot, adapting the rate to how the call went"""
+        self.in_flight -= 1
+        if isinstance(error, LLMRateLimitError):
+            self.rate_limited += 1
+            self.rate_factor = max(self.min_rate_factor, self.rate_factor * self.decrease_factor)
+            pause = error.retry_after if error.retry_after is not None else self.backoff_seconds
+            self._paused_until = max(self._paused_until, self.clock() + pause)
+        elif error is None:
+            self.rate_factor = min(1.0, self.rate_factor + self.increase_step)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: int = PRIORITY_BACKGROUND,
+        course_id: Optional[int] = None,
+        tokens: int = 1
+    ) -> AsyncIterator[None]:
+        """Hold a slot for the duration of one call"""
+        await self.acquire(priority, course_id, tokens)
+        try:
+            yield
+        except BaseException as e:
+            self.release(e)
+            raise
+        else:
+            self.release()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        courses = self._queues[waiter.priority]
+        waiters = courses.get(waiter.course_id)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del courses[waiter.course_id]
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """Next waiter to serve, without removing it"""
+        for courses in self._queues:
+            if courses:
+                return next(iter(courses.values()))[0]
+        return None
+
+    def _pop(self, waiter: _Waiter) -> None:
+        courses = self._queues[waiter.priority]
+        waiters = courses[waiter.course_id]
+        waiters.popleft()
+        if waiters:
+            courses.move_to_end(waiter.course_id)  # next course gets the next turn
+        else:
+            del courses[waiter.course_id]
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued calls while limits allow"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self.in_flight < self.max_in_flight:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.future.done():  # cancelled, its task hasn't removed it yet
+                self._pop(waiter)
+                continue
+
+            now = self.clock()
+            delay = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now, self.rate_factor) if self.requests else 0.0,
+                self.tokens.wait_time(waiter.tokens, now, self.rate_factor) if self.tokens else 0.0
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            self._pop(waiter)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(waiter.tokens)
+            self.in_flight += 1
+            waiter.future.set_result(None)
+            metrics.observe(f"llm_queue_wait.{PRIORITY_NAMES[waiter.priority]}", now - waiter.enqueued_at)
+
+    def stats(self) -> Dict:
+        """Queue depths and limiter state for the metrics endpoint"""
+        return {
+            "queued": {
+                PRIORITY_NAMES[priority]: sum(len(waiters) for waiters in courses.values())
+                for priority, courses in enumerate(self._queues)
+            },
+            "queued_courses": len({course for courses in self._queues for course in courses}),
+            "in_flight": self.in_flight,
+            "rate_factor": self.rate_factor,
+            "rate_limited": self.rate_limited,
+            "paused_seconds": max(0.0, self._paused_until - self.clock()),
+        }
+
+
+# Singleton instance
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    backoff_seconds=settings.LLM_RATE_LIMIT_BACKOFF_SECONDS
+)
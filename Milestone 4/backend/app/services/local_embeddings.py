@@ -0,0 +1,103 @@
+"""
+Local Embeddings - sentence-transformers embedding model on the CPU
+app/services/local_embeddings.py
+"""
+from typing import List, Optional
+import asyncio
+import threading
+import time
+
+from .gemini_transport import LLMError
+
+LOCAL_EMBEDDING_BACKENDS = ("torch", "onnx", "openvino")
+
+
+class LocalEmbeddingModel:
+    """
+    sentence-transformers model running on the CPU
+
+    The model is loaded on first use (or by warm_up()), and batches are
+    encoded in a worker thread one at a time. backend="onnx" or
+    "openvino" uses sentence-transformers' exported runtimes, and
+    onnx_file picks a quantized export such as
+    "onnx/model_qint8_avx512_vnni.onnx". quantize=True applies dynamic
+    int8 quantization to the Linear layers of the torch backend.
+    sentence_transformers is only imported when the model is loaded.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch",
+        onnx_file: str = "",
+        quantize: bool = False,
+        batch_size: int = 32,
+        query_prefix: str = "",
+        document_prefix: str = ""
+    ):
+        if backend not in LOCAL_EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown local embedding backend {backend!r}; expected one of {LOCAL_EMBEDDING_BACKENDS}")
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.query_prefix = query_prefix
+        self.document_prefix = document_prefix
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_name(self) -> str:
+        """Identifies this model and runtime in embedding cache keys"""
+        variant = self.backend
+        if self.onnx_file:
+            variant += f":{self.onnx_file}"
+        if self.quantize:
+            variant += ":int8"
+        return f"local/{self.model_name}@{variant}"
+
+    def _load(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise LLMError("The local embedding backend needs the sentence-transformers package") from e
+
+        model_kwargs = {"file_name": self.onnx_file} if self.onnx_file and self.backend != "torch" else None
+        model = SentenceTransformer(self.model_name, device="cpu", backend=self.backend, model_kwargs=model_kwargs)
+        if self.quantize and self.backend == "torch":
+            import torch
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _get_model(self):
+        if self._model is None:
+            self._model = self._load()
+        return self._model
+
+    @property
+    def dimension(self) -> Optional[int]:
+        """Embedding size, once the model is loaded"""
+        return self._model.get_sentence_embedding_dimension() if self._model is not None else None
+
+    def embed(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """Encode texts into unit-length vectors (blocking)"""
+        prefix = self.query_prefix if task_type == "retrieval_query" else self.document_prefix
+        with self._lock:
+            vectors = self._get_model().encode(
+                [prefix + text for text in texts],
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return vectors.tolist()
+
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        return await asyncio.to_thread(self.embed, texts, task_type)
+
+    def warm_up(self) -> float:
+        """Load the model and run one batch; returns the seconds it took"""
+        started = time.perf_counter()
+        self.embed(["warm up"] * min(self.batch_size, 8))
+        return time.perf_counter() - started
@@ -0,0 +1,64 @@
+"""
+Metrics - in-process latency histograms
+app/services/metrics.py
+"""
+from collections import deque
+from typing import Deque, Dict
+import math
+import threading
+
+
+def percentile(ordered_values, pct: float) -> float:
+    """Nearest-rank percentile of already sorted values (pct in 0-100)"""
+    if not ordered_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered_values)))
+    return ordered_values[min(rank, len(ordered_values)) - 1]
+
+
+class LatencyHistogram:
+    """Keeps the most recent samples of one latency and summarizes them"""
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> Dict:
+        ordered = sorted(self._samples)
+        return {
+            "count": self.count,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """Named latency histograms, created on first observation"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record one latency sample in seconds"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.window)
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Summaries of every histogram, for the metrics endpoint"""
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self._histograms.items())}
+
+
+# Singleton instance
+metrics = MetricsRegistry()
@@ -0,0 +1,193 @@
+"""
+PDF Parsing Service - process pool with page-range sharding
+app/services/pdf_parsing_service.py
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+import asyncio
+import itertools
+import multiprocessing
+import os
+
+from ..config import settings
+from .text_cache import ExtractedTextStore, hash_bytes, hash_file
+from .text_extraction import (
+    DocumentSource,
+    Page,
+    count_pdf_pages,
+    extract_text_prefix,
+    iter_document_pages,
+    join_pages,
+    parse_pdf_page_range,
+)
+
+
+class PDFParsingService:
+    """
+    Runs CPU-bound PDF parsing in worker processes
+
+    Large PDFs are split into page-range shards that are parsed in parallel,
+    so one document uses several cores and the event loop stays free to serve
+    other requests.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        shard_pages: int = 20,
+        text_store: Optional[ExtractedTextStore] = None
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shard_pages = max(1, shard_pages)
+        self.text_store = text_store
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the pool on first use"""
+        if self._executor is None:
+            # spawn: forking a process that already runs threads (DB, Chroma) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop worker processes (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _shards(self, page_count: int) -> List[tuple]:
+        """Split a document into page ranges, one per worker at most"""
+        shard_size = max(self.shard_pages, -(-page_count // self.max_workers))
+        return [
+            (start, min(start + shard_size, page_count))
+            for start in range(0, page_count, shard_size)
+        ]
+
+    async def extract_pages(self, source: DocumentSource, file_type: str) -> List[Page]:
+        """
+        Extract all pages of a document off the event loop
+
+        PDFs already seen (by content hash) are served from the extracted
+        text store; otherwise they are parsed and the result is stored.
+        Shards are parsed in parallel and joined, so the returned list holds
+        every page of the document; iter_pages reads it in bounded memory.
+
+        Args:
+            source: File path (preferred) or bytes
+            file_type: MIME type of the document
+
+        Returns:
+            Pages in document order
+        """
+        if file_type != "application/pdf":
+            return await asyncio.to_thread(lambda: list(iter_document_pages(source, file_type)))
+
+        content_hash = None
+        if self.text_store is not None:
+            content_hash = await asyncio.to_thread(self._content_hash, source)
+            cached = await asyncio.to_thread(self.text_store.get, content_hash)
+            if cached is not None:
+                return cached
+
+        pages = await self._parse_pdf(source)
+
+        if self.text_store is not None:
+            await asyncio.to_thread(self.text_store.put, content_hash, pages)
+        return pages
+
+    def iter_pages(self, source: DocumentSource, file_type: str) -> Iterator[Page]:
+        """
+        Yield a document's pages in order (blocking; run it in a thread)
+
+        PDFs are parsed in worker processes in shards of shard_pages, with
+        at most max_workers shards in flight, so memory is bounded by that
+        window rather than by the document. Cached text is served from the
+        text store; streamed PDFs are not written back to it.
+        """
+        if file_type != "application/pdf":
+            yield from iter_document_pages(source, file_type)
+            return
+
+        if self.text_store is not None:
+            cached = self.text_store.get(self._content_hash(source))
+            if cached is not None:
+                yield from cached
+                return
+
+        executor = self._get_executor()
+        page_count = executor.submit(count_pdf_pages, source).result()
+        shards = (
+            (start, min(start + self.shard_pages, page_count))
+            for start in range(0, page_count, self.shard_pages)
+        )
+        pending = deque(
+            executor.submit(parse_pdf_page_range, source, start, end)
+            for start, end in itertools.islice(shards, self.max_workers)
+        )
+        try:
+            while pending:
+                pages = pending.popleft().result()
+                for start, end in itertools.islice(shards, 1):
+                    pending.append(executor.submit(parse_pdf_page_range, source, start, end))
+                yield from pages
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _parse_pdf(self, source: DocumentSource) -> List[Page]:
+        """Parse a PDF across worker processes, one shard per page range"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        page_count = await loop.run_in_executor(executor, count_pdf_pages, source)
+        shard_results = await asyncio.gather(*(
+            loop.run_in_executor(executor, parse_pdf_page_range, source, start, end)
+            for start, end in self._shards(page_count)
+        ))
+        return [page for shard in shard_results for page in shard]
+
+    @staticmethod
+    def _content_hash(source: DocumentSource) -> str:
+        if isinstance(source, (str, os.PathLike)):
+            return hash_file(source)
+        return hash_bytes(bytes(source))
+
+    async def extract_text(
+        self,
+        source: DocumentSource,
+        file_type: str,
+        max_chars: Optional[int] = None
+    ) -> str:
+        """
+        Extract a document's text off the event loop
+
+        With max_chars set and no cached copy, a single worker parses pages
+        in order and stops early; otherwise the full page list is used.
+        """
+        if max_chars is not None and file_type == "application/pdf" and self.text_store is not None:
+            content_hash = await asyncio.to_thread(self._content_hash, source)
+            cached = await asyncio.to_thread(self.text_store.get, content_hash)
+            if cached is not None:
+                return join_pages(cached, max_chars=max_chars)
+
+        if max_chars is not None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), extract_text_prefix, source, file_type, max_chars
+            )
+        return join_pages(await self.extract_pages(source, file_type))
+
+
+# Singleton instance
+pdf_parsing_service = PDFParsingService(
+    max_workers=settings.PDF_PARSE_WORKERS,
+    shard_pages=settings.PDF_PARSE_SHARD_PAGES,
+    text_store=ExtractedTextStore(
+        settings.TEXT_CACHE_DIR,
+        max_bytes=settings.TEXT_CACHE_MAX_BYTES
+    ) if settings.TEXT_CACHE_DIR else None
+)
@@ -3,130 +3,572 @@ RAG Service with ChromaDB
 """
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict
-import PyPDF2
-import io
+from chromadb.errors import InvalidCollectionException
+from typing import Awaitable, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+import asyncio
+import itertools
 import os
+import time
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Document  # Make sure this matches your project
 
 from ..config import settings
+from .chunking import Chunk, Chunker, build_chunker
 from .gemini_client import gemini_client
+from .lexical_index import LexicalIndexStore, reciprocal_rank_fusion
+from .metrics import metrics
+from .pdf_parsing_service import pdf_parsing_service
+from .text_cache import hash_bytes
+from .text_extraction import SUPPORTED_FILE_TYPES, Page
+
+
+def chunk_hash(chunk: str) -> str:
+    """Content hash identifying a chunk across documents and courses"""
+    return hash_bytes(chunk.encode("utf-8"))
 
 
 class RAGService:
-    """RAG service for document processing and querying"""
-
-    def __init__(self):
-        # Initialize ChromaDB
-        self.client = chromadb.Client(
-            ChromaSettings(
-                persist_directory=settings.CHROMA_PERSIST_DIRECTORY,
-                anonymized_telemetry=False
-            )
+    """
+    RAG service for document processing and querying
+
+    Each course gets its own ChromaDB collection on a persistent client,
+    so a query only searches the course's own chunks and the index
+    survives restarts. An injected collection is shared by all courses
+    and filtered by course_id instead (benchmarks / tests).
+
+    Hybrid queries also rank the course's chunks with an in-process BM25
+    index, rebuilt from the collection on first use, and fuse both
+    rankings with reciprocal rank fusion.
+    """
+
+    def __init__(
+        self,
+        collection=None,
+        chunker: Optional[Chunker] = None,
+        client=None,
+        collection_prefix: Optional[str] = None
+    ):
+        self.chunker = chunker or build_chunker(
+            settings.RAG_CHUNK_STRATEGY,
+            chunk_size=settings.RAG_CHUNK_SIZE,
+            overlap=settings.RAG_CHUNK_OVERLAP,
+            max_tokens=settings.RAG_CHUNK_MAX_TOKENS
         )
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=settings.CHROMA_COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"}
+        self.collection_prefix = collection_prefix or settings.CHROMA_COLLECTION_NAME
+        self._collections: Dict[int, object] = {}
+        self.lexical = LexicalIndexStore(self._load_course_texts, k1=settings.RAG_BM25_K1, b=settings.RAG_BM25_B)
+        self.lexical_budget_misses = 0
+
+        if collection is not None:
+            # Injected collection (benchmarks / tests)
+            self.client = client
+            self.collection = collection
+            return
+
+        # Initialize ChromaDB (on disk unless a client is injected)
+        self.client = client or chromadb.PersistentClient(
+            path=settings.CHROMA_PERSIST_DIRECTORY,
+            settings=ChromaSettings(anonymized_telemetry=False)
         )
+        self.collection = None
+
+    def collection_name(self, course_id: int) -> str:
+        """Name of a course's collection"""
+        return f"{self.collection_prefix}_course_{course_id}"
+
+    def _collection(self, course_id: int, create: bool = True):
+        """
+        The collection holding a course's chunks
+
+        Returns None if the course has no collection yet and create is False.
+        """
+        if self.collection is not None:
+            return self.collection
+
+        collection = self._collections.get(course_id)
+        if collection is None:
+            name = self.collection_name(course_id)
+            if create:
+                collection = self.client.get_or_create_collection(
+                    name=name,
+                    metadata={"hnsw:space": "cosine"}
+                )
+            else:
+                try:
+                    collection = self.client.get_collection(name=name)
+                except InvalidCollectionException:
+                    return None
+            self._collections[course_id] = collection
+        return collection
+
+    def _course_filter(self, course_id: int) -> Optional[Dict]:
+        """where clause for a course; only a shared collection needs one"""
+        return {"course_id": course_id} if self.collection is not None else None
+
+    def _load_course_texts(self, course_id: int) -> Tuple[List[str], List[str]]:
+        """All (ids, texts) stored for a course, for building its BM25 index"""
+        ids, texts = [], []
+        collection = self._collection(course_id, create=False)
+        if collection is None:
+            return ids, texts
+        batch_size = settings.RAG_INGEST_BATCH_SIZE
+        while True:
+            batch = collection.get(
+                where=self._course_filter(course_id),
+                limit=batch_size,
+                offset=len(ids),
+                include=["documents"]
+            )
+            ids.extend(batch["ids"])
+            texts.extend(batch["documents"])
+            if len(batch["ids"]) < batch_size:
+                return ids, texts
+
+    def course_ids(self) -> List[int]:
+        """Courses that have a collection on this client"""
+        prefix = f"{self.collection_prefix}_course_"
+        ids = []
+        for collection in self.client.list_collections():
+            suffix = collection.name[len(prefix):] if collection.name.startswith(prefix) else ""
+            if suffix.isdigit():
+                ids.append(int(suffix))
+        return sorted(ids)
+
+    def warm_up(self) -> Dict:
+        """
+        Open every course's collection and load its index
+
+        A persistent collection reads its HNSW index from disk on first
+        use; doing that at startup moves the cost off the first query.
+        """
+        started = time.perf_counter()
+        chunks = 0
+        course_ids = self.course_ids() if self.collection is None else []
+        for course_id in course_ids:
+            collection = self._collection(course_id, create=False)
+            count = collection.count()
+            chunks += count
+            if count:
+                sample = collection.get(limit=1, include=["embeddings"])
+                collection.query(query_embeddings=[list(sample["embeddings"][0])], n_results=1)
+        return {
+            "collections": len(course_ids),
+            "chunks": chunks,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def migrate_collection(self, source, batch_size: int = None) -> Dict[int, int]:
+        """
+        Copy a shared collection into per-course collections
+
+        Chunks keep their ids, embeddings, documents and metadata and are
+        upserted, so an interrupted migration can simply be run again.
+
+        Returns:
+            {course_id: chunks copied}
+        """
+        if batch_size is None:
+            batch_size = settings.RAG_INGEST_BATCH_SIZE
+
+        copied: Dict[int, int] = {}
+        offset = 0
+        while True:
+            batch = source.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not batch["ids"]:
+                break
+            by_course: Dict[int, List[int]] = {}
+            for i, metadata in enumerate(batch["metadatas"]):
+                by_course.setdefault(int(metadata["course_id"]), []).append(i)
+            for course_id, rows in by_course.items():
+                self._collection(course_id).upsert(
+                    ids=[batch["ids"][i] for i in rows],
+                    embeddings=[list(batch["embeddings"][i]) for i in rows],
+                    documents=[batch["documents"][i] for i in rows],
+                    metadatas=[batch["metadatas"][i] for i in rows]
+                )
+                self.lexical.add(course_id, [batch["ids"][i] for i in rows], [batch["documents"][i] for i in rows])
+                copied[course_id] = copied.get(course_id, 0) + len(rows)
+            offset += len(batch["ids"])
+        return copied
 
     async def process_document(
         self,
-        file_content: bytes,
+        file_path: str,
         file_type: str,
         document_id: int,
-        course_id: int
+        course_id: int,
+        progress: Optional[Callable[..., Awaitable[None]]] = None
     ) -> List[str]:
         """
         Process document and store in vector database
+
+        Pages stream from the parsing pool into the chunker, and chunks are
+        hashed, deduplicated, embedded and stored RAG_INGEST_BATCH_SIZE at a
+        time. Only the hashes of chunks already handled are kept across
+        batches, so memory does not grow with the document.
+
+        Args:
+            progress: Optional async callback receiving pages_parsed,
+                chunks_total and chunks_embedded keyword updates
+                (chunks_total grows as batches are read)
         """
-        # Extract text based on file type
-        if file_type == "application/pdf":
-            text = self._extract_text_from_pdf(file_content)
-        elif file_type == "text/plain":
-            text = file_content.decode('utf-8')
-        else:
+        if file_type not in SUPPORTED_FILE_TYPES:
             raise ValueError(f"Unsupported file type: {file_type}")
 
-        # Split into chunks
-        chunks = self._chunk_text(text)
+        pages_parsed = 0
 
-        # Generate embeddings
-        embeddings = await gemini_client.generate_embeddings(chunks)
+        def counted(pages: Iterable[Page]) -> Iterator[Page]:
+            nonlocal pages_parsed
+            for page in pages:
+                pages_parsed += 1
+                yield page
 
-        # Store in ChromaDB
-        ids = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk_id = f"doc_{document_id}_chunk_{i}"
-            ids.append(chunk_id)
-            self.collection.add(
-                ids=[chunk_id],
-                embeddings=[embedding],
-                documents=[chunk],
-                metadatas=[{
-                    "document_id": document_id,
-                    "course_id": course_id,
-                    "chunk_index": i
-                }]
-            )
+        def stream_chunks() -> Iterator[Chunk]:
+            yield from self.chunker.chunk(counted(pdf_parsing_service.iter_pages(file_path, file_type)))
+
+        batch_size = settings.RAG_INGEST_BATCH_SIZE
+        chunks = stream_chunks()
+        seen = set()  # hashes of chunks handled in earlier batches
+        ids: List[str] = []
+        chunk_count = chunks_total = chunks_embedded = stored_count = moved_count = 0
+        try:
+            while True:
+                # Chunking (and the parsing feeding it) blocks, so pull batches in a thread
+                batch = await asyncio.to_thread(lambda: list(itertools.islice(chunks, batch_size)))
+                if not batch:
+                    break
+
+                # Collapse repeated chunks and look up ones already in the store
+                unique_chunks: Dict[str, tuple] = {}
+                for offset, chunk in enumerate(batch):
+                    h = chunk_hash(chunk.text)
+                    if h not in seen:
+                        unique_chunks.setdefault(h, (chunk_count + offset, chunk))
+                chunk_count += len(batch)
+                existing = self._find_existing_chunks(list(unique_chunks), course_id)
+
+                # Generate embeddings only for content never seen before
+                to_embed = [h for h in unique_chunks if h not in existing]
+                chunks_total += len(to_embed)
+                if progress is not None:
+                    await progress(pages_parsed=pages_parsed, chunks_total=chunks_total,
+                                   chunks_embedded=chunks_embedded)
+
+                async def on_embedded(done: int) -> None:
+                    if progress is not None:
+                        await progress(chunks_embedded=chunks_embedded + done)
+
+                new_embeddings = await gemini_client.generate_embeddings(
+                    [unique_chunks[h][1].text for h in to_embed],
+                    on_progress=on_embedded
+                ) if to_embed else []
+                chunks_embedded += len(to_embed)
+                embedding_by_hash = dict(zip(to_embed, new_embeddings))
+
+                batch_ids = self._store_batch(unique_chunks, existing, embedding_by_hash, document_id, course_id)
+                seen.update(unique_chunks)
+                for chunk_id, stored, moved in batch_ids:
+                    ids.append(chunk_id)
+                    stored_count += stored
+                    moved_count += moved
+        finally:
+            try:
+                chunks.close()
+            except ValueError:
+                pass  # still inside a cancelled to_thread call; closed once collected
+
+        print(
+            f"Document {document_id}: {chunk_count} chunks, {chunks_embedded} embedded, "
+            f"{len(ids) - chunks_embedded} reused, {stored_count} stored, {moved_count} moved"
+        )
         return ids
 
+    def _store_batch(
+        self,
+        unique_chunks: Dict[str, tuple],
+        existing: Dict[str, Dict],
+        embedding_by_hash: Dict[str, List[float]],
+        document_id: int,
+        course_id: int
+    ) -> List[tuple]:
+        """
+        Store one batch of a document's chunks in ChromaDB
+
+        Reuses this course's copy of a chunk if there is one (moving its
+        metadata to this position when it is this document's own row),
+        otherwise adds an entry with a reused or fresh embedding.
+
+        Returns:
+            (chunk_id, stored, moved) per chunk, in unique_chunks order
+        """
+        results = []
+        new_ids, new_embeddings, new_documents, new_metadatas = [], [], [], []
+        moved_ids, moved_metadatas = [], []
+        for h, (i, chunk) in unique_chunks.items():
+            match = existing.get(h)
+            metadata = {
+                "document_id": document_id,
+                "course_id": course_id,
+                "chunk_index": i,
+                "chunk_hash": h,
+                **chunk.metadata()
+            }
+            if match and course_id in match["ids_by_course"]:
+                chunk_id = match["ids_by_course"][course_id]
+                stored = match["metadata_by_course"][course_id]
+                moved = False
+                # Another document's row keeps its own metadata
+                if stored.get("document_id") == document_id:
+                    # Chroma merges metadata on update, so keys this position
+                    # lacks (e.g. heading) are blanked rather than left stale
+                    metadata = {**{key: "" for key in stored if key not in metadata}, **metadata}
+                    if metadata != stored:
+                        moved_ids.append(chunk_id)
+                        moved_metadatas.append(metadata)
+                        moved = True
+                results.append((chunk_id, False, moved))
+                continue
+
+            chunk_id = f"doc_{document_id}_chunk_{h[:16]}"
+            new_ids.append(chunk_id)
+            new_embeddings.append(match["embedding"] if match else embedding_by_hash[h])
+            new_documents.append(chunk.text)
+            new_metadatas.append(metadata)
+            results.append((chunk_id, True, False))
+        self._store_chunks(new_ids, new_embeddings, new_documents, new_metadatas, course_id=course_id)
+        self._update_metadatas(moved_ids, moved_metadatas, course_id=course_id)
+        return results
+
+    def _find_existing_chunks(self, hashes: List[str], course_id: int) -> Dict[str, Dict]:
+        """
+        Find stored chunks by content hash
+
+        Looks in the course's collection; repeats from other courses are
+        served by the embedding cache instead. A shared collection is
+        searched as a whole, so its chunks from other courses are reused.
+
+        Returns:
+            {chunk_hash: {"embedding": [...], "ids_by_course": {course_id: chunk_id},
+                          "metadata_by_course": {course_id: metadata}}}
+        """
+        found: Dict[str, Dict] = {}
+        collection = self._collection(course_id, create=False)
+        if collection is None:
+            return found
+        batch_size = settings.RAG_INGEST_BATCH_SIZE
+        for start in range(0, len(hashes), batch_size):
+            result = collection.get(
+                where={"chunk_hash": {"$in": hashes[start:start + batch_size]}},
+                include=["embeddings", "metadatas"]
+            )
+            for chunk_id, embedding, metadata in zip(
+                result["ids"], result["embeddings"], result["metadatas"]
+            ):
+                entry = found.setdefault(
+                    metadata["chunk_hash"],
+                    {"embedding": [float(v) for v in embedding], "ids_by_course": {}, "metadata_by_course": {}}
+                )
+                if metadata["course_id"] not in entry["ids_by_course"]:
+                    entry["ids_by_course"][metadata["course_id"]] = chunk_id
+                    entry["metadata_by_course"][metadata["course_id"]] = metadata
+        return found
+
+    def _store_chunks(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict],
+        batch_size: int = None,
+        course_id: Optional[int] = None
+    ) -> None:
+        """Write chunks to ChromaDB in bulk batches"""
+        if batch_size is None:
+            batch_size = settings.RAG_INGEST_BATCH_SIZE
+        if not ids:
+            return
+
+        collection = self._collection(course_id)
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
+
+        # Keep loaded BM25 indexes in step with the collection
+        by_course: Dict[int, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            chunk_course = metadata.get("course_id", course_id)
+            if chunk_course is not None:
+                by_course.setdefault(chunk_course, []).append(i)
+        for chunk_course, rows in by_course.items():
+            self.lexical.add(chunk_course, [ids[i] for i in rows], [documents[i] for i in rows])
+
+    def _update_metadatas(
+        self,
+        ids: List[str],
+        metadatas: List[Dict],
+        batch_size: int = None,
+        course_id: Optional[int] = None
+    ) -> None:
+        """Rewrite the metadata of stored chunks in bulk batches"""
+        if batch_size is None:
+            batch_size = settings.RAG_INGEST_BATCH_SIZE
+        if not ids:
+            return
+
+        collection = self._collection(course_id)
+        for start in range(0, len(ids), batch_size):
+            collection.update(ids=ids[start:start + batch_size], metadatas=metadatas[start:start + batch_size])
+
+    def delete_chunks(self, ids: List[str], course_id: Optional[int] = None, batch_size: int = None) -> None:
+        """Remove chunks from a course's collection in bulk batches"""
+        if batch_size is None:
+            batch_size = settings.RAG_INGEST_BATCH_SIZE
+
+        collection = self._collection(course_id, create=False)
+        if collection is None:
+            return
+        for start in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[start:start + batch_size])
+        self.lexical.remove(ids, course_id)
+
     async def query(
         self,
         query_text: str,
         course_id: int,
-        top_k: int = None
+        top_k: int = None,
+        query_embedding: Optional[List[float]] = None,
+        mode: Optional[str] = None
     ) -> List[Dict]:
         """
         Query the knowledge base
+
+        Args:
+            query_embedding: Precomputed embedding of query_text, if the
+                caller already has one
+            mode: "dense" or "hybrid" (default settings.RAG_RETRIEVAL_MODE)
         """
         if top_k is None:
             top_k = settings.RAG_TOP_K
+        mode = mode or settings.RAG_RETRIEVAL_MODE
+
+        collection = self._collection(course_id, create=False)
+        if collection is None:
+            return []
 
         # Generate query embedding
-        query_embedding = await gemini_client.generate_embeddings([query_text])
+        if query_embedding is None:
+            query_embedding = (await gemini_client.generate_embeddings(
+                [query_text],
+                task_type="retrieval_query"
+            ))[0]
 
-        # Query ChromaDB
-        results = self.collection.query(
-            query_embeddings=query_embedding,
+        if mode == "hybrid" and settings.RAG_HYBRID_LEXICAL_WEIGHT > 0:
+            return await self._hybrid_query(collection, query_text, course_id, top_k, query_embedding)
+
+        # Query ChromaDB off the event loop
+        results = await asyncio.to_thread(
+            collection.query,
+            query_embeddings=[query_embedding],
             n_results=top_k,
-            where={"course_id": course_id}
+            where=self._course_filter(course_id)
         )
+        return self._format_results(results)
 
-        # Format results
+    @staticmethod
+    def _format_results(results: Dict) -> List[Dict]:
         formatted_results = []
         if results['documents'] and results['documents'][0]:
             for i in range(len(results['documents'][0])):
                 formatted_results.append({
+                    "id": results['ids'][0][i],
                     "text": results['documents'][0][i],
                     "metadata": results['metadatas'][0][i],
-                    "distance": results['distances'][0][i] if 'distances' in results else None
+                    "distance": results['distances'][0][i] if results.get('distances') else None
                 })
         return formatted_results
 
-    def _extract_text_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF file"""
-        pdf_file = io.BytesIO(file_content)
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text
-
-    def _chunk_text(self, text: str) -> List[str]:
-        """Split text into chunks with overlap"""
-        chunk_size = settings.RAG_CHUNK_SIZE
-        overlap = settings.RAG_CHUNK_OVERLAP
-        words = text.split()
-        chunks = []
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk:
-                chunks.append(chunk)
-        return chunks
+    def _lexical_search(self, query_text: str, course_id: int, top_k: int) -> List[str]:
+        started = time.perf_counter()
+        ranked = self.lexical.get(course_id).search(query_text, top_k)
+        metrics.observe("rag.lexical", time.perf_counter() - started)
+        return [chunk_id for chunk_id, _ in ranked]
+
+    async def _hybrid_query(
+        self,
+        collection,
+        query_text: str,
+        course_id: int,
+        top_k: int,
+        query_embedding: List[float]
+    ) -> List[Dict]:
+        """
+        Dense and BM25 rankings fused with weighted reciprocal rank fusion
+
+        The BM25 leg (including building the course's index on first use)
+        gets RAG_HYBRID_BUDGET_MS; if it is not done by then the dense
+        ranking is returned alone and the index keeps building in the
+        background for the next query.
+        """
+        candidates = max(top_k, settings.RAG_HYBRID_CANDIDATES)
+        started = time.perf_counter()
+        lexical_task = asyncio.ensure_future(
+            asyncio.to_thread(self._lexical_search, query_text, course_id, candidates)
+        )
+        dense = self._format_results(await asyncio.to_thread(
+            collection.query,
+            query_embeddings=[query_embedding],
+            n_results=candidates,
+            where=self._course_filter(course_id)
+        ))
+
+        remaining = settings.RAG_HYBRID_BUDGET_MS / 1000 - (time.perf_counter() - started)
+        done, _ = await asyncio.wait({lexical_task}, timeout=max(remaining, 0))
+        if lexical_task not in done:
+            self.lexical_budget_misses += 1
+            lexical_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            return dense[:top_k]
+        lexical_ids = lexical_task.result()
+
+        fused = reciprocal_rank_fusion(
+            [[r["id"] for r in dense], lexical_ids],
+            weights=[settings.RAG_HYBRID_DENSE_WEIGHT, settings.RAG_HYBRID_LEXICAL_WEIGHT],
+            k=settings.RAG_HYBRID_RRF_K
+        )[:top_k]
+
+        # Lexical-only hits are fetched, with a distance so confidence stays comparable
+        by_id = {r["id"]: r for r in dense}
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in by_id]
+        if missing:
+            stored = await asyncio.to_thread(
+                collection.get, ids=missing, include=["documents", "metadatas", "embeddings"]
+            )
+            query_vector = np.asarray(query_embedding, dtype=float)
+            query_norm = np.linalg.norm(query_vector) or 1.0
+            for chunk_id, text, metadata, embedding in zip(
+                stored["ids"], stored["documents"], stored["metadatas"], stored["embeddings"]
+            ):
+                vector = np.asarray(embedding, dtype=float)
+                similarity = float(vector @ query_vector) / ((np.linalg.norm(vector) or 1.0) * query_norm)
+                by_id[chunk_id] = {"id": chunk_id, "text": text, "metadata": metadata, "distance": 1 - similarity}
+
+        return [
+            {**by_id[chunk_id], "score": score}
+            for chunk_id, score in fused if chunk_id in by_id
+        ]
+
+    def stats(self) -> Dict:
+        """Lexical index counters for the metrics endpoint"""
+        return {**self.lexical.stats(), "lexical_budget_misses": self.lexical_budget_misses}
 
 
 # Singleton instance
@@ -146,23 +588,13 @@ async def extract_text_from_documents(
             continue
         # Adapt according to your document model!
         if hasattr(doc, "file_path") and doc.file_path:
-            # Read file from disk
-            with open(doc.file_path, "rb") as f:
-                file_content = f.read()
-            if doc.file_type == "application/pdf":
-                text = rag_service._extract_text_from_pdf(file_content)
-            elif doc.file_type == "text/plain":
-                text = file_content.decode("utf-8")
-            else:
-                continue
-            result.append(text)
+            # Workers memory-map the file on disk
+            source = doc.file_path
         elif hasattr(doc, "file_content") and doc.file_content:
-            # file_content is bytes
-            if doc.file_type == "application/pdf":
-                text = rag_service._extract_text_from_pdf(doc.file_content)
-            elif doc.file_type == "text/plain":
-                text = doc.file_content.decode("utf-8")
-            else:
-                continue
-            result.append(text)
+            source = doc.file_content
+        else:
+            continue
+        if doc.file_type not in SUPPORTED_FILE_TYPES:
+            continue
+        result.append(await pdf_parsing_service.extract_text(source, doc.file_type))
     return result
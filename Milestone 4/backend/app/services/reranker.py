@@ -0,0 +1,147 @@
+"""
+Reranker - reorders retrieved chunks before they go into the prompt
+app/services/reranker.py
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import asyncio
+import threading
+import time
+
+from ..config import settings
+from .chunking import estimate_tokens
+from .lexical_index import tokenize
+from .metrics import metrics
+
+
+class RerankerError(Exception):
+    """A reranker could not be loaded or run"""
+
+
+class Reranker(ABC):
+    """Scores (query, chunk) pairs; higher is more relevant"""
+
+    name: str = "reranker"
+
+    @abstractmethod
+    def score(self, query: str, candidates: List[Dict]) -> List[float]:
+        """One score per candidate (dicts with text and distance)"""
+
+
+class CrossEncoderReranker(Reranker):
+    """
+    sentence-transformers cross-encoder running on the CPU
+
+    The model is loaded on first use; sentence_transformers is only
+    imported then.
+    """
+
+    name = "cross-encoder"
+
+    def __init__(self, model_name: str, max_length: int = 512, batch_size: int = 16):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise RerankerError("The cross-encoder reranker needs the sentence-transformers package") from e
+        return CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+
+    def score(self, query: str, candidates: List[Dict]) -> List[float]:
+        with self._lock:
+            if self._model is None:
+                self._model = self._load()
+            scores = self._model.predict(
+                [(query, c["text"]) for c in candidates],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+        return [float(s) for s in scores]
+
+
+class OverlapReranker(Reranker):
+    """
+    Lightweight reranker without a model
+
+    Blends the share of query terms a chunk contains with its vector
+    similarity. Useful where a cross-encoder is too slow or unavailable.
+    """
+
+    name = "overlap"
+
+    def __init__(self, term_weight: float = 0.5):
+        self.term_weight = term_weight
+
+    def score(self, query: str, candidates: List[Dict]) -> List[float]:
+        query_terms = set(tokenize(query))
+        scores = []
+        for c in candidates:
+            coverage = len(query_terms & set(tokenize(c["text"]))) / len(query_terms) if query_terms else 0.0
+            similarity = 1 - c["distance"] if c.get("distance") is not None else 0.0
+            scores.append(self.term_weight * coverage + (1 - self.term_weight) * similarity)
+        return scores
+
+
+def build_reranker(name: str, model_name: str) -> Reranker:
+    """Reranker for a RAG_RERANK_BACKEND name"""
+    if name == "cross-encoder":
+        return CrossEncoderReranker(model_name)
+    if name == "overlap":
+        return OverlapReranker()
+    raise ValueError(f"Unknown reranker {name!r}; expected cross-encoder or overlap")
+
+
+class RerankStage:
+    """
+    Rerank a candidate pool and keep the best chunks within a token budget
+
+    Scoring runs in a worker thread. Chunks are kept in score order until
+    top_n are kept or the next one would exceed token_budget; the best
+    chunk is always kept. If the reranker fails, the retrieval order is
+    used. Each call records its latency in the rag.rerank histogram.
+    """
+
+    def __init__(self, reranker: Reranker, top_n: int = 3, token_budget: int = 1500):
+        self.reranker = reranker
+        self.top_n = top_n
+        self.token_budget = token_budget
+
+    async def rerank(self, query: str, candidates: List[Dict]) -> List[Dict]:
+        if not candidates:
+            return []
+
+        started = time.perf_counter()
+        scores: Optional[List[float]] = None
+        try:
+            scores = await asyncio.to_thread(self.reranker.score, query, candidates)
+        except Exception as e:
+            print(f"Reranker {self.reranker.name} failed, keeping retrieval order: {e}")
+        metrics.observe("rag.rerank", time.perf_counter() - started)
+
+        if scores is None:
+            ranked = list(candidates)
+        else:
+            order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+            ranked = [{**candidates[i], "rerank_score": scores[i]} for i in order]
+
+        kept, tokens = [], 0
+        for doc in ranked:
+            doc_tokens = estimate_tokens(doc["text"])
+            if kept and (len(kept) >= self.top_n or tokens + doc_tokens > self.token_budget):
+                break
+            kept.append(doc)
+            tokens += doc_tokens
+        return kept
+
+
+# Singleton instance
+rerank_stage = RerankStage(
+    build_reranker(settings.RAG_RERANK_BACKEND, settings.RAG_RERANK_MODEL),
+    top_n=settings.RAG_RERANK_TOP_N,
+    token_budget=settings.RAG_CONTEXT_TOKEN_BUDGET
+)
@@ -1,6 +1,7 @@
 from app.schemas import SlideDeckControls, SlideCreate
 from typing import List
-from app.services.gemini_client import get_gemini_content
+import json
+from app.services.llm_backend import llm_router
 from app.services.rag_service import extract_text_from_documents
 
 async def generate_slides_with_gemini(
@@ -29,7 +30,7 @@ async def generate_slides_with_gemini(
         {reference_text}
         """
     )
-    slide_json = await get_gemini_content(prompt, response_format="json")  # List[dict]
+    slide_json = json.loads(await llm_router.generate("slide_deck.slides", prompt))  # List[dict]
     slides = [SlideCreate(**slide) for slide in slide_json]
     return slides
 
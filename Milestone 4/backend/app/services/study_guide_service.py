@@ -2,9 +2,13 @@
 Study Guide Generator Service
 app/services/study_guide_service.py
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
+import asyncio
+
+from ..config import settings
+from .transcript_index import TranscriptIndex
 from .youtube_service import youtube_service
-from .gemini_client import gemini_client
+from .llm_backend import llm_router
 
 
 class StudyGuideService:
@@ -15,7 +19,8 @@ class StudyGuideService:
         video_id: str,
         transcript: List[Dict],
         priority_segments: List[Dict],
-        title: str
+        title: str,
+        course_id: Optional[int] = None
     ) -> Dict:
         """
         Generate comprehensive study guide from priority segments
@@ -25,38 +30,43 @@ class StudyGuideService:
             transcript: Full video transcript
             priority_segments: List of {start, end, priority} segments
             title: Study guide title
+            course_id: Course the guide belongs to (for fair LLM scheduling)
 
         Returns:
             Dict with content, key_topics, segments
         """
-        # Extract text from each priority segment
-        segment_analyses = []
-
-        for segment in priority_segments:
-            segment_text = youtube_service.extract_segment_transcript(
-                transcript,
-                segment['start'],
-                segment['end']
-            )
-
-            # Generate summary and key points for this segment
-            segment_analysis = await self._analyze_segment(
-                segment_text,
-                segment['start'],
-                segment['end'],
-                segment.get('priority', 'medium')
-            )
-
-            segment_analyses.append(segment_analysis)
-
-        # Generate comprehensive study guide
-        study_guide_content = await self._generate_comprehensive_guide(
-            title,
-            segment_analyses
+        # Look up every segment's text in one pass over a time index
+        segment_texts = TranscriptIndex(transcript).texts_between(
+            [(segment['start'], segment['end']) for segment in priority_segments]
         )
 
-        # Extract key topics
-        key_topics = await self._extract_key_topics(segment_analyses)
+        # Analyze segments concurrently (bounded); results stay in segment order
+        semaphore = asyncio.Semaphore(max(1, settings.STUDY_GUIDE_SEGMENT_CONCURRENCY))
+
+        async def analyze(segment: Dict, segment_text: str) -> Dict:
+            async with semaphore:
+                return await self._analyze_segment(
+                    segment_text,
+                    segment['start'],
+                    segment['end'],
+                    segment.get('priority', 'medium'),
+                    course_id
+                )
+
+        segment_analyses = list(await asyncio.gather(*(
+            analyze(segment, text) for segment, text in zip(priority_segments, segment_texts)
+        )))
+
+        # Failed segments are kept (with their transcript) but left out of the guide
+        analyzed = [seg for seg in segment_analyses if not seg.get('error')]
+        if segment_analyses and not analyzed:
+            raise RuntimeError(f"All {len(segment_analyses)} segment analyses failed")
+
+        # The guide and the key topics only depend on the analyses
+        study_guide_content, key_topics = await asyncio.gather(
+            self._generate_comprehensive_guide(title, analyzed, course_id),
+            self._extract_key_topics(analyzed, course_id)
+        )
 
         return {
             "content": study_guide_content,
@@ -69,7 +79,8 @@ class StudyGuideService:
         text: str,
         start: int,
         end: int,
-        priority: str
+        priority: str,
+        course_id: Optional[int] = None
     ) -> Dict:
         """Analyze a single video segment"""
 
@@ -93,9 +104,11 @@ KEY POINTS:
 """
 
         try:
-            response = await gemini_client.generate_completion(
+            response = await llm_router.generate(
+                "study_guide.segment",
                 prompt=prompt,
-                temperature=0.7
+                temperature=0.7,
+                course_id=course_id
             )
 
             # Parse response
@@ -117,13 +130,15 @@ KEY POINTS:
                 "transcript": text,
                 "priority": priority,
                 "summary": "Error generating summary",
-                "key_points": []
+                "key_points": [],
+                "error": str(e)
             }
 
     async def _generate_comprehensive_guide(
         self,
         title: str,
-        segment_analyses: List[Dict]
+        segment_analyses: List[Dict],
+        course_id: Optional[int] = None
     ) -> str:
         """Generate comprehensive study guide from all segments"""
 
@@ -152,9 +167,11 @@ Format in Markdown. Be educational, clear, and concise.
 """
 
         try:
-            study_guide = await gemini_client.generate_completion(
+            study_guide = await llm_router.generate(
+                "study_guide.guide",
                 prompt=prompt,
-                temperature=0.7
+                temperature=0.7,
+                course_id=course_id
             )
             return study_guide
         except Exception as e:
@@ -162,7 +179,7 @@ Format in Markdown. Be educational, clear, and concise.
             # Fallback: simple concatenation
             return self._create_fallback_guide(title, segment_analyses)
 
-    async def _extract_key_topics(self, segment_analyses: List[Dict]) -> List[str]:
+    async def _extract_key_topics(self, segment_analyses: List[Dict], course_id: Optional[int] = None) -> List[str]:
         """Extract key topics from all segments"""
 
         all_key_points = []
@@ -172,7 +189,7 @@ Format in Markdown. Be educational, clear, and concise.
         if not all_key_points:
             return []
 
-        # Use Gemini to identify main topics
+        # Use the LLM to identify main topics
         prompt = f"""Given these key points from a video, identify the 5-10 main topics/themes:
 
 {chr(10).join(f"- {point}" for point in all_key_points)}
@@ -181,9 +198,11 @@ Return only the topic names, one per line.
 """
 
         try:
-            response = await gemini_client.generate_completion(
+            response = await llm_router.generate(
+                "study_guide.topics",
                 prompt=prompt,
-                temperature=0.5
+                temperature=0.5,
+                course_id=course_id
             )
 
             topics = [line.strip('- ').strip() for line in response.split('\n') if line.strip()]
@@ -0,0 +1,115 @@
+"""
+Extracted Text Store - content-addressed cache of parsed documents
+app/services/text_cache.py
+"""
+from typing import List, Optional
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+from .text_extraction import Page
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_bytes(data: bytes) -> str:
+    """SHA-256 hex digest of raw content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 hex digest of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractedTextStore:
+    """
+    On-disk store mapping a document content hash to its extracted pages
+
+    Each entry is one gzip file holding the concatenated page text plus the
+    page numbers and character offsets needed to split it back into pages.
+    Reads refresh an entry's mtime, and writes evict least recently used
+    entries once the directory grows past max_bytes.
+    """
+
+    _suffix = ".json.gz"
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{content_hash}{self._suffix}")
+
+    def get(self, content_hash: str) -> Optional[List[Page]]:
+        """Return cached pages, or None on a miss"""
+        path = self._path(content_hash)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+        text = entry["text"]
+        offsets = entry["offsets"] + [len(text)]
+        return [
+            Page(page_number, text[offsets[i]:offsets[i + 1]])
+            for i, page_number in enumerate(entry["page_numbers"])
+        ]
+
+    def put(self, content_hash: str, pages: List[Page]) -> None:
+        """Store pages for a content hash, then enforce the size limit"""
+        offsets = []
+        position = 0
+        for page in pages:
+            offsets.append(position)
+            position += len(page.text)
+        entry = {
+            "page_numbers": [page.page_number for page in pages],
+            "offsets": offsets,
+            "text": "".join(page.text for page in pages),
+        }
+
+        # Write to a temp file and rename so readers never see partial entries
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(content_hash))
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(self._suffix):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,122 @@
+"""
+Document Text Extraction - streaming, page-level
+app/services/text_extraction.py
+"""
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+import io
+import mmap
+import os
+
+import PyPDF2
+
+# A file path, raw bytes, or an already memory-mapped buffer
+DocumentSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
+
+SUPPORTED_FILE_TYPES = ("application/pdf", "text/plain")
+
+
+class Page(NamedTuple):
+    """Text of a single page (1-based page number)"""
+    page_number: int
+    text: str
+
+
+@contextmanager
+def _open_stream(source: DocumentSource):
+    """Open a seekable binary stream over the source without copying it"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map empty files; let the parser report it
+                yield f
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+    elif isinstance(source, mmap.mmap):
+        yield source
+    else:
+        yield io.BytesIO(source)
+
+
+def iter_pdf_pages(
+    source: DocumentSource,
+    start_page: int = 0,
+    end_page: Optional[int] = None
+) -> Iterator[Page]:
+    """
+    Lazily yield the text of each PDF page
+
+    Files are memory-mapped rather than read into memory, and only one page's
+    text is held at a time. Pages without extractable text are skipped.
+
+    Args:
+        source: File path, bytes or memory-mapped buffer
+        start_page: First page index to extract (0-based, inclusive)
+        end_page: Last page index (exclusive); defaults to the end of the document
+    """
+    with _open_stream(source) as stream:
+        reader = PyPDF2.PdfReader(stream)
+        total = len(reader.pages)
+        end = total if end_page is None else min(end_page, total)
+        for index in range(start_page, end):
+            text = reader.pages[index].extract_text()
+            if text:
+                yield Page(index + 1, text)
+
+
+def count_pdf_pages(source: DocumentSource) -> int:
+    """Number of pages in a PDF (parses the page tree only)"""
+    with _open_stream(source) as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def parse_pdf_page_range(source: DocumentSource, start_page: int, end_page: int) -> List[Page]:
+    """Extract one page range eagerly (picklable entry point for worker processes)"""
+    return list(iter_pdf_pages(source, start_page, end_page))
+
+
+def extract_text_prefix(source: DocumentSource, file_type: str, max_chars: Optional[int]) -> str:
+    """Extract a document's text, stopping after max_chars (worker entry point)"""
+    return join_pages(iter_document_pages(source, file_type), max_chars=max_chars)
+
+
+def iter_document_pages(source: DocumentSource, file_type: str) -> Iterator[Page]:
+    """
+    Yield pages for any supported document type
+
+    Plain-text documents are returned as a single page.
+    """
+    if file_type == "application/pdf":
+        yield from iter_pdf_pages(source)
+    elif file_type == "text/plain":
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                content = f.read()
+        else:
+            content = bytes(source)
+        text = content.decode("utf-8")
+        if text:
+            yield Page(1, text)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def join_pages(pages: Iterable[Page], max_chars: Optional[int] = None) -> str:
+    """
+    Join page texts into one string, one page per line block
+
+    With max_chars set, stops pulling pages once enough text has been
+    collected, so callers that only need a prefix never parse the rest.
+    """
+    parts = []
+    total = 0
+    for page in pages:
+        parts.append(page.text)
+        parts.append("\n")
+        total += len(page.text) + 1
+        if max_chars is not None and total >= max_chars:
+            break
+
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
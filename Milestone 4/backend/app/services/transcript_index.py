@@ -0,0 +1,74 @@
+"""
+Transcript Index - time-range lookup over caption entries
+app/services/transcript_index.py
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Batch lookups switch to NumPy searchsorted at this many entries
+NUMPY_MIN_ENTRIES = 1000
+
+
+class TranscriptIndex:
+    """
+    Caption entries sorted by start time, for fast time-range lookups
+
+    An entry belongs to [start, end] when it overlaps it: it starts at or
+    before end and finishes (start + duration) at or after start. Entries
+    that start by end are a prefix of the sorted list, found by bisect.
+    The lower bound bisects the running maximum of finish times, which is
+    non-decreasing even when captions overlap; the few entries between
+    that bound and the first one that actually overlaps are skipped.
+
+    A lookup costs O(log n + matches) instead of a scan of the whole
+    transcript. texts_between() looks up many ranges at once, vectorized
+    with NumPy for long transcripts.
+    """
+
+    def __init__(self, entries: Sequence[Dict]):
+        self.entries: List[Dict] = sorted(entries, key=lambda entry: entry['start'])
+        self._starts = [entry['start'] for entry in self.entries]
+        self._ends = [entry['start'] + entry['duration'] for entry in self.entries]
+        self._reach = list(accumulate(self._ends, max))  # latest finish so far
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _bounds(self, start: float, end: float) -> Tuple[int, int]:
+        return bisect_left(self._reach, start), bisect_right(self._starts, end)
+
+    def _bounds_many(self, ranges: Sequence[Tuple[float, float]]) -> List[Tuple[int, int]]:
+        if len(self.entries) < NUMPY_MIN_ENTRIES:
+            return [self._bounds(start, end) for start, end in ranges]
+
+        if self._arrays is None:
+            self._arrays = (np.asarray(self._reach, dtype=np.float64), np.asarray(self._starts, dtype=np.float64))
+        reach, starts = self._arrays
+        range_starts, range_ends = np.asarray(ranges, dtype=np.float64).reshape(-1, 2).T
+        lows = np.searchsorted(reach, range_starts, side="left")
+        highs = np.searchsorted(starts, range_ends, side="right")
+        return list(zip(lows.tolist(), highs.tolist()))
+
+    def _select(self, start: float, low: int, high: int) -> List[Dict]:
+        return [self.entries[i] for i in range(low, high) if self._ends[i] >= start]
+
+    def entries_between(self, start: float, end: float) -> List[Dict]:
+        """Entries overlapping [start, end] seconds, in time order"""
+        return self._select(start, *self._bounds(start, end))
+
+    def text_between(self, start: float, end: float) -> str:
+        """Caption text overlapping [start, end] seconds"""
+        return ' '.join(entry['text'] for entry in self.entries_between(start, end))
+
+    def texts_between(self, ranges: Sequence[Tuple[float, float]]) -> List[str]:
+        """text_between() for many (start, end) ranges"""
+        if not ranges:
+            return []
+        return [
+            ' '.join(entry['text'] for entry in self._select(start, low, high))
+            for (start, _), (low, high) in zip(ranges, self._bounds_many(ranges))
+        ]
@@ -1,12 +1,9 @@
-import asyncio
 import datetime
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import WorkflowRequest, WorkflowStatus
-from langchain_google_genai import ChatGoogleGenerativeAI
-import langchain
 from typing import Optional
-from app.config import settings
+from app.services.llm_backend import llm_router
 
 def build_workflow_agent_prompt(request: WorkflowRequest, requester_history: Optional[str] = None) -> str:
     """
@@ -34,15 +31,12 @@ async def run_agent_analysis(
     requester_history: Optional[str] = None
 ):
     """
-    Runs LangChain Gemini agent for workflow automation.
+    Runs the LLM agent for workflow automation (call site "workflow_agent.decision").
     Updates 'agent_decision', 'status', 'agent_reasoning', 'last_run_report' and saves.
     """
     try:
         prompt = build_workflow_agent_prompt(request, requester_history)
-        llm = ChatGoogleGenerativeAI(model=settings.GEMINI_MODEL, google_api_key=settings.GEMINI_API_KEY)
-        chain = langchain.chains.LLMChain(llm=llm, prompt=prompt)
-        loop = asyncio.get_event_loop()
-        agent_output = await loop.run_in_executor(None, chain.run, {})
+        agent_output = await llm_router.generate("workflow_agent.decision", prompt)
 
         # Attempt to extract JSON; fallback to text parse
         import json
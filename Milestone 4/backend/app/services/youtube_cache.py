@@ -0,0 +1,163 @@
+"""
+YouTube Cache - TTL cache and single-flight fetching for YouTube lookups
+app/services/youtube_cache.py
+"""
+from typing import Any, Callable, Dict, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_MISSING = object()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one
+
+    The first caller runs fn; callers arriving while it runs wait for it
+    and get the same result (or exception). Thread-safe, so it works for
+    fetches running in a thread pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class YouTubeCache:
+    """
+    TTL cache of YouTube lookups in SQLite
+
+    Values are stored as JSON per (kind, key), e.g. ("metadata", video_id)
+    or ("transcript", "video_id:en"), and expire after the TTL configured
+    for their kind. Lookups that miss go through single-flight, so
+    concurrent requests for the same video share one fetch. Failed
+    fetches are not cached. Without a db_path the table lives in memory.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Dict[str, float],
+        db_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        if db_path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS youtube_cache ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (kind, key))"
+        )
+        self._db.commit()
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        """Cached value if present and fresh, else default"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, fetched_at FROM youtube_cache WHERE kind = ? AND key = ?",
+                (kind, key)
+            ).fetchone()
+        if row is None or self.clock() - row[1] > self.ttl_seconds.get(kind, 0):
+            return default
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Store a value and drop expired entries of the same kind"""
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO youtube_cache (kind, key, value, fetched_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value), now)
+            )
+            self._db.execute(
+                "DELETE FROM youtube_cache WHERE kind = ? AND fetched_at < ?",
+                (kind, now - self.ttl_seconds.get(kind, 0))
+            )
+            self._db.commit()
+
+    def get_or_fetch(self, kind: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Cached value, or fetch() it once however many callers are waiting"""
+        value = self.get(kind, key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        def fetch_and_store():
+            value = self.get(kind, key, _MISSING)  # a flight that just finished may have stored it
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = fetch()
+            self.put(kind, key, value)
+            return value
+
+        return self.flight.do(f"{kind}\x00{key}", fetch_and_store)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the metrics endpoint"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM youtube_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_fetches": self.flight.shared,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection (called on application shutdown)"""
+        with self._lock:
+            self._db.close()
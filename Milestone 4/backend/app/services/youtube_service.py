@@ -4,12 +4,40 @@ app/services/youtube_service.py
 """
 from youtube_transcript_api import YouTubeTranscriptApi
 from pytube import YouTube
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import re
 
+from ..config import settings
+from .transcript_index import TranscriptIndex
+from .youtube_cache import YouTubeCache
+
+EMPTY_METADATA = {
+    "title": "Unknown",
+    "duration": 0,
+    "thumbnail_url": "",
+    "author": "",
+    "views": 0,
+    "description": ""
+}
+
 
 class YouTubeService:
-    """Service for extracting YouTube video captions and metadata"""
+    """
+    Service for extracting YouTube video captions and metadata
+
+    Metadata, caption availability and transcripts are cached per video
+    (see YouTubeCache), so creating a study guide fetches each once.
+    """
+
+    def __init__(self, cache: Optional[YouTubeCache] = None):
+        self.cache = cache or YouTubeCache(
+            ttl_seconds={
+                "metadata": settings.YOUTUBE_METADATA_TTL_SECONDS,
+                "captions": settings.YOUTUBE_CAPTIONS_TTL_SECONDS,
+                "transcript": settings.YOUTUBE_TRANSCRIPT_TTL_SECONDS,
+            },
+            db_path=settings.YOUTUBE_CACHE_DB_PATH or None
+        )
 
     @staticmethod
     def extract_video_id(url: str) -> str:
@@ -34,8 +62,7 @@ class YouTubeService:
 
         raise ValueError(f"Could not extract video ID from URL: {url}")
 
-    @staticmethod
-    def get_video_metadata(url: str) -> Dict:
+    def get_video_metadata(self, url: str) -> Dict:
         """
         Get video metadata using pytube
 
@@ -43,29 +70,29 @@ class YouTubeService:
             dict with title, duration, thumbnail_url
         """
         try:
-            yt = YouTube(url)
-
-            return {
-                "title": yt.title,
-                "duration": yt.length,  # in seconds
-                "thumbnail_url": yt.thumbnail_url,
-                "author": yt.author,
-                "views": yt.views,
-                "description": yt.description[:500] if yt.description else ""
-            }
+            try:
+                video_id = self.extract_video_id(url)
+            except ValueError:
+                return self._fetch_metadata(url)
+            return self.cache.get_or_fetch("metadata", video_id, lambda: self._fetch_metadata(url))
         except Exception as e:
             print(f"Error getting video metadata: {e}")
-            return {
-                "title": "Unknown",
-                "duration": 0,
-                "thumbnail_url": "",
-                "author": "",
-                "views": 0,
-                "description": ""
-            }
+            return dict(EMPTY_METADATA)
 
     @staticmethod
-    def get_transcript(video_id: str, languages: List[str] = ['en']) -> List[Dict]:
+    def _fetch_metadata(url: str) -> Dict:
+        yt = YouTube(url)
+
+        return {
+            "title": yt.title,
+            "duration": yt.length,  # in seconds
+            "thumbnail_url": yt.thumbnail_url,
+            "author": yt.author,
+            "views": yt.views,
+            "description": yt.description[:500] if yt.description else ""
+        }
+
+    def get_transcript(self, video_id: str, languages: List[str] = ['en']) -> List[Dict]:
         """
         Get video transcript/captions
 
@@ -76,28 +103,34 @@ class YouTubeService:
         Returns:
             List of transcript segments with 'text', 'start', 'duration'
         """
-        try:
+        def fetch():
             transcript = YouTubeTranscriptApi.get_transcript(
                 video_id,
                 languages=languages
             )
+            self.cache.put("captions", video_id, True)
             return transcript
+
+        try:
+            return self.cache.get_or_fetch("transcript", f"{video_id}:{','.join(languages)}", fetch)
         except Exception as e:
             print(f"Error getting transcript: {e}")
             raise ValueError(f"Could not get captions for video. Error: {str(e)}")
 
-    @staticmethod
-    def check_captions_available(video_id: str) -> bool:
+    def check_captions_available(self, video_id: str) -> bool:
         """Check if video has captions available"""
-        try:
+        def fetch():
             transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
             return len(list(transcript_list)) > 0
+
+        try:
+            return self.cache.get_or_fetch("captions", video_id, fetch)
         except:
             return False
 
     @staticmethod
     def extract_segment_transcript(
-        transcript: List[Dict],
+        transcript: Union[List[Dict], TranscriptIndex],
         start_time: int,
         end_time: int
     ) -> str:
@@ -105,24 +138,17 @@ class YouTubeService:
         Extract transcript text for a specific time segment
 
         Args:
-            transcript: Full video transcript
+            transcript: Full video transcript, or a TranscriptIndex of it
+                (build one when extracting several segments)
             start_time: Start time in seconds
             end_time: End time in seconds
 
         Returns:
             Concatenated transcript text for the segment
         """
-        segment_text = []
-
-        for entry in transcript:
-            entry_start = entry['start']
-            entry_end = entry_start + entry['duration']
-
-            # Check if this entry overlaps with our segment
-            if entry_end >= start_time and entry_start <= end_time:
-                segment_text.append(entry['text'])
-
-        return ' '.join(segment_text)
+        if not isinstance(transcript, TranscriptIndex):
+            transcript = TranscriptIndex(transcript)
+        return transcript.text_between(start_time, end_time)
 
     @staticmethod
     def format_time(seconds: int) -> str:
@@ -0,0 +1,6 @@
+"""
+Offline performance benchmarks
+
+Run from the backend directory, e.g.:
+    python -m benchmarks.bench_embeddings
+"""
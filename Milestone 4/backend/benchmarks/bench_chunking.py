@@ -0,0 +1,88 @@
+"""
+Chunking strategy benchmark
+benchmarks/bench_chunking.py
+
+For each chunking strategy, measures chunking throughput on the bundled
+course corpus and retrieval quality for its questions: hit rate@k (a top-k
+chunk from the right document contains the gold answer) and MRR. Retrieval
+uses the offline FakeEmbedder, so no API key or network is needed.
+"""
+import argparse
+import time
+
+from app.services.chunking import CHUNKING_STRATEGIES, build_chunker
+from app.services.embedding_service import FakeEmbedder
+from benchmarks.corpus import contains_answer, load_corpus, load_questions
+
+
+def measure_throughput(chunker, corpus: dict, repeats: int) -> dict:
+    """Chunk the whole corpus repeatedly and report words per second"""
+    words = sum(len(page.text.split()) for pages in corpus.values() for page in pages)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for pages in corpus.values():
+            for _ in chunker.chunk(pages):
+                pass
+    elapsed = time.perf_counter() - started
+    return {"words_per_second": words * repeats / elapsed if elapsed else float("inf")}
+
+
+def measure_retrieval(chunker, corpus: dict, questions: list, top_k: int) -> dict:
+    """Hit rate@k and MRR over the whole corpus index"""
+    embedder = FakeEmbedder()
+    index = []  # (document, chunk text, vector)
+    for name, pages in corpus.items():
+        for chunk in chunker.chunk(pages):
+            index.append((name, chunk.text, embedder.embed_text(chunk.text)))
+
+    hits, reciprocal_ranks = 0, 0.0
+    for q in questions:
+        query = embedder.embed_text(q["question"])
+        ranked = sorted(index, key=lambda entry: -sum(a * b for a, b in zip(query, entry[2])))
+        for rank, (name, text, _) in enumerate(ranked[:top_k], start=1):
+            if name == q["document"] and contains_answer(text, q["answer"]):
+                hits += 1
+                reciprocal_ranks += 1 / rank
+                break
+
+    return {
+        "chunks": len(index),
+        "avg_words": sum(len(text.split()) for _, text, _ in index) / len(index),
+        "hit_rate": hits / len(questions),
+        "mrr": reciprocal_ranks / len(questions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=120, help="Words per chunk")
+    parser.add_argument("--overlap", type=int, default=20, help="Window overlap in words")
+    parser.add_argument("--max-tokens", type=int, default=160, help="Token strategy budget")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=50, help="Corpus passes for throughput")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    questions = load_questions()
+    print(
+        f"{len(corpus)} documents, {len(questions)} questions, "
+        f"chunk size {args.chunk_size} words / {args.max_tokens} tokens, top-{args.top_k}\n"
+    )
+    print(f"{'strategy':<10} {'chunks':>7} {'avg words':>10} {'words/s':>12} {'hit@k':>7} {'MRR':>6}")
+    for strategy in CHUNKING_STRATEGIES:
+        chunker = build_chunker(
+            strategy,
+            chunk_size=args.chunk_size,
+            overlap=args.overlap,
+            max_tokens=args.max_tokens
+        )
+        speed = measure_throughput(chunker, corpus, args.repeats)
+        quality = measure_retrieval(chunker, corpus, questions, args.top_k)
+        print(
+            f"{strategy:<10} {quality['chunks']:>7} {quality['avg_words']:>10.1f} "
+            f"{speed['words_per_second']:>12,.0f} {quality['hit_rate']:>7.2f} {quality['mrr']:>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Embedding pipeline benchmark
+benchmarks/bench_embeddings.py
+
+Compares the old one-call-per-chunk loop with the batched embedder using the
+offline FakeEmbedder, so no API key or network is needed.
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.embedding_service import BatchedEmbedder, FakeEmbedder
+
+
+async def run_case(name: str, chunks: list, latency: float, batch_size: int, concurrency: int) -> dict:
+    """Embed all chunks with one configuration and report timings"""
+    fake = FakeEmbedder(latency=latency)
+    embedder = BatchedEmbedder(fake.embed_batch, batch_size=batch_size, max_concurrency=concurrency)
+
+    started = time.perf_counter()
+    vectors = await embedder.embed(chunks)
+    elapsed = time.perf_counter() - started
+
+    assert len(vectors) == len(chunks)
+    return {
+        "case": name,
+        "seconds": elapsed,
+        "round_trips": fake.calls,
+        "chunks_per_second": len(chunks) / elapsed if elapsed else float("inf"),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=2000, help="Number of chunks to embed")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per provider call")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    chunks = [f"chunk {i} about lecture topic {i % 37} and example {i % 11}" for i in range(args.chunks)]
+
+    cases = [
+        ("serial (1 per call)", 1, 1),
+        (f"batched ({args.batch_size}/call, 1 in flight)", args.batch_size, 1),
+        (f"batched ({args.batch_size}/call, {args.concurrency} in flight)", args.batch_size, args.concurrency),
+    ]
+    print(f"Embedding {args.chunks} chunks, {args.latency * 1000:.0f} ms simulated latency per call\n")
+    for name, batch_size, concurrency in cases:
+        result = await run_case(name, chunks, args.latency, batch_size, concurrency)
+        print(
+            f"{result['case']:<40} {result['seconds']:8.3f}s  "
+            f"{result['round_trips']:6d} calls  {result['chunks_per_second']:10.1f} chunks/s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Hybrid retrieval benchmark
+benchmarks/bench_hybrid_retrieval.py
+
+Indexes the bundled course corpus as one course on an in-memory ChromaDB
+client and answers its questions with RAGService.query in dense-only and
+hybrid (dense + BM25, reciprocal rank fusion) mode. Reports recall@k (a
+top-k chunk from the right document contains the gold answer), MRR and
+query latency. Dense retrieval uses the offline FakeEmbedder; smaller
+dimensions stand in for an embedding model that blurs exact terms.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.config import settings
+from app.services.chunking import build_chunker
+from app.services.embedding_service import FakeEmbedder
+from app.services.rag_service import RAGService
+from benchmarks.common import latency_summary
+from benchmarks.corpus import contains_answer, load_corpus, load_questions
+
+COURSE_ID = 1
+
+
+def build_service(client, embedder: FakeEmbedder, chunker) -> RAGService:
+    """The corpus stored as one course's collection"""
+    service = RAGService(client=client, collection_prefix=f"bench_{uuid.uuid4().hex[:8]}")
+    ids, texts, metadatas = [], [], []
+    for name, pages in load_corpus().items():
+        for i, chunk in enumerate(chunker.chunk(pages)):
+            ids.append(f"{name}_chunk_{i}")
+            texts.append(chunk.text)
+            metadatas.append({"course_id": COURSE_ID, "document": name, "chunk_index": i})
+    service._store_chunks(ids, [embedder.embed_text(t) for t in texts], texts, metadatas, course_id=COURSE_ID)
+    return service
+
+
+async def evaluate(service: RAGService, embedder: FakeEmbedder, questions: list, mode: str, top_k: int) -> dict:
+    hits, reciprocal_ranks, samples = 0, 0.0, []
+    for q in questions:
+        started = time.perf_counter()
+        results = await service.query(
+            q["question"], COURSE_ID, top_k=top_k,
+            query_embedding=embedder.embed_text(q["question"]), mode=mode
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+        for rank, result in enumerate(results, start=1):
+            if result["metadata"]["document"] == q["document"] and contains_answer(result["text"], q["answer"]):
+                hits += 1
+                reciprocal_ranks += 1 / rank
+                break
+    return {
+        "recall": hits / len(questions),
+        "mrr": reciprocal_ranks / len(questions),
+        **latency_summary(samples),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[32, 64, 256])
+    parser.add_argument("--chunk-size", type=int, default=120, help="Words per chunk")
+    parser.add_argument("--overlap", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    client = chromadb.EphemeralClient(ChromaSettings(anonymized_telemetry=False))
+    chunker = build_chunker("window", chunk_size=args.chunk_size, overlap=args.overlap)
+    questions = load_questions()
+    print(
+        f"{len(questions)} questions, top-{args.top_k}, "
+        f"weights dense {settings.RAG_HYBRID_DENSE_WEIGHT} / lexical {settings.RAG_HYBRID_LEXICAL_WEIGHT}\n"
+    )
+    print(f"{'dim':>5} {'mode':<7} {'recall@k':>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for dimension in args.dimensions:
+        embedder = FakeEmbedder(dimension=dimension)
+        service = build_service(client, embedder, chunker)
+        await service.query("warm up", COURSE_ID, query_embedding=embedder.embed_text("warm up"))
+        for mode in ("dense", "hybrid"):
+            result = await evaluate(service, embedder, questions, mode, args.top_k)
+            print(
+                f"{dimension:>5} {mode:<7} {result['recall']:>9.2f} {result['mrr']:>6.2f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
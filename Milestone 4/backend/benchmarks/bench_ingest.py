@@ -0,0 +1,73 @@
+"""
+ChromaDB ingestion benchmark
+benchmarks/bench_ingest.py
+
+Ingests a synthetic corpus into a throwaway ChromaDB collection through
+RAGService._store_chunks, once per chunk and once in bulk batches, and
+reports chunks/second for each mode. Requires the usual backend .env so the
+app settings load; no network access is needed.
+"""
+import argparse
+import time
+import uuid
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.services.embedding_service import FakeEmbedder
+from app.services.rag_service import RAGService
+
+
+def build_corpus(num_chunks: int, dimension: int):
+    """Synthetic chunks, embeddings and metadata for one large course"""
+    embedder = FakeEmbedder(dimension=dimension)
+    documents = [
+        f"Lecture {i // 50} section {i % 50}: notes on topic {i % 97} with example {i % 13}"
+        for i in range(num_chunks)
+    ]
+    embeddings = [embedder.embed_text(text) for text in documents]
+    ids = [f"doc_{i // 50}_chunk_{i % 50}" for i in range(num_chunks)]
+    metadatas = [
+        {"document_id": i // 50, "course_id": 1, "chunk_index": i % 50}
+        for i in range(num_chunks)
+    ]
+    return ids, embeddings, documents, metadatas
+
+
+def run_mode(client, corpus, batch_size: int) -> float:
+    """Ingest the corpus into a fresh collection, returning chunks/second"""
+    collection = client.get_or_create_collection(
+        name=f"bench_{uuid.uuid4().hex[:8]}",
+        metadata={"hnsw:space": "cosine"}
+    )
+    service = RAGService(collection=collection)
+    ids, embeddings, documents, metadatas = corpus
+
+    started = time.perf_counter()
+    service._store_chunks(ids, embeddings, documents, metadatas, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    assert collection.count() == len(ids)
+    client.delete_collection(collection.name)
+    return len(ids) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    # Throwaway collections on an in-memory client (the app's is on disk)
+    client = chromadb.EphemeralClient(ChromaSettings(anonymized_telemetry=False))
+    corpus = build_corpus(args.chunks, args.dimension)
+
+    print(f"Ingesting {args.chunks} chunks ({args.dimension}-d embeddings)\n")
+    for name, batch_size in (("per-chunk", 1), (f"bulk ({args.batch_size}/add)", args.batch_size)):
+        rate = run_mode(client, corpus, batch_size)
+        print(f"{name:<20} {rate:10.1f} chunks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+LLM client load test against the local mock Gemini server
+benchmarks/bench_llm_load.py
+
+Fires many concurrent generateContent calls and compares the old pattern
+(blocking HTTP calls pushed onto the default thread pool with
+run_in_executor) with the pooled asyncio GeminiTransport. The thread pool
+caps concurrency at min(32, cores + 4); the transport is limited only by its
+explicit per-model limit.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.services.gemini_transport import GeminiTransport
+from benchmarks.common import latency_summary
+from benchmarks.mock_gemini import MockConfig, running_mock_server
+
+MODEL = "gemini-mock"
+
+
+def _body(i: int) -> dict:
+    return {"contents": [{"role": "user", "parts": [{"text": f"question {i}"}]}]}
+
+
+async def run_legacy(base_url: str, requests: int) -> list:
+    """Blocking calls on the default executor, as async_wrap used to do"""
+    loop = asyncio.get_running_loop()
+    client = httpx.Client(base_url=base_url, timeout=60)
+
+    async def one(i: int) -> float:
+        started = time.perf_counter()
+        response = await loop.run_in_executor(
+            None, lambda: client.post(f"/models/{MODEL}:generateContent", json=_body(i))
+        )
+        response.raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    try:
+        return await asyncio.gather(*(one(i) for i in range(requests)))
+    finally:
+        client.close()
+
+
+async def run_transport(base_url: str, requests: int, concurrency: int) -> list:
+    """Native asyncio calls through the pooled transport"""
+    transport = GeminiTransport(
+        api_key="mock",
+        base_url=base_url,
+        max_connections=concurrency,
+        model_concurrency={MODEL: concurrency}
+    )
+
+    async def one(i: int) -> float:
+        started = time.perf_counter()
+        await transport.generate(MODEL, f"question {i}")
+        return (time.perf_counter() - started) * 1000
+
+    try:
+        return await asyncio.gather(*(one(i) for i in range(requests)))
+    finally:
+        await transport.aclose()
+
+
+def report(name: str, samples: list, elapsed: float, max_in_flight: int) -> None:
+    summary = latency_summary(samples)
+    print(
+        f"{name:<28} {elapsed:7.2f}s {len(samples) / elapsed:8.1f} req/s  "
+        f"p50 {summary['p50_ms']:7.0f}ms  p95 {summary['p95_ms']:7.0f}ms  "
+        f"p99 {summary['p99_ms']:7.0f}ms  peak in flight {max_in_flight}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, default=100, help="Transport per-model limit")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    config = MockConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 10)
+    with running_mock_server(config, port=args.port) as server:
+        print(f"{args.requests} concurrent calls, {args.latency_ms:.0f} ms mock latency\n")
+
+        server.reset_stats()
+        started = time.perf_counter()
+        samples = await run_legacy(server.base_url, args.requests)
+        report("run_in_executor (legacy)", samples, time.perf_counter() - started,
+               server.stats()["max_in_flight"])
+
+        server.reset_stats()
+        started = time.perf_counter()
+        samples = await run_transport(server.base_url, args.requests, args.concurrency)
+        report(f"GeminiTransport (limit {args.concurrency})", samples,
+               time.perf_counter() - started, server.stats()["max_in_flight"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
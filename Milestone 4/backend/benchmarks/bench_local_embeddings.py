@@ -0,0 +1,119 @@
+"""
+Local embedding backend benchmark
+benchmarks/bench_local_embeddings.py
+
+Embeds the bundled corpus chunks with each local sentence-transformers
+configuration (torch, dynamically quantized torch, ONNX and an optional
+quantized ONNX export) and reports embeddings/second, then answers the
+corpus questions by cosine similarity and reports hit rate@k and MRR.
+--remote adds the Gemini embedding model (needs GEMINI_API_KEY and
+network access); the offline FakeEmbedder row is a floor for quality.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.services.chunking import build_chunker
+from app.services.embedding_service import FakeEmbedder
+from app.services.gemini_client import gemini_client
+from app.services.gemini_transport import LLMError
+from app.services.local_embeddings import LocalEmbeddingModel
+from benchmarks.corpus import contains_answer, load_corpus, load_questions
+
+
+def corpus_chunks(chunk_size: int, overlap: int) -> list:
+    chunker = build_chunker("window", chunk_size=chunk_size, overlap=overlap)
+    return [(name, chunk.text) for name, pages in load_corpus().items() for chunk in chunker.chunk(pages)]
+
+
+def retrieval_quality(chunks: list, chunk_vectors, question_vectors, questions: list, top_k: int) -> dict:
+    chunk_matrix = np.asarray(chunk_vectors, dtype=float)
+    chunk_matrix /= np.linalg.norm(chunk_matrix, axis=1, keepdims=True)
+    hits, reciprocal_ranks = 0, 0.0
+    for q, vector in zip(questions, question_vectors):
+        query = np.asarray(vector, dtype=float)
+        ranked = np.argsort(-(chunk_matrix @ (query / np.linalg.norm(query))))[:top_k]
+        for rank, i in enumerate(ranked, start=1):
+            name, text = chunks[i]
+            if name == q["document"] and contains_answer(text, q["answer"]):
+                hits += 1
+                reciprocal_ranks += 1 / rank
+                break
+    return {"hit_rate": hits / len(questions), "mrr": reciprocal_ranks / len(questions)}
+
+
+async def run_case(name: str, embed, chunks: list, questions: list, top_k: int, repeats: int):
+    """embed(texts, task_type) -> vectors; prints throughput and quality"""
+    texts = [text for _, text in chunks]
+    await embed(texts[:8], "retrieval_document")  # load / warm up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        chunk_vectors = await embed(texts, "retrieval_document")
+    elapsed = (time.perf_counter() - started) / repeats
+    question_vectors = await embed([q["question"] for q in questions], "retrieval_query")
+    quality = retrieval_quality(chunks, chunk_vectors, question_vectors, questions, top_k)
+    print(
+        f"{name:<34} {len(texts) / elapsed:>10.1f} {len(chunk_vectors[0]):>5} "
+        f"{quality['hit_rate']:>7.2f} {quality['mrr']:>6.2f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=settings.LOCAL_EMBEDDING_MODEL)
+    parser.add_argument("--onnx-file", default="onnx/model_qint8_avx512_vnni.onnx", help="quantized ONNX export; empty skips")
+    parser.add_argument("--batch-size", type=int, default=settings.LOCAL_EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=120)
+    parser.add_argument("--overlap", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--remote", action="store_true", help="also benchmark the Gemini embedding model")
+    args = parser.parse_args()
+
+    chunks = corpus_chunks(args.chunk_size, args.overlap)
+    questions = load_questions()
+    print(f"{len(chunks)} chunks, {len(questions)} questions, top-{args.top_k}\n")
+    print(f"{'embedder':<34} {'emb/s':>10} {'dim':>5} {'hit@k':>7} {'MRR':>6}")
+
+    fake = FakeEmbedder()
+    await run_case("fake (hashed bag of words)", lambda texts, task: fake.embed_batch(texts),
+                   chunks, questions, args.top_k, args.repeats)
+
+    configurations = [
+        ("torch", dict(backend="torch")),
+        ("torch int8", dict(backend="torch", quantize=True)),
+        ("onnx", dict(backend="onnx")),
+    ]
+    if args.onnx_file:
+        configurations.append((f"onnx {args.onnx_file.rsplit('/', 1)[-1]}", dict(backend="onnx", onnx_file=args.onnx_file)))
+    for name, options in configurations:
+        model = LocalEmbeddingModel(
+            args.model,
+            batch_size=args.batch_size,
+            query_prefix=settings.LOCAL_EMBEDDING_QUERY_PREFIX,
+            document_prefix=settings.LOCAL_EMBEDDING_DOCUMENT_PREFIX,
+            **options
+        )
+        try:
+            await run_case(f"local {name}", model.embed_batch, chunks, questions, args.top_k, args.repeats)
+        except (LLMError, ImportError, OSError, ValueError) as e:
+            print(f"local {name:<28} skipped: {e}")
+
+    if args.remote:
+        async def remote(texts, task_type):
+            vectors = []
+            for start in range(0, len(texts), settings.EMBEDDING_BATCH_SIZE):
+                vectors += await gemini_client.transport.embed(
+                    settings.GEMINI_EMBEDDING_MODEL, texts[start:start + settings.EMBEDDING_BATCH_SIZE], task_type=task_type
+                )
+            return vectors
+
+        await run_case(f"remote {settings.GEMINI_EMBEDDING_MODEL}", remote, chunks, questions, args.top_k, 1)
+        await gemini_client.transport.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+API responsiveness during PDF parsing
+benchmarks/bench_parse_latency.py
+
+Polls /health through the ASGI app while a large PDF is parsed concurrently,
+once with the old inline parse on the event loop and once through the
+process-pool parsing service, and reports /health p50/p99 for each.
+Requires the usual backend .env so the app imports.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.pdf_parsing_service import PDFParsingService
+from app.services.text_extraction import iter_pdf_pages, join_pages
+from benchmarks.common import latency_summary
+from benchmarks.synthetic_pdf import build_pdf, lecture_pages
+
+
+async def poll_health(client: AsyncClient, stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """
+    Issue /health at a fixed rate
+
+    Latency is measured from when each request was due, not when it was
+    actually sent, so time spent with the event loop blocked is counted.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sent = 0
+    while not stop.is_set():
+        due = started + sent * interval
+        await asyncio.sleep(max(0.0, due - loop.time()))
+        response = await client.get("/health")
+        samples.append((loop.time() - due) * 1000)
+        assert response.status_code == 200
+        sent += 1
+
+
+async def run_case(name: str, parse, client: AsyncClient):
+    stop = asyncio.Event()
+    samples = []
+    poller = asyncio.create_task(poll_health(client, stop, samples))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await parse()
+    parse_seconds = time.perf_counter() - started
+
+    stop.set()
+    await poller
+    summary = latency_summary(samples)
+    print(
+        f"{name:<24} parse {parse_seconds:6.2f}s   /health p50 {summary['p50_ms']:8.1f} ms"
+        f"   p99 {summary['p99_ms']:8.1f} ms   max {summary['max_ms']:8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-pages", type=int, default=20)
+    args = parser.parse_args()
+
+    service = PDFParsingService(max_workers=args.workers, shard_pages=args.shard_pages)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lecture.pdf")
+        with open(path, "wb") as f:
+            f.write(build_pdf(lecture_pages(args.pages)))
+
+        async def inline_parse():
+            # Previous behaviour: parse directly inside the coroutine
+            join_pages(iter_pdf_pages(path))
+
+        async def pooled_parse():
+            await service.extract_pages(path, "application/pdf")
+
+        # Start the worker processes before measuring
+        await service.extract_pages(path, "application/pdf")
+
+        print(f"{args.pages}-page PDF, {args.workers} worker processes\n")
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            await run_case("inline (event loop)", inline_parse, client)
+            await run_case("process pool", pooled_parse, client)
+
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
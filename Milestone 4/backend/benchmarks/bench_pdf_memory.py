@@ -0,0 +1,77 @@
+"""
+PDF extraction memory benchmark
+benchmarks/bench_pdf_memory.py
+
+Measures peak Python heap (tracemalloc) while extracting and chunking PDFs of
+growing size, comparing the old read-everything + string-concatenation path
+with the streaming page generator over a memory-mapped file.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import PyPDF2
+
+from app.services.rag_service import rag_service
+from app.services.text_extraction import iter_pdf_pages
+from benchmarks.synthetic_pdf import build_pdf, lecture_pages
+
+
+def legacy_extract_and_chunk(path: str) -> int:
+    """Previous behaviour: whole file in BytesIO, one big concatenated string"""
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(io.BytesIO(f.read()))
+    text = ""
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text + "\n"
+    words = text.split()
+    step = 512 - 50
+    return len([' '.join(words[i:i + 512]) for i in range(0, len(words), step)])
+
+
+def streaming_chunk_count(path: str) -> int:
+    """Streaming pages from the mmap straight into the chunker"""
+    return sum(1 for _ in rag_service.chunker.chunk(iter_pdf_pages(path)))
+
+
+def measure(fn, path: str):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / (1024 * 1024), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 100, 300])
+    parser.add_argument("--words-per-page", type=int, default=400)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'file MB':>8} {'legacy peak MB':>15} {'stream peak MB':>15} {'legacy s':>9} {'stream s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_pages in args.sizes:
+            path = os.path.join(tmp, f"lecture_{num_pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(build_pdf(lecture_pages(num_pages, args.words_per_page)))
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+
+            _, legacy_peak, legacy_s = measure(legacy_extract_and_chunk, path)
+            # The streaming path only counts chunks; the legacy path keeps the
+            # chunk list too, matching what each path materializes at its peak.
+            _, stream_peak, stream_s = measure(streaming_chunk_count, path)
+            print(
+                f"{num_pages:6d} {size_mb:8.2f} {legacy_peak:15.2f} {stream_peak:15.2f} "
+                f"{legacy_s:9.2f} {stream_s:9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
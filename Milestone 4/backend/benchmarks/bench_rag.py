@@ -0,0 +1,303 @@
+"""
+RAG retrieval evaluation harness
+benchmarks/bench_rag.py
+
+Runs RAGService over the bundled course corpus once per configuration.
+A configuration is a chunking strategy, chunk size, top_k, retrieval
+mode and embedder. Each run reports:
+  - ingestion throughput (chunk, embed and store)
+  - query latency p50/p95/p99
+  - recall@k: the share of a question's gold chunks in the top k
+  - hit rate@k and MRR
+
+Gold chunks are the chunks of the question's document that contain its
+gold answer phrase (benchmarks/data/questions.json). Questions whose answer
+a chunking splits across chunks count as misses, and the "answerable" column
+shows how often that happens. The default embedder is the deterministic
+offline FakeEmbedder. "local" uses the sentence-transformers backend from
+settings. --distractors pads the course with synthetic chunks to measure
+latency on a larger index. Chroma builds HNSW graphs with several
+threads, so quality varies slightly between runs with distractors.
+Compare runs made with the same --distractors.
+
+--json writes the results for tracking over time. --compare checks them
+against an earlier file and exits with status 1 on a regression, e.g.:
+
+    python -m benchmarks.bench_rag --json baseline.json
+    python -m benchmarks.bench_rag --compare baseline.json
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.config import settings
+from app.services.chunking import build_chunker
+from app.services.embedding_service import FakeEmbedder
+from app.services.local_embeddings import LocalEmbeddingModel
+from app.services.rag_service import RAGService
+from benchmarks.common import latency_summary
+from benchmarks.corpus import contains_answer, load_corpus, load_questions
+
+COURSE_ID = 1
+
+# embed(texts, task_type) -> vectors
+EmbedFn = Callable[[List[str], str], List[List[float]]]
+
+
+@dataclass(frozen=True)
+class Configuration:
+    strategy: str = "window"
+    chunk_size: int = 120
+    overlap: int = 20
+    top_k: int = 5
+    mode: str = "hybrid"
+    embedder: str = "fake-256"
+
+    @property
+    def label(self) -> str:
+        return f"{self.strategy}/{self.chunk_size}/k{self.top_k}/{self.mode}/{self.embedder}"
+
+
+def build_embedder(name: str) -> EmbedFn:
+    """"fake-<dimension>" (offline, deterministic) or "local" (settings.LOCAL_EMBEDDING_*)"""
+    if name.startswith("fake-"):
+        fake = FakeEmbedder(dimension=int(name.split("-", 1)[1]))
+        return lambda texts, task_type: [fake.embed_text(t) for t in texts]
+    if name == "local":
+        model = LocalEmbeddingModel(
+            settings.LOCAL_EMBEDDING_MODEL,
+            backend=settings.LOCAL_EMBEDDING_RUNTIME,
+            onnx_file=settings.LOCAL_EMBEDDING_ONNX_FILE,
+            quantize=settings.LOCAL_EMBEDDING_QUANTIZE,
+            batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+            query_prefix=settings.LOCAL_EMBEDDING_QUERY_PREFIX,
+            document_prefix=settings.LOCAL_EMBEDDING_DOCUMENT_PREFIX
+        )
+        return model.embed
+    raise ValueError(f"Unknown embedder {name!r}; expected fake-<dimension> or local")
+
+
+def distractor_texts(count: int, vocabulary: Sequence[str], seed: int = 0) -> List[str]:
+    """Filler chunks drawn from the corpus vocabulary"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(vocabulary, k=80)) for _ in range(count)]
+
+
+def retrieval_metrics(ranked: Sequence[Sequence[str]], gold: Sequence[set], top_k: int) -> Dict[str, float]:
+    """recall@k, hit rate@k and MRR of ranked id lists against gold id sets"""
+    recall = hits = reciprocal_ranks = 0.0
+    for ids, relevant in zip(ranked, gold):
+        if not relevant:
+            continue
+        top = list(ids)[:top_k]
+        recall += len(relevant.intersection(top)) / len(relevant)
+        for rank, chunk_id in enumerate(top, start=1):
+            if chunk_id in relevant:
+                hits += 1
+                reciprocal_ranks += 1 / rank
+                break
+    count = len(gold) or 1
+    return {
+        f"recall@{top_k}": recall / count,
+        f"hit@{top_k}": hits / count,
+        "mrr": reciprocal_ranks / count,
+        "answerable": sum(1 for relevant in gold if relevant) / count,
+    }
+
+
+async def evaluate(
+    config: Configuration,
+    corpus: Dict,
+    questions: List[Dict],
+    embed: EmbedFn,
+    client=None,
+    repeats: int = 3,
+    distractors: int = 0
+) -> Dict:
+    """Ingest the corpus with one configuration, then run every question"""
+    client = client or chromadb.EphemeralClient(ChromaSettings(anonymized_telemetry=False))
+    service = RAGService(client=client, collection_prefix=f"eval_{uuid.uuid4().hex[:8]}")
+    chunker = build_chunker(config.strategy, chunk_size=config.chunk_size, overlap=config.overlap,
+                            max_tokens=config.chunk_size)
+
+    # Ingestion: chunk, embed and store
+    started = time.perf_counter()
+    ids, texts, metadatas = [], [], []
+    for name, pages in corpus.items():
+        for i, chunk in enumerate(chunker.chunk(pages)):
+            ids.append(f"{name}_chunk_{i}")
+            texts.append(chunk.text)
+            metadatas.append({"course_id": COURSE_ID, "document": name, "chunk_index": i})
+    service._store_chunks(ids, embed(texts, "retrieval_document"), texts, metadatas, course_id=COURSE_ID)
+    ingest_seconds = time.perf_counter() - started
+
+    if distractors:
+        vocabulary = sorted({word for text in texts for word in text.split()})
+        filler = distractor_texts(distractors, vocabulary)
+        service._store_chunks(
+            [f"distractor_{i}" for i in range(distractors)],
+            embed(filler, "retrieval_document"),
+            filler,
+            [{"course_id": COURSE_ID, "document": "distractor"}] * distractors,
+            course_id=COURSE_ID
+        )
+
+    gold = [
+        {
+            chunk_id for chunk_id, text, metadata in zip(ids, texts, metadatas)
+            if metadata["document"] == q["document"] and contains_answer(text, q["answer"])
+        }
+        for q in questions
+    ]
+    query_vectors = embed([q["question"] for q in questions], "retrieval_query")
+
+    # Warm up (loads the BM25 index), then time every question repeats times
+    await service.query(questions[0]["question"], COURSE_ID, top_k=config.top_k,
+                        query_embedding=query_vectors[0], mode=config.mode)
+    samples, ranked = [], []
+    for repeat in range(repeats):
+        for q, vector in zip(questions, query_vectors):
+            query_started = time.perf_counter()
+            results = await service.query(q["question"], COURSE_ID, top_k=config.top_k,
+                                          query_embedding=vector, mode=config.mode)
+            samples.append((time.perf_counter() - query_started) * 1000)
+            if repeat == 0:
+                ranked.append([r["id"] for r in results])
+
+    latency = latency_summary(samples)
+    return {
+        "label": config.label,
+        "config": asdict(config),
+        "chunks": len(ids),
+        "ingest_chunks_per_second": len(ids) / ingest_seconds if ingest_seconds else float("inf"),
+        "query_p50_ms": latency["p50_ms"],
+        "query_p95_ms": latency["p95_ms"],
+        "query_p99_ms": latency["p99_ms"],
+        **retrieval_metrics(ranked, gold, config.top_k),
+    }
+
+
+def compare(
+    results: List[Dict],
+    baseline: List[Dict],
+    max_quality_drop: float = 0.02,
+    max_latency_increase: float = 0.5
+) -> List[str]:
+    """
+    Regressions of results against a baseline run, matched by label
+
+    A regression is a quality metric (recall@k, hit@k, MRR) more than
+    max_quality_drop below the baseline, or p95 latency more than
+    max_latency_increase (a fraction) above it.
+    """
+    previous = {r["label"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["label"])
+        if before is None:
+            continue
+        for metric, value in result.items():
+            if metric.startswith(("recall@", "hit@")) or metric == "mrr":
+                if metric in before and value < before[metric] - max_quality_drop:
+                    regressions.append(f"{result['label']}: {metric} {before[metric]:.3f} -> {value:.3f}")
+        if result["query_p95_ms"] > before["query_p95_ms"] * (1 + max_latency_increase):
+            regressions.append(
+                f"{result['label']}: p95 {before['query_p95_ms']:.2f} ms -> {result['query_p95_ms']:.2f} ms"
+            )
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: List[Dict]) -> None:
+    print(f"{'configuration':<40} {'chunks':>6} {'ingest/s':>9} {'p50':>6} {'p95':>6} {'p99':>6} "
+          f"{'recall':>7} {'hit':>5} {'MRR':>5} {'ans.':>5}")
+    for r in results:
+        k = r["config"]["top_k"]
+        print(
+            f"{r['label']:<40} {r['chunks']:>6} {r['ingest_chunks_per_second']:>9.0f} "
+            f"{r['query_p50_ms']:>6.2f} {r['query_p95_ms']:>6.2f} {r['query_p99_ms']:>6.2f} "
+            f"{r[f'recall@{k}']:>7.2f} {r[f'hit@{k}']:>5.2f} {r['mrr']:>5.2f} {r['answerable']:>5.2f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategies", nargs="+", default=["window", "sentence", "heading"])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[120])
+    parser.add_argument("--overlap", type=int, default=20)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[settings.RAG_TOP_K])
+    parser.add_argument("--modes", nargs="+", default=["dense", "hybrid"])
+    parser.add_argument("--embedders", nargs="+", default=["fake-256"], help="fake-<dimension> and/or local")
+    parser.add_argument("--repeats", type=int, default=3, help="passes over the questions for latency")
+    parser.add_argument("--distractors", type=int, default=0, help="synthetic filler chunks per run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--max-quality-drop", type=float, default=0.02)
+    parser.add_argument("--max-latency-increase", type=float, default=0.5, help="fraction of baseline p95")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    questions = load_questions()
+    client = chromadb.EphemeralClient(ChromaSettings(anonymized_telemetry=False))
+    embedders = {name: build_embedder(name) for name in args.embedders}
+
+    results = []
+    for strategy, chunk_size, top_k, mode, embedder in itertools.product(
+        args.strategies, args.chunk_sizes, args.top_k, args.modes, args.embedders
+    ):
+        config = Configuration(strategy, chunk_size, args.overlap, top_k, mode, embedder)
+        results.append(await evaluate(
+            config, corpus, questions, embedders[embedder],
+            client=client, repeats=args.repeats, distractors=args.distractors
+        ))
+
+    print(f"{len(corpus)} documents, {len(questions)} questions, {args.distractors} distractor chunks\n")
+    print_table(results)
+
+    if args.json:
+        report = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "documents": len(corpus),
+            "questions": len(questions),
+            "distractors": args.distractors,
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.max_quality_drop, args.max_latency_increase)
+        if regressions:
+            print("\nRegressions against", args.compare)
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
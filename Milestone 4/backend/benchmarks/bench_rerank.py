@@ -0,0 +1,82 @@
+"""
+Rerank stage benchmark
+benchmarks/bench_rerank.py
+
+Retrieves a candidate pool for each bundled corpus question (hybrid mode,
+offline FakeEmbedder), then compares taking the top 3 straight from
+retrieval with reranking the pool and keeping chunks within the context
+token budget. Reports hit rate (a kept chunk from the right document
+contains the gold answer), context tokens per prompt and rerank latency.
+The cross-encoder row needs sentence-transformers and the model download;
+it is skipped if the model cannot be loaded.
+"""
+import argparse
+import asyncio
+import time
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.config import settings
+from app.services.chunking import build_chunker, estimate_tokens
+from app.services.embedding_service import FakeEmbedder
+from app.services.reranker import CrossEncoderReranker, OverlapReranker, RerankerError, RerankStage
+from benchmarks.bench_hybrid_retrieval import COURSE_ID, build_service
+from benchmarks.common import latency_summary
+from benchmarks.corpus import contains_answer, load_questions
+
+
+def hit(docs: list, question: dict) -> bool:
+    return any(
+        d["metadata"]["document"] == question["document"] and contains_answer(d["text"], question["answer"])
+        for d in docs
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=settings.RAG_RERANK_CANDIDATES)
+    parser.add_argument("--top-n", type=int, default=settings.RAG_RERANK_TOP_N)
+    parser.add_argument("--token-budget", type=int, default=settings.RAG_CONTEXT_TOKEN_BUDGET)
+    parser.add_argument("--dimension", type=int, default=64)
+    parser.add_argument("--model", default=settings.RAG_RERANK_MODEL)
+    args = parser.parse_args()
+
+    embedder = FakeEmbedder(dimension=args.dimension)
+    client = chromadb.EphemeralClient(ChromaSettings(anonymized_telemetry=False))
+    service = build_service(client, embedder, build_chunker("window", chunk_size=120, overlap=20))
+    questions = load_questions()
+    pools = [
+        await service.query(
+            q["question"], COURSE_ID, top_k=args.candidates,
+            query_embedding=embedder.embed_text(q["question"])
+        )
+        for q in questions
+    ]
+
+    rows = {"retrieval top 3": ([pool[:3] for pool in pools], [])}
+    for reranker in (OverlapReranker(), CrossEncoderReranker(args.model)):
+        try:
+            reranker.score("warm up", pools[0][:1])
+        except RerankerError as e:
+            print(f"Skipping {reranker.name}: {e}")
+            continue
+        stage = RerankStage(reranker, top_n=args.top_n, token_budget=args.token_budget)
+        kept, samples = [], []
+        for q, pool in zip(questions, pools):
+            started = time.perf_counter()
+            kept.append(await stage.rerank(q["question"], pool))
+            samples.append((time.perf_counter() - started) * 1000)
+        rows[f"rerank ({reranker.name})"] = (kept, samples)
+
+    print(f"\n{len(questions)} questions, {args.candidates} candidates, top {args.top_n}, {args.token_budget} token budget\n")
+    print(f"{'strategy':<26} {'hit rate':>9} {'tokens':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (kept, samples) in rows.items():
+        hits = sum(hit(docs, q) for docs, q in zip(kept, questions)) / len(questions)
+        tokens = sum(estimate_tokens(d["text"]) for docs in kept for d in docs) / len(questions)
+        latency = latency_summary(samples)
+        print(f"{name:<26} {hits:>9.2f} {tokens:>7.0f} {latency['p50_ms']:>8.2f} {latency['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Transcript segment extraction benchmark
+benchmarks/bench_transcript_index.py
+
+Extracts every priority segment's text from a synthetic long lecture
+transcript, comparing the original linear scan per segment with
+TranscriptIndex lookups (one bisect per segment, and the batched
+NumPy path).
+"""
+import argparse
+import random
+import time
+
+from app.services.transcript_index import TranscriptIndex
+
+
+def synthetic_transcript(hours: float, seed: int = 0) -> list:
+    """Caption entries roughly every 2 seconds, with some overlap"""
+    rng = random.Random(seed)
+    entries, t = [], 0.0
+    while t < hours * 3600:
+        duration = rng.uniform(1.5, 5.0)
+        entries.append({"text": f"caption at {t:.0f}s", "start": t, "duration": duration})
+        t += rng.uniform(1.0, 3.0)
+    return entries
+
+
+def linear_scan(transcript, start, end):
+    return ' '.join(
+        e['text'] for e in transcript
+        if e['start'] + e['duration'] >= start and e['start'] <= end
+    )
+
+
+def timed(fn, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--segments", type=int, default=48)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    transcript = synthetic_transcript(args.hours)
+    length = args.hours * 3600
+    step = length / args.segments
+    ranges = [(i * step, i * step + step / 2) for i in range(args.segments)]
+
+    expected = [linear_scan(transcript, s, e) for s, e in ranges]
+    index = TranscriptIndex(transcript)
+    assert [index.text_between(s, e) for s, e in ranges] == expected
+    assert index.texts_between(ranges) == expected
+
+    results = {
+        "linear scan": timed(lambda: [linear_scan(transcript, s, e) for s, e in ranges], args.repeats),
+        "index build": timed(lambda: TranscriptIndex(transcript), args.repeats),
+        "index (bisect)": timed(lambda: [index.text_between(s, e) for s, e in ranges], args.repeats),
+        "index (batch)": timed(lambda: index.texts_between(ranges), args.repeats),
+    }
+
+    print(f"{len(transcript)} caption entries, {args.segments} segments")
+    for name, ms in results.items():
+        print(f"  {name:<16} {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Vector store layout benchmark
+benchmarks/bench_vector_store.py
+
+Stores a synthetic multi-course corpus on a persistent ChromaDB client in a
+temporary directory, twice: once in a single shared collection queried
+with a course_id filter (the old layout), and once as one collection per
+course. Reports per-course query latency for both, plus the cost of the
+first query after a restart with and without RAGService.warm_up().
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+import chromadb
+from chromadb.api.client import SharedSystemClient
+from chromadb.config import Settings as ChromaSettings
+
+from app.services.embedding_service import FakeEmbedder
+from app.services.rag_service import RAGService
+from benchmarks.common import latency_summary
+
+PREFIX = "bench"
+
+
+def persistent_client(path: str):
+    return chromadb.PersistentClient(path=path, settings=ChromaSettings(anonymized_telemetry=False))
+
+
+def build_corpus(courses: int, chunks_per_course: int, dimension: int):
+    """ids, embeddings, documents and metadata for every course"""
+    embedder = FakeEmbedder(dimension=dimension)
+    ids, embeddings, documents, metadatas = [], [], [], []
+    for course_id in range(1, courses + 1):
+        for i in range(chunks_per_course):
+            text = f"Course {course_id} lecture {i // 40} note {i % 40} on topic {i % 89}"
+            ids.append(f"doc_{course_id}_chunk_{i}")
+            embeddings.append(embedder.embed_text(text))
+            documents.append(text)
+            metadatas.append({"document_id": course_id, "course_id": course_id, "chunk_index": i})
+    return ids, embeddings, documents, metadatas
+
+
+def time_queries(service: RAGService, queries, top_k: int) -> list:
+    samples = []
+    for course_id, embedding in queries:
+        collection = service._collection(course_id, create=False)
+        started = time.perf_counter()
+        collection.query(
+            query_embeddings=[embedding],
+            n_results=top_k,
+            where=service._course_filter(course_id)
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def first_query_ms(path: str, queries, warm: bool) -> tuple:
+    """(warm-up seconds, first query ms) on a freshly opened client"""
+    SharedSystemClient.clear_system_cache()
+    service = RAGService(client=persistent_client(path), collection_prefix=PREFIX)
+    warm_seconds = service.warm_up()["seconds"] if warm else 0.0
+    return warm_seconds, time_queries(service, queries[:1], top_k=5)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--chunks-per-course", type=int, default=1000)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    ids, embeddings, documents, metadatas = build_corpus(args.courses, args.chunks_per_course, args.dimension)
+    rng = random.Random(0)
+    queries = [
+        (rng.randint(1, args.courses), embeddings[rng.randrange(len(embeddings))])
+        for _ in range(args.queries)
+    ]
+    directory = tempfile.mkdtemp(prefix="bench_chroma_")
+
+    try:
+        client = persistent_client(directory)
+
+        shared = client.get_or_create_collection(name=f"{PREFIX}_shared", metadata={"hnsw:space": "cosine"})
+        shared_service = RAGService(collection=shared)
+        shared_service._store_chunks(ids, embeddings, documents, metadatas, batch_size=1000)
+
+        per_course = RAGService(client=client, collection_prefix=PREFIX)
+        per_course.migrate_collection(shared, batch_size=1000)
+
+        time_queries(shared_service, queries[:10], args.top_k)
+        time_queries(per_course, queries[:10], args.top_k)
+        results = {
+            "shared + filter": latency_summary(time_queries(shared_service, queries, args.top_k)),
+            "per-course": latency_summary(time_queries(per_course, queries, args.top_k)),
+        }
+        client.delete_collection(shared.name)
+
+        cold = first_query_ms(directory, queries, warm=False)
+        warm = first_query_ms(directory, queries, warm=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{args.courses} courses x {args.chunks_per_course} chunks ({args.dimension}-d), {args.queries} queries\n")
+    print(f"{'layout':<18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, summary in results.items():
+        print(f"{name:<18} {summary['p50_ms']:8.2f} {summary['p95_ms']:8.2f} {summary['p99_ms']:8.2f}")
+    print(f"\nfirst query after restart: {cold[1]:.1f} ms cold, "
+          f"{warm[1]:.1f} ms after a {warm[0]:.2f}s warm_up()")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Shared helpers for benchmarks
+benchmarks/common.py
+"""
+from typing import Dict, List
+
+from app.services.metrics import percentile
+
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    """p50 / p95 / p99 / max of latency samples in milliseconds"""
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+    }
@@ -0,0 +1,57 @@
+"""
+Bundled sample course corpus
+benchmarks/corpus.py
+
+Four short lecture-note documents (benchmarks/data/corpus) plus questions
+whose gold answer is a phrase from the document that answers them
+(benchmarks/data/questions.json).
+"""
+from typing import Dict, List
+import json
+import os
+import re
+
+from app.services.text_extraction import Page
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+CORPUS_DIR = os.path.join(DATA_DIR, "corpus")
+
+
+def load_corpus(words_per_page: int = 250) -> Dict[str, List[Page]]:
+    """
+    Load the corpus as {file name: pages}
+
+    Documents are split into pages of roughly words_per_page words at
+    paragraph boundaries, so chunks can span pages like they do in PDFs.
+    """
+    corpus = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+            paragraphs = f.read().strip().split("\n\n")
+
+        pages, current, words = [], [], 0
+        for paragraph in paragraphs:
+            current.append(paragraph)
+            words += len(paragraph.split())
+            if words >= words_per_page:
+                pages.append(Page(len(pages) + 1, "\n\n".join(current)))
+                current, words = [], 0
+        if current:
+            pages.append(Page(len(pages) + 1, "\n\n".join(current)))
+        corpus[name] = pages
+    return corpus
+
+
+def load_questions() -> List[Dict]:
+    """Questions as dicts with document, question and answer keys"""
+    with open(os.path.join(DATA_DIR, "questions.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"^#+\s*", "", text, flags=re.MULTILINE).lower().split())
+
+
+def contains_answer(text: str, answer: str) -> bool:
+    """Whether a retrieved text contains the gold answer phrase"""
+    return _normalize(answer) in _normalize(text)
@@ -0,0 +1,169 @@
+"""
+Local mock of the Gemini REST API
+benchmarks/mock_gemini.py
+
+Implements generateContent, streamGenerateContent (SSE) and
+batchEmbedContents with configurable latency and failure rates, so the LLM
+client can be load tested without network access or quota.
+
+Run standalone:
+    python -m benchmarks.mock_gemini --port 8765 --latency-ms 200
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import httpx
+import uvicorn
+
+from app.services.embedding_service import FakeEmbedder
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 200.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # fraction of calls answered with 500
+    rate_limit_rate: float = 0.0  # fraction of calls answered with 429
+    stream_pieces: int = 5
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    app = FastAPI()
+    embedder = FakeEmbedder(dimension=64)
+    app.state.requests = 0
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+
+    async def simulate(request: Request):
+        """Count the call, wait for the configured latency and maybe fail"""
+        app.state.requests += 1
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+        finally:
+            app.state.in_flight -= 1
+
+        roll = random.random()
+        if roll < config.rate_limit_rate:
+            return JSONResponse({"error": {"message": "quota exceeded"}}, status_code=429, headers={"retry-after": "1"})
+        if roll < config.rate_limit_rate + config.error_rate:
+            return JSONResponse({"error": {"message": "backend error"}}, status_code=500)
+        return None
+
+    def answer_for(body: dict) -> str:
+        prompt = body["contents"][0]["parts"][0]["text"]
+        return f"Mock answer to: {prompt[:60]}"
+
+    def candidate(text: str) -> dict:
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests, "max_in_flight": app.state.max_in_flight}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        app.state.requests = 0
+        app.state.max_in_flight = 0
+        return {}
+
+    @app.post("/v1beta/models/{target}")
+    async def call(target: str, request: Request):
+        model, _, method = target.partition(":")
+        body = await request.json()
+
+        if method == "streamGenerateContent":
+            async def events():
+                words = answer_for(body).split(" ")
+                size = max(1, len(words) // config.stream_pieces)
+                for i in range(0, len(words), size):
+                    await asyncio.sleep(config.latency_ms / 1000 / config.stream_pieces)
+                    piece = " ".join(words[i:i + size]) + " "
+                    yield f"data: {json.dumps(candidate(piece))}\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        failure = await simulate(request)
+        if failure is not None:
+            return failure
+        if method == "generateContent":
+            return candidate(answer_for(body))
+        if method == "batchEmbedContents":
+            texts = [r["content"]["parts"][0]["text"] for r in body["requests"]]
+            return {"embeddings": [{"values": embedder.embed_text(t)} for t in texts]}
+        return JSONResponse({"error": {"message": f"unknown method {method}"}}, status_code=404)
+
+    return app
+
+
+class MockServer:
+    """Handle to a mock server running in a child process"""
+
+    def __init__(self, port: int):
+        self.root = f"http://127.0.0.1:{port}"
+        self.base_url = f"{self.root}/v1beta"
+
+    def stats(self) -> dict:
+        return httpx.get(f"{self.root}/stats").json()
+
+    def reset_stats(self) -> None:
+        httpx.post(f"{self.root}/stats/reset")
+
+
+@contextmanager
+def running_mock_server(config: MockConfig, port: int = 8765):
+    """Run the mock in a separate process so it does not share the client's GIL"""
+    process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_gemini",
+        "--port", str(port),
+        "--latency-ms", str(config.latency_ms),
+        "--jitter-ms", str(config.jitter_ms),
+        "--error-rate", str(config.error_rate),
+        "--rate-limit-rate", str(config.rate_limit_rate),
+    ])
+    server = MockServer(port)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                server.stats()
+                break
+            except httpx.TransportError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Mock Gemini server failed to start")
+                time.sleep(0.1)
+        yield server
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    )
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning", http="h11")
+
+
+if __name__ == "__main__":
+    main()
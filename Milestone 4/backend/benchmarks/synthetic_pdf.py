@@ -0,0 +1,79 @@
+"""
+Synthetic PDF builder for benchmarks and tests
+benchmarks/synthetic_pdf.py
+
+Writes minimal, valid PDFs with one Helvetica text stream per page, so text
+extraction can be exercised without shipping binary fixtures.
+"""
+from typing import List
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(text: str, line_width: int = 90) -> bytes:
+    lines = []
+    for paragraph in text.split("\n"):
+        words = paragraph.split()
+        line = ""
+        for word in words:
+            if line and len(line) + len(word) + 1 > line_width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+
+    ops = ["BT", "/F1 9 Tf", "11 TL", "40 760 Td"]
+    ops.extend(f"({_escape(line)}) Tj T*" for line in lines)
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1", errors="replace")
+
+
+def build_pdf(pages: List[str]) -> bytes:
+    """Build a PDF with one page per string"""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    next_id = 4
+    for text in pages:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        stream = _page_stream(text)
+        objects[content_id] = (
+            b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream"
+        )
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents "
+            + str(content_id).encode() + b" 0 R >>"
+        )
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n".encode()
+    out += b"0000000000 65535 f \n"
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def lecture_pages(num_pages: int, words_per_page: int = 400) -> List[str]:
+    """Filler lecture text, distinct per page"""
+    pages = []
+    for p in range(num_pages):
+        words = [f"topic{p % 17}" if i % 9 == 0 else f"word{(p * 31 + i) % 500}" for i in range(words_per_page)]
+        pages.append(f"Lecture page {p + 1}\n" + " ".join(words))
+    return pages
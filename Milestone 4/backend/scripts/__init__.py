@@ -0,0 +1,6 @@
+"""
+Maintenance scripts
+
+Run from the backend directory, e.g.:
+    python -m scripts.migrate_chroma_collections
+"""
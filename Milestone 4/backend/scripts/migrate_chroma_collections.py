@@ -0,0 +1,59 @@
+"""
+Split the shared ChromaDB collection into per-course collections
+scripts/migrate_chroma_collections.py
+
+Older deployments kept every course's chunks in one collection
+(CHROMA_COLLECTION_NAME) and filtered queries by course_id. This copies
+each chunk, with its id, embedding and metadata, into the course's own
+collection on the persistent client. Chunk ids are unchanged, so
+documents.embedding_ids stays valid. Re-running is safe (chunks are
+upserted). The source collection is kept unless --delete-source is given.
+
+    python -m scripts.migrate_chroma_collections --source-dir ./old_chroma_db
+"""
+import argparse
+import time
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.config import settings
+from app.services.rag_service import rag_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--source-dir", default=settings.CHROMA_PERSIST_DIRECTORY,
+        help="persist directory holding the shared collection"
+    )
+    parser.add_argument("--source-collection", default=settings.CHROMA_COLLECTION_NAME)
+    parser.add_argument("--batch-size", type=int, default=settings.RAG_INGEST_BATCH_SIZE)
+    parser.add_argument("--delete-source", action="store_true", help="drop the shared collection afterwards")
+    args = parser.parse_args()
+
+    source_client = chromadb.PersistentClient(
+        path=args.source_dir,
+        settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    source = source_client.get_collection(name=args.source_collection)
+    total = source.count()
+    print(f"Migrating {total} chunks from '{args.source_collection}' in {args.source_dir}")
+
+    started = time.perf_counter()
+    copied = rag_service.migrate_collection(source, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+
+    for course_id, count in sorted(copied.items()):
+        print(f"  course {course_id:<6} {count:8d} chunks -> {rag_service.collection_name(course_id)}")
+    print(f"✅ Copied {sum(copied.values())} chunks into {len(copied)} collections in {elapsed:.1f}s")
+
+    if sum(copied.values()) != total:
+        print("⚠️ Chunk count changed during migration; source collection kept")
+    elif args.delete_source:
+        source_client.delete_collection(args.source_collection)
+        print(f"🗑️ Deleted '{args.source_collection}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Tests for the semantic answer cache
+tests/test_answer_cache.py
+"""
+from app.services.answer_cache import SemanticAnswerCache
+
+
+def store(cache, course_id, embedding, answer="Merge sort is O(n log n)."):
+    cache.store(
+        course_id=course_id,
+        query_text="what is merge sort",
+        embedding=embedding,
+        answer=answer,
+        confidence_score=0.8,
+        sources={"documents": [{"document_id": 1}]}
+    )
+
+
+def test_similar_question_in_same_course_hits():
+    cache = SemanticAnswerCache(similarity_threshold=0.95)
+    store(cache, 1, [1.0, 0.0, 0.0])
+
+    hit = cache.lookup(1, [0.99, 0.05, 0.0])
+
+    assert hit.answer == "Merge sort is O(n log n)."
+    assert hit.sources == {"documents": [{"document_id": 1}]}
+    assert cache.stats()["hits"] == 1
+
+
+def test_dissimilar_question_or_other_course_misses():
+    cache = SemanticAnswerCache(similarity_threshold=0.95)
+    store(cache, 1, [1.0, 0.0, 0.0])
+
+    assert cache.lookup(1, [0.7, 0.7, 0.0]) is None
+    assert cache.lookup(2, [1.0, 0.0, 0.0]) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_returns_most_similar_entry():
+    cache = SemanticAnswerCache(similarity_threshold=0.9)
+    store(cache, 1, [1.0, 0.2, 0.0], answer="first")
+    store(cache, 1, [1.0, 0.0, 0.0], answer="closest")
+
+    assert cache.lookup(1, [2.0, 0.0, 0.0]).answer == "closest"
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    cache = SemanticAnswerCache(ttl_seconds=60)
+    now = 1000.0
+    monkeypatch.setattr("app.services.answer_cache.time.time", lambda: now)
+    store(cache, 1, [1.0, 0.0])
+
+    now += 61
+    assert cache.lookup(1, [1.0, 0.0]) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_clears_only_that_course():
+    cache = SemanticAnswerCache()
+    store(cache, 1, [1.0, 0.0])
+    store(cache, 2, [1.0, 0.0])
+
+    cache.invalidate(1)
+
+    assert cache.lookup(1, [1.0, 0.0]) is None
+    assert cache.lookup(2, [1.0, 0.0]) is not None
+
+
+def test_keeps_most_recent_entries_per_course():
+    cache = SemanticAnswerCache(max_entries=2)
+    store(cache, 1, [1.0, 0.0, 0.0])
+    store(cache, 1, [0.0, 1.0, 0.0])
+    store(cache, 1, [0.0, 0.0, 1.0])
+
+    assert cache.lookup(1, [1.0, 0.0, 0.0]) is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_new_index_version_drops_answers_and_skips_stale_stores():
+    cache = SemanticAnswerCache()
+    cache.store(1, "q", [1.0, 0.0], "old answer", 0.8, {}, version="v1")
+    assert cache.lookup(1, [1.0, 0.0], version="v1").answer == "old answer"
+
+    # Another instance re-indexed the course
+    assert cache.lookup(1, [1.0, 0.0], version="v2") is None
+    assert cache.stats()["invalidations"] == 1
+
+    # An answer generated against the old index is not kept
+    cache.store(1, "q", [1.0, 0.0], "late answer", 0.8, {}, version="v1")
+    assert cache.lookup(1, [1.0, 0.0], version="v2") is None
+
+
+def test_first_index_version_drops_answers_from_an_empty_course():
+    cache = SemanticAnswerCache()
+    cache.store(1, "q", [1.0, 0.0], "no materials yet", 0.0, {}, version=None)
+
+    assert cache.lookup(1, [1.0, 0.0], version="indexed") is None
@@ -0,0 +1,102 @@
+"""
+Tests for running YouTube calls off the event loop
+tests/test_async_youtube_service.py
+"""
+import asyncio
+import threading
+import time
+import pytest
+from httpx import AsyncClient
+
+from app.dependencies import get_current_user
+from app.main import app
+from app.routers import study_guide
+from app.services.async_youtube_service import AsyncYouTubeService, YouTubeTimeoutError
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class SlowYouTube:
+    """Blocking fetches, like pytube and youtube_transcript_api"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.started = threading.Event()
+
+    def get_video_metadata(self, url):
+        self.started.set()
+        time.sleep(self.delay)
+        return {"title": "Sorting", "duration": 600, "thumbnail_url": None}
+
+    def check_captions_available(self, video_id):
+        time.sleep(self.delay)
+        return True
+
+    def get_transcript(self, video_id, languages=None):
+        time.sleep(self.delay)
+        return [{"text": "hello", "start": 0.0, "duration": 2.0}]
+
+
+@pytest.fixture
+def signed_in():
+    app.dependency_overrides[get_current_user] = lambda: object()
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_metadata_and_captions_fetched_concurrently():
+    service = AsyncYouTubeService(SlowYouTube(0.2), max_workers=4, timeout=5)
+    started = time.perf_counter()
+    metadata, has_captions = await service.get_video_info(VIDEO_URL, "dQw4w9WgXcQ")
+    elapsed = time.perf_counter() - started
+    service.shutdown()
+
+    assert metadata["title"] == "Sorting" and has_captions is True
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_slow_fetch_times_out():
+    service = AsyncYouTubeService(SlowYouTube(0.5), timeout=0.05)
+    with pytest.raises(YouTubeTimeoutError):
+        await service.get_transcript("dQw4w9WgXcQ")
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_serves_requests_during_youtube_fetch(monkeypatch, signed_in):
+    youtube = SlowYouTube(0.5)
+    service = AsyncYouTubeService(youtube, timeout=5)
+    monkeypatch.setattr(study_guide, "async_youtube_service", service)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        slow = asyncio.create_task(
+            client.get("/study-guides/study-guides/video-info", params={"url": VIDEO_URL})
+        )
+        while not youtube.started.is_set():
+            await asyncio.sleep(0.005)
+
+        started = time.perf_counter()
+        health = await client.get("/health")
+        assert time.perf_counter() - started < 0.25
+        assert not slow.done()
+
+        response = await slow
+    service.shutdown()
+
+    assert health.status_code == 200
+    assert response.status_code == 200
+    assert response.json()["has_captions"] is True
+
+
+@pytest.mark.asyncio
+async def test_timeout_maps_to_gateway_timeout(monkeypatch, signed_in):
+    service = AsyncYouTubeService(SlowYouTube(0.5), timeout=0.05)
+    monkeypatch.setattr(study_guide, "async_youtube_service", service)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/study-guides/study-guides/transcript/dQw4w9WgXcQ")
+    service.shutdown()
+
+    assert response.status_code == 504
@@ -0,0 +1,142 @@
+"""
+Tests for the streaming chat endpoint
+tests/test_chat_stream.py
+"""
+import json
+import uuid
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app import models, schemas
+from app.database import Base, engine, AsyncSessionLocal
+from app.dependencies import get_current_user
+from app.main import app
+from app.routers import knowledge
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.gemini_client import gemini_client
+from app.services.llm_backend import LLMBackend, LLMRouter
+from app.services.metrics import metrics
+from app.services.rag_service import rag_service
+
+
+@pytest_asyncio.fixture
+async def student():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    suffix = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        user = models.User(email=f"stream-{suffix}@example.com", username=f"stream-{suffix}", hashed_password="x")
+        course = models.Course(code=f"S{suffix}", name="Streaming course")
+        db.add_all([user, course])
+        await db.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user, course
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Offline embeddings, retrieval and a three-piece streamed answer"""
+    calls = []
+
+    async def generate_embeddings(texts, on_progress=None, task_type="retrieval_document"):
+        return [[1.0, 0.0] for _ in texts]
+
+    async def query(query_text, course_id, top_k=None, query_embedding=None):
+        return [{"text": "Merge sort is O(n log n).", "metadata": {"document_id": 7}, "distance": 0.2}]
+
+    class FakeBackend(LLMBackend):
+        async def generate(self, prompt, system_instruction=None, temperature=0.7):
+            return "".join([piece async for piece in self.stream(prompt)])
+
+        async def stream(self, prompt, system_instruction=None, temperature=0.7):
+            calls.append(prompt)
+            for piece in ["Merge sort ", "runs in ", "O(n log n)."]:
+                yield piece
+
+    monkeypatch.setattr(gemini_client, "generate_embeddings", generate_embeddings)
+    monkeypatch.setattr(knowledge, "llm_router", LLMRouter({"fake": FakeBackend()}, default="fake"))
+    monkeypatch.setattr(rag_service, "query", query)
+    monkeypatch.setattr(knowledge, "answer_cache", SemanticAnswerCache())
+    return calls
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def stream_chat(course_id):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/knowledge-assistant/knowledge/chat/stream",
+            json={"query": "How fast is merge sort?", "course_id": course_id}
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_events(response.text)
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_tokens_then_persists_message(student, fake_llm):
+    _, course = student
+    ttft_before = metrics.snapshot().get("chat_stream_ttft", {}).get("count", 0)
+
+    events = await stream_chat(course.id)
+
+    names = [name for name, _ in events]
+    assert names == ["start", "token", "token", "token", "done"]
+    assert "".join(data["text"] for name, data in events if name == "token") == "Merge sort runs in O(n log n)."
+    done = events[-1][1]
+    assert done["confidence_score"] == pytest.approx(0.8)
+    assert done["sources"] == {"documents": [{"document_id": 7}]}
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Message).where(
+                models.Message.conversation_id == events[0][1]["conversation_id"],
+                models.Message.sender_type == models.SenderType.AI
+            )
+        )
+        ai = result.scalars().all()
+        assert [m.id for m in ai] == [done["message_id"]]
+        assert ai[0].content == "Merge sort runs in O(n log n)."
+    assert metrics.snapshot()["chat_stream_ttft"]["count"] == ttft_before + 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_streams_cached_answer(student, fake_llm):
+    _, course = student
+
+    await stream_chat(course.id)
+    events = await stream_chat(course.id)
+
+    assert len(fake_llm) == 1
+    assert [data["text"] for name, data in events if name == "token"] == ["Merge sort runs in O(n log n)."]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_mid_stream_still_saves_partial_answer(student, fake_llm):
+    user, course = student
+    query = schemas.ChatQueryRequest(query="How fast is merge sort?", course_id=course.id)
+
+    async with AsyncSessionLocal() as db:
+        response = await knowledge.chat_query_stream(query, db=db, current_user=user)
+        body = response.body_iterator
+        start = parse_events(await body.__anext__())[0][1]
+        assert parse_events(await body.__anext__()) == [("token", {"text": "Merge sort "})]
+        await body.aclose()  # the client went away
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Message).where(
+                models.Message.conversation_id == start["conversation_id"],
+                models.Message.sender_type == models.SenderType.AI
+            )
+        )
+        assert [m.content for m in result.scalars()] == ["Merge sort "]
@@ -0,0 +1,132 @@
+"""
+Tests for the chunking strategies
+tests/test_chunking.py
+"""
+import pytest
+
+from app.services.chunking import (
+    HeadingChunker,
+    SentenceChunker,
+    TokenBudgetChunker,
+    WindowChunker,
+    build_chunker,
+    estimate_tokens,
+    is_heading,
+)
+from app.services.text_extraction import Page, join_pages
+
+LECTURE = [
+    Page(1,
+         "1. Sorting\n"
+         "Merge sort splits the list in half. Each half is sorted recursively.\n"
+         "The halves are merged in linear time.\n\n"
+         "Merge sort runs in O(n log n) time."),
+    Page(2,
+         "2. Searching\n"
+         "Binary search needs a sorted array. It halves the range each step!\n\n"
+         "HASH TABLES\n"
+         "A hash table maps keys to buckets. Lookups take constant time on average."),
+]
+
+
+def test_window_chunker_keeps_size_and_overlap():
+    """Streaming window keeps the chunk size / overlap and crosses pages"""
+    size, overlap = 20, 5
+    words = [f"w{i}" for i in range(2 * size + 7)]
+    pages = [Page(1, " ".join(words[:size + 3])), Page(2, " ".join(words[size + 3:]))]
+
+    chunks = list(WindowChunker(chunk_size=size, overlap=overlap).chunk(pages))
+
+    # The last window would only repeat overlap words, so it is skipped
+    expected = [words[i:i + size] for i in range(0, len(words) - overlap, size - overlap)]
+    assert [c.text.split() for c in chunks] == expected
+    assert (chunks[1].page_start, chunks[1].page_end) == (1, 2)
+
+
+@pytest.mark.parametrize("chunker", [
+    WindowChunker(chunk_size=12, overlap=3),
+    SentenceChunker(max_size=12),
+    HeadingChunker(max_size=12),
+    TokenBudgetChunker(max_tokens=20),
+])
+def test_offsets_point_into_document_text(chunker):
+    """char_start/char_end slice the joined text back to the chunk body"""
+    document = join_pages(LECTURE)
+
+    chunks = list(chunker.chunk(LECTURE))
+
+    assert chunks
+    for chunk in chunks:
+        body = chunk.text.split("\n", 1)[1] if chunk.heading else chunk.text
+        assert " ".join(document[chunk.char_start:chunk.char_end].split()) == body
+        assert 1 <= chunk.page_start <= chunk.page_end <= 2
+
+
+def test_sentence_chunker_never_splits_sentences():
+    chunks = list(SentenceChunker(max_size=15, overlap_sentences=0).chunk(LECTURE))
+
+    for chunk in chunks:
+        assert chunk.text.endswith((".", "!", "Sorting", "Searching", "TABLES"))
+        assert len(chunk.text.split()) <= 15
+
+
+def test_sentence_chunker_repeats_overlap_sentence():
+    chunks = list(SentenceChunker(max_size=15, overlap_sentences=1).chunk(LECTURE))
+
+    last_sentence = chunks[0].text.rsplit(". ", 1)[-1]
+    assert chunks[1].text.startswith(last_sentence.rstrip("."))
+
+
+def test_sentence_chunker_splits_oversized_sentence():
+    pages = [Page(1, " ".join(f"w{i}" for i in range(25)) + ".")]
+
+    chunks = list(SentenceChunker(max_size=10).chunk(pages))
+
+    assert [len(c.text.split()) for c in chunks] == [10, 10, 5]
+
+
+def test_heading_chunker_keeps_sections_apart():
+    chunks = list(HeadingChunker(max_size=200).chunk(LECTURE))
+
+    assert [c.heading for c in chunks] == ["1. Sorting", "2. Searching", "HASH TABLES"]
+    assert chunks[2].text.startswith("HASH TABLES\nA hash table")
+    assert chunks[1].page_start == chunks[1].page_end == 2
+    assert chunks[0].metadata()["heading"] == "1. Sorting"
+
+
+def test_token_chunker_respects_budget():
+    chunker = TokenBudgetChunker(max_tokens=20, overlap_sentences=0)
+
+    chunks = list(chunker.chunk(LECTURE))
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c.text) <= 20 for c in chunks)
+
+
+def test_token_chunker_uses_custom_counter():
+    chunker = TokenBudgetChunker(max_tokens=4, overlap_sentences=0, token_counter=lambda t: len(t))
+
+    chunks = list(chunker.chunk([Page(1, "ab cd. ef gh.")]))
+
+    assert [c.text for c in chunks] == ["ab", "cd.", "ef", "gh."]
+
+
+def test_is_heading():
+    assert is_heading("# Graphs")
+    assert is_heading("3.2 Dynamic Programming")
+    assert is_heading("Chapter 4")
+    assert is_heading("HASH TABLES")
+    assert not is_heading("Merge sort splits the list.")
+    assert not is_heading("dynamic programming stores subproblem answers")
+
+
+def test_metadata_has_no_none_values():
+    chunk = next(SentenceChunker().chunk(LECTURE))
+
+    assert None not in chunk.metadata().values()
+    assert "heading" not in chunk.metadata()
+
+
+def test_build_chunker_rejects_unknown_strategy():
+    with pytest.raises(ValueError):
+        build_chunker("semantic")
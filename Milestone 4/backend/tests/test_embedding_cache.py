@@ -0,0 +1,91 @@
+"""
+Tests for the two-tier embedding cache
+tests/test_embedding_cache.py
+"""
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache, embedding_cache_key
+from app.services.embedding_service import FakeEmbedder
+from app.services.gemini_client import gemini_client
+
+
+def test_key_normalizes_text_but_separates_model_and_task():
+    key = embedding_cache_key("What is  Big O?", "embedding-001", "retrieval_query")
+
+    assert key == embedding_cache_key(" what is big o? ", "embedding-001", "retrieval_query")
+    assert key != embedding_cache_key("What is Big O?", "embedding-001", "retrieval_document")
+    assert key != embedding_cache_key("What is Big O?", "embedding-002", "retrieval_query")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put_many({"a": [1.0], "b": [2.0]})
+    cache.get_many(["a"])  # "b" is now least recently used
+    cache.put_many({"c": [3.0]})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": [1.0], "c": [3.0]}
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_restart_and_promotes_hits(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = EmbeddingCache(max_entries=10, db_path=path)
+    first.put_many({"k": [0.5, -0.25]})
+    first.close()
+
+    second = EmbeddingCache(max_entries=10, db_path=path)
+    assert second.get_many(["k"]) == {"k": [0.5, -0.25]}
+    assert second.get_many(["k"]) == {"k": [0.5, -0.25]}
+
+    stats = second.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+    second.close()
+
+
+def test_disk_tier_prunes_oldest_rows(tmp_path):
+    cache = EmbeddingCache(max_entries=0, db_path=str(tmp_path / "cache.db"), max_disk_entries=3)
+    for i in range(5):
+        cache.put_many({f"k{i}": [float(i)]})
+
+    assert cache.stats()["disk_entries"] == 3
+    assert set(cache.get_many([f"k{i}" for i in range(5)])) == {"k2", "k3", "k4"}
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_only_sends_misses(monkeypatch):
+    """Repeated and cached texts skip the remote call"""
+    fake = FakeEmbedder(dimension=8)
+    sent = []
+
+    async def fake_embed_batch(texts, task_type="retrieval_document"):
+        sent.append((task_type, list(texts)))
+        return await fake.embed_batch(texts)
+
+    monkeypatch.setattr(gemini_client, "embedding_cache", EmbeddingCache(max_entries=100))
+    monkeypatch.setattr(gemini_client, "_embedders", {})
+    monkeypatch.setattr(gemini_client, "_embed_batch", fake_embed_batch)
+
+    first = await gemini_client.generate_embeddings(
+        ["when is the quiz", "When is the quiz ", "what is big o"],
+        task_type="retrieval_query"
+    )
+    progress = []
+
+    async def on_progress(done):
+        progress.append(done)
+
+    second = await gemini_client.generate_embeddings(
+        ["what is big o", "what is a heap"],
+        task_type="retrieval_query",
+        on_progress=on_progress
+    )
+
+    assert sent == [
+        ("retrieval_query", ["when is the quiz", "what is big o"]),
+        ("retrieval_query", ["what is a heap"]),
+    ]
+    assert first[0] == first[1]
+    assert second[0] == first[2]
+    assert progress == [1, 2]
+    assert gemini_client.embedding_cache.stats()["memory_hits"] == 1
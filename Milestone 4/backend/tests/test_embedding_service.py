@@ -0,0 +1,81 @@
+"""
+Tests for the batched embedding pipeline
+tests/test_embedding_service.py
+"""
+import asyncio
+import pytest
+
+from app.services.embedding_service import BatchedEmbedder, FakeEmbedder
+
+
+@pytest.mark.asyncio
+async def test_embed_preserves_input_order():
+    """Vectors come back in input order even when batches finish out of order"""
+    fake = FakeEmbedder()
+
+    async def jittered_batch(texts):
+        # Later batches finish first
+        await asyncio.sleep(0.01 / (len(texts) + int(texts[0].split()[1])))
+        return await fake.embed_batch(texts)
+
+    texts = [f"text {i}" for i in range(23)]
+    embedder = BatchedEmbedder(jittered_batch, batch_size=5, max_concurrency=5)
+
+    vectors = await embedder.embed(texts)
+
+    assert vectors == [fake.embed_text(t) for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_embed_groups_into_batches():
+    """Texts are grouped into provider-sized batches"""
+    fake = FakeEmbedder()
+    embedder = BatchedEmbedder(fake.embed_batch, batch_size=10, max_concurrency=2)
+
+    await embedder.embed([f"chunk {i}" for i in range(25)])
+
+    assert fake.calls == 3
+    assert fake.texts_embedded == 25
+
+
+@pytest.mark.asyncio
+async def test_embed_bounds_concurrency():
+    """No more than max_concurrency batches are in flight at once"""
+    fake = FakeEmbedder(latency=0.01)
+    embedder = BatchedEmbedder(fake.embed_batch, batch_size=1, max_concurrency=3)
+
+    await embedder.embed([f"chunk {i}" for i in range(12)])
+
+    assert fake.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_embed_empty_input():
+    """Empty input makes no provider calls"""
+    fake = FakeEmbedder()
+    embedder = BatchedEmbedder(fake.embed_batch)
+
+    assert await embedder.embed([]) == []
+    assert fake.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_embed_rejects_short_batch():
+    """A provider returning the wrong number of vectors is an error"""
+    async def short_batch(texts):
+        return [[1.0]] * (len(texts) - 1)
+
+    embedder = BatchedEmbedder(short_batch, batch_size=4)
+
+    with pytest.raises(ValueError):
+        await embedder.embed(["a", "b", "c"])
+
+
+def test_fake_embedder_is_deterministic():
+    """Same text always maps to the same unit vector"""
+    fake = FakeEmbedder(dimension=64)
+    first = fake.embed_text("Big O notation")
+    second = fake.embed_text("big o NOTATION")
+
+    assert first == second
+    assert abs(sum(v * v for v in first) - 1.0) < 1e-9
@@ -0,0 +1,175 @@
+"""
+Tests for the async Gemini REST transport
+tests/test_gemini_transport.py
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import httpx
+import pytest
+
+from app.services.gemini_transport import (
+    GeminiTransport,
+    LLMError,
+    LLMRateLimitError,
+    LLMServerError,
+    LLMTimeoutError,
+    parse_retry_after,
+)
+
+
+def candidate(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def make_transport(handler, **kwargs):
+    return GeminiTransport(
+        api_key="test-key",
+        base_url="https://gemini.test/v1beta",
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_posts_prompt_and_returns_text():
+    seen = {}
+
+    def handler(request):
+        seen["url"] = str(request.url)
+        seen["key"] = request.headers["x-goog-api-key"]
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json=candidate("Merge sort is stable."))
+
+    transport = make_transport(handler)
+    text = await transport.generate("gemini-2.5-pro", "Is merge sort stable?", {"temperature": 0.2})
+    await transport.aclose()
+
+    assert text == "Merge sort is stable."
+    assert seen["url"] == "https://gemini.test/v1beta/models/gemini-2.5-pro:generateContent"
+    assert seen["key"] == "test-key"
+    assert seen["body"]["contents"][0]["parts"][0]["text"] == "Is merge sort stable?"
+    assert seen["body"]["generationConfig"] == {"temperature": 0.2}
+
+
+@pytest.mark.asyncio
+async def test_embed_sends_one_batch_request():
+    def handler(request):
+        body = json.loads(request.content)
+        assert request.url.path == "/v1beta/models/embedding-001:batchEmbedContents"
+        assert {r["taskType"] for r in body["requests"]} == {"RETRIEVAL_QUERY"}
+        return httpx.Response(200, json={
+            "embeddings": [{"values": [float(len(r["content"]["parts"][0]["text"]))]} for r in body["requests"]]
+        })
+
+    transport = make_transport(handler)
+    vectors = await transport.embed("models/embedding-001", ["a", "abc"], task_type="retrieval_query")
+
+    assert vectors == [[1.0], [3.0]]
+
+
+@pytest.mark.asyncio
+async def test_stream_generate_yields_sse_pieces():
+    def handler(request):
+        assert request.url.params["alt"] == "sse"
+        body = "".join(f"data: {json.dumps(candidate(piece))}\r\n\r\n" for piece in ["Merge ", "sort"])
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    transport = make_transport(handler)
+    pieces = [piece async for piece in transport.stream_generate("gemini-2.5-pro", "hi")]
+
+    assert pieces == ["Merge ", "sort"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, error", [(429, LLMRateLimitError), (503, LLMServerError), (400, LLMError)])
+async def test_error_statuses_map_to_exceptions(status, error):
+    def handler(request):
+        return httpx.Response(status, json={"error": {"message": "nope"}}, headers={"retry-after": "2"})
+
+    transport = make_transport(handler)
+    with pytest.raises(error) as raised:
+        await transport.generate("gemini-2.5-pro", "hi")
+
+    assert raised.value.status_code == status
+    if status == 429:
+        assert raised.value.retry_after == 2.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_with_http_date_retry_after():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    def handler(request):
+        return httpx.Response(429, json={"error": {"message": "slow down"}},
+                              headers={"retry-after": format_datetime(retry_at, usegmt=True)})
+
+    transport = make_transport(handler)
+    with pytest.raises(LLMRateLimitError) as raised:
+        await transport.generate("gemini-2.5-pro", "hi")
+
+    assert 25 <= raised.value.retry_after <= 30
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # already passed
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_llm_timeout():
+    def handler(request):
+        raise httpx.ReadTimeout("slow", request=request)
+
+    transport = make_transport(handler)
+    with pytest.raises(LLMTimeoutError):
+        await transport.generate("gemini-2.5-pro", "hi", timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_per_model_concurrency_limit():
+    """Each model has its own limit; other models are not blocked by it"""
+    in_flight = {"gen": 0, "emb": 0}
+    peak = {"gen": 0, "emb": 0}
+
+    async def handler(request):
+        kind = "emb" if "batchEmbedContents" in request.url.path else "gen"
+        in_flight[kind] += 1
+        peak[kind] = max(peak[kind], in_flight[kind])
+        await asyncio.sleep(0.01)
+        in_flight[kind] -= 1
+        if kind == "emb":
+            return httpx.Response(200, json={"embeddings": [{"values": [0.0]}]})
+        return httpx.Response(200, json=candidate("ok"))
+
+    transport = make_transport(handler, model_concurrency={"gen-model": 2, "emb-model": 5})
+    await asyncio.gather(
+        *(transport.generate("gen-model", "hi") for _ in range(10)),
+        *(transport.embed("emb-model", ["x"]) for _ in range(10)),
+    )
+
+    assert peak == {"gen": 2, "emb": 5}
+
+
+@pytest.mark.asyncio
+async def test_cancellation_releases_model_slot():
+    started = asyncio.Event()
+
+    async def handler(request):
+        if json.loads(request.content)["contents"][0]["parts"][0]["text"] == "slow":
+            started.set()
+            await asyncio.sleep(10)
+        return httpx.Response(200, json=candidate("fast"))
+
+    transport = make_transport(handler, model_concurrency={"gemini-2.5-pro": 1})
+    slow = asyncio.create_task(transport.generate("gemini-2.5-pro", "slow"))
+    await started.wait()
+    slow.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await slow
+
+    # The only slot is free again
+    assert await asyncio.wait_for(transport.generate("gemini-2.5-pro", "next"), timeout=1) == "fast"
@@ -0,0 +1,275 @@
+"""
+Tests for the document ingestion job queue
+tests/test_ingestion_queue.py
+"""
+import asyncio
+import uuid
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app import crud, models, schemas
+from app.config import settings
+from app.database import Base
+from app.services.answer_cache import answer_cache
+from app.services.ingestion_queue import IngestionQueue
+from app.services.rag_service import rag_service
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine(
+        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def create_document(db) -> models.Document:
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(email=f"queue-{suffix}@example.com", username=f"queue-{suffix}", hashed_password="x")
+    course = models.Course(code=f"Q{suffix}", name="Queue course")
+    db.add_all([user, course])
+    await db.commit()
+    return await crud.create_document(
+        db=db,
+        document=schemas.DocumentCreate(title="Notes", course_id=course.id),
+        file_path="notes.txt",
+        file_type="text/plain",
+        file_size=10,
+        user_id=user.id
+    )
+
+
+@pytest.mark.asyncio
+async def test_job_retries_with_backoff_then_completes(session_factory, monkeypatch):
+    """A failing job is requeued with backoff; the retry records progress and completes"""
+    calls = []
+
+    async def flaky_process_document(file_path, file_type, document_id, course_id, progress=None):
+        calls.append(document_id)
+        if len(calls) == 1:
+            raise RuntimeError("embedding API unavailable")
+        await progress(pages_parsed=3, chunks_total=2, chunks_embedded=0)
+        await progress(chunks_embedded=2)
+        return ["doc_chunk_a", "doc_chunk_b"]
+
+    monkeypatch.setattr(rag_service, "process_document", flaky_process_document)
+    queue = IngestionQueue(session_factory, max_attempts=3, retry_base_seconds=0)
+
+    async with session_factory() as db:
+        document = await create_document(db)
+        job = await queue.enqueue(db, document.id)
+
+    # First attempt fails and is requeued
+    assert await queue._claim_next_job() == job.id
+    await queue.run_job(job.id)
+    async with session_factory() as db:
+        failed = await db.get(models.IngestionJob, job.id)
+        assert failed.status == models.IngestionJobStatus.QUEUED
+        assert failed.attempts == 1
+        assert "unavailable" in failed.error
+
+    # Second attempt succeeds
+    assert await queue._claim_next_job() == job.id
+    await queue.run_job(job.id)
+    async with session_factory() as db:
+        done = await db.get(models.IngestionJob, job.id)
+        doc = await db.get(models.Document, document.id)
+        assert done.status == models.IngestionJobStatus.COMPLETED
+        assert (done.pages_parsed, done.chunks_total, done.chunks_embedded) == (3, 2, 2)
+        assert doc.processed is True
+        assert doc.embedding_ids == ["doc_chunk_a", "doc_chunk_b"]
+
+    assert await queue._claim_next_job() is None
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_database_errors_in_run_job(session_factory, monkeypatch):
+    """A session error inside run_job is logged; the worker keeps claiming jobs"""
+    async def process_document(file_path, file_type, document_id, course_id, progress=None):
+        return [f"doc_{document_id}_chunk_a"]
+
+    sessions = 0
+
+    def flaky_session_factory():
+        nonlocal sessions
+        sessions += 1
+        if sessions == 2:  # the session run_job opens after the first claim
+            raise ConnectionError("database restarting")
+        return session_factory()
+
+    async with session_factory() as db:
+        document = await create_document(db)
+        job = await crud.create_ingestion_job(db=db, document_id=document.id, max_attempts=3)
+
+    monkeypatch.setattr(rag_service, "process_document", process_document)
+    queue = IngestionQueue(
+        flaky_session_factory, concurrency=1, retry_base_seconds=0,
+        poll_interval_seconds=0.01, lease_seconds=0.05
+    )
+    queue.start()
+    try:
+        for _ in range(300):
+            async with session_factory() as db:
+                current = await db.get(models.IngestionJob, job.id)
+                if current.status == models.IngestionJobStatus.COMPLETED:
+                    break
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+    assert sessions > 2
+    assert current.status == models.IngestionJobStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_job_fails_after_max_attempts(session_factory, monkeypatch):
+    async def broken_process_document(**kwargs):
+        raise RuntimeError("corrupt PDF")
+
+    monkeypatch.setattr(rag_service, "process_document", broken_process_document)
+    queue = IngestionQueue(session_factory, max_attempts=1, retry_base_seconds=0)
+
+    async with session_factory() as db:
+        document = await create_document(db)
+        job = await queue.enqueue(db, document.id)
+
+    assert await queue._claim_next_job() == job.id
+    await queue.run_job(job.id)
+
+    async with session_factory() as db:
+        failed = await db.get(models.IngestionJob, job.id)
+        assert failed.status == models.IngestionJobStatus.FAILED
+        assert await queue._claim_next_job() is None
+
+
+@pytest.mark.asyncio
+async def test_reindex_deletes_only_unreferenced_obsolete_chunks(session_factory, monkeypatch):
+    """Re-indexing drops this document's stale chunks unless another document uses them"""
+    deleted = []
+
+    async def process_document(file_path, file_type, document_id, course_id, progress=None):
+        # Chunk "b" changed, "c" was removed, "shared" comes from another document
+        return [f"doc_{document_id}_chunk_a", f"doc_{document_id}_chunk_b2"]
+
+    monkeypatch.setattr(rag_service, "process_document", process_document)
+    monkeypatch.setattr(rag_service, "delete_chunks", lambda ids, course_id=None: deleted.extend(ids))
+    queue = IngestionQueue(session_factory, max_attempts=1, retry_base_seconds=0)
+
+    async with session_factory() as db:
+        document = await create_document(db)
+        prefix = f"doc_{document.id}_chunk_"
+        await crud.update_document_processed(
+            db=db,
+            document_id=document.id,
+            embedding_ids=[prefix + "a", prefix + "b", prefix + "c", "doc_0_chunk_shared"]
+        )
+        # Another document in the course reuses chunk "c"
+        other = await crud.create_document(
+            db=db,
+            document=schemas.DocumentCreate(title="Copy", course_id=document.course_id),
+            file_path="copy.txt",
+            file_type="text/plain",
+            file_size=10,
+            user_id=document.uploaded_by
+        )
+        await crud.update_document_processed(db=db, document_id=other.id, embedding_ids=[prefix + "c"])
+        job = await queue.enqueue(db, document.id)
+        assert await crud.get_course_index_version(db=db, course_id=document.course_id) is None
+    answer_cache.store(document.course_id, "q", [1.0, 0.0], "stale answer", 0.9, {})
+
+    while (claimed := await queue._claim_next_job()) is not None:
+        await queue.run_job(claimed)
+
+    assert deleted == [prefix + "b"]
+    assert answer_cache.lookup(document.course_id, [1.0, 0.0]) is None
+    async with session_factory() as db:
+        assert await crud.get_course_index_version(db=db, course_id=document.course_id) is not None
+        doc = await db.get(models.Document, document.id)
+        assert doc.embedding_ids == [prefix + "a", prefix + "b2"]
+        assert (await db.get(models.IngestionJob, job.id)).status == models.IngestionJobStatus.COMPLETED
+
+
+async def create_copy(db, document: models.Document, content_hash: str) -> models.Document:
+    """Another user's upload of the same file to the same course"""
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(email=f"copy-{suffix}@example.com", username=f"copy-{suffix}", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    return await crud.create_document(
+        db=db,
+        document=schemas.DocumentCreate(title="My copy", course_id=document.course_id),
+        file_path="copy.txt",
+        file_type="text/plain",
+        file_size=10,
+        user_id=user.id,
+        content_hash=content_hash
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_upload_waits_for_twin_then_shares_its_chunks(session_factory, monkeypatch):
+    """A copy of a file still being ingested is deferred, then reuses the twin's chunk ids"""
+    processed = []
+
+    async def process_document(file_path, file_type, document_id, course_id, progress=None):
+        processed.append(document_id)
+        return [f"doc_{document_id}_chunk_a", f"doc_{document_id}_chunk_b"]
+
+    monkeypatch.setattr(rag_service, "process_document", process_document)
+    queue = IngestionQueue(session_factory, max_attempts=1, retry_base_seconds=0, poll_interval_seconds=0)
+
+    content_hash = uuid.uuid4().hex
+    async with session_factory() as db:
+        original = await create_document(db)
+        original.content_hash = content_hash
+        await db.commit()
+        copy = await create_copy(db, original, content_hash)
+        original_job = await queue.enqueue(db, original.id)
+        copy_job = await queue.enqueue(db, copy.id)
+
+    # Both jobs are claimed; the copy's is put back without using up an attempt
+    assert await queue._claim_next_job() == original_job.id
+    assert await queue._claim_next_job() == copy_job.id
+    await queue.run_job(copy_job.id)
+    async with session_factory() as db:
+        deferred = await db.get(models.IngestionJob, copy_job.id)
+        assert deferred.status == models.IngestionJobStatus.QUEUED
+        assert deferred.attempts == 0
+
+    await queue.run_job(original_job.id)
+    while (claimed := await queue._claim_next_job()) is not None:
+        await queue.run_job(claimed)
+
+    assert processed == [original.id]
+    async with session_factory() as db:
+        doc = await db.get(models.Document, copy.id)
+        assert doc.processed is True
+        assert doc.title == "My copy"
+        assert doc.embedding_ids == [f"doc_{original.id}_chunk_a", f"doc_{original.id}_chunk_b"]
+        assert (await db.get(models.IngestionJob, original_job.id)).status == models.IngestionJobStatus.COMPLETED
+        assert (await db.get(models.IngestionJob, copy_job.id)).status == models.IngestionJobStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_get_document_by_hash_matches_unprocessed_uploads(session_factory):
+    """Dedup sees uploads still being ingested, preferring an indexed copy"""
+    content_hash = uuid.uuid4().hex
+    async with session_factory() as db:
+        original = await create_document(db)
+        original.content_hash = content_hash
+        await db.commit()
+        copy = await create_copy(db, original, content_hash)
+
+        found = await crud.get_document_by_hash(db=db, content_hash=content_hash, course_id=original.course_id)
+        assert found.id == original.id
+
+        await crud.update_document_processed(db=db, document_id=copy.id, embedding_ids=["doc_chunk"])
+        found = await crud.get_document_by_hash(db=db, content_hash=content_hash, course_id=original.course_id)
+        assert found.id == copy.id
+        assert await crud.get_document_by_hash(
+            db=db, content_hash=content_hash, course_id=original.course_id, exclude_document_id=copy.id
+        ) == original
@@ -0,0 +1,64 @@
+"""
+Tests for the BM25 index and rank fusion
+tests/test_lexical_index.py
+"""
+from app.services.lexical_index import BM25Index, LexicalIndexStore, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("See Theorem 3.2 and heap_sort() in CS-201.") == [
+        "see", "theorem", "3.2", "3", "2", "and", "heap_sort", "heap", "sort", "in", "cs-201", "cs", "201"
+    ]
+
+
+def test_rare_identifier_outranks_common_words():
+    index = BM25Index()
+    index.add(
+        ["a", "b", "c"],
+        [
+            "Sorting algorithms compare elements and sorting is common.",
+            "Theorem 4.7 bounds comparison sorting at n log n.",
+            "Sorting sorting sorting with insertion sort.",
+        ]
+    )
+
+    assert index.search("what does theorem 4.7 say about sorting", top_k=3)[0][0] == "b"
+    assert index.search("quantum", top_k=3) == []
+
+
+def test_add_replaces_and_remove_forgets():
+    index = BM25Index()
+    index.add(["a", "b"], ["merge sort", "heap sort"])
+    index.add(["a"], ["binary search"])
+    index.remove(["b"])
+
+    assert len(index) == 1
+    assert index.search("sort", top_k=5) == []
+    assert [chunk_id for chunk_id, _ in index.search("search", top_k=5)] == ["a"]
+
+
+def test_store_builds_lazily_and_applies_later_changes():
+    loads = []
+
+    def loader(course_id):
+        loads.append(course_id)
+        return ["c1"], ["dijkstra shortest paths"]
+
+    store = LexicalIndexStore(loader)
+    store.add(1, ["ignored"], ["not loaded yet"])
+    index = store.get(1)
+    store.add(1, ["c2"], ["bellman-ford negative edges"])
+    store.remove(["c1"])
+
+    assert loads == [1]
+    assert store.get(1) is index
+    assert [chunk_id for chunk_id, _ in index.search("bellman-ford", 5)] == ["c2"]
+    assert index.search("dijkstra", 5) == []
+    assert store.stats() == {"courses_indexed": 1, "chunks_indexed": 1}
+
+
+def test_reciprocal_rank_fusion_weights():
+    dense, lexical = ["a", "b", "c"], ["c", "d"]
+
+    assert [i for i, _ in reciprocal_rank_fusion([dense, lexical], k=1)] == ["c", "a", "b", "d"]
+    assert [i for i, _ in reciprocal_rank_fusion([dense, lexical], weights=[1.0, 0.1], k=1)][0] == "a"
@@ -0,0 +1,89 @@
+"""
+Tests for LLM backends and per-call-site routing
+tests/test_llm_backend.py
+"""
+import pytest
+
+from app.services import study_guide_service as study_guide_module
+from app.services.llm_backend import LLMRouter, LocalModelBackend, StubBackend, parse_routes
+from app.services.study_guide_service import study_guide_service
+
+
+class RecordingBackend(StubBackend):
+    def __init__(self, name, reply):
+        super().__init__(reply=lambda prompt: reply)
+        self.name = name
+        self.prompts = []
+
+    async def generate(self, prompt, system_instruction=None, temperature=0.7):
+        self.prompts.append(prompt)
+        return await super().generate(prompt, system_instruction, temperature)
+
+
+def test_parse_routes():
+    assert parse_routes("") == {}
+    assert parse_routes(" chat=gemini , study_guide.topics=local,") == {
+        "chat": "gemini",
+        "study_guide.topics": "local",
+    }
+    with pytest.raises(ValueError):
+        parse_routes("chat")
+
+
+def test_router_falls_back_to_parent_then_default():
+    backends = {"big": StubBackend(), "small": StubBackend(), "local": StubBackend()}
+    router = LLMRouter(backends, default="big", routes={"study_guide": "small", "study_guide.topics": "local"})
+
+    assert router.backend_for("study_guide.topics") is backends["local"]
+    assert router.backend_for("study_guide.segment") is backends["small"]
+    assert router.backend_for("chat") is backends["big"]
+
+
+def test_router_rejects_unknown_backends():
+    with pytest.raises(ValueError, match="missing"):
+        LLMRouter({"stub": StubBackend()}, default="stub", routes={"chat": "missing"})
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_is_deterministic_and_streams_its_reply():
+    stub = StubBackend()
+    reply = await stub.generate("Explain merge sort", system_instruction="Be brief")
+
+    assert reply == await stub.generate("Explain merge sort", system_instruction="Be brief")
+    assert reply != await stub.generate("Explain quicksort", system_instruction="Be brief")
+    assert "".join([piece async for piece in stub.stream("Explain merge sort", "Be brief")]) == reply
+    assert await stub.generate("Return a JSON array of questions") == "[]"
+
+
+@pytest.mark.asyncio
+async def test_local_backend_runs_pipeline_off_the_event_loop(monkeypatch):
+    backend = LocalModelBackend("tiny-model", max_new_tokens=8)
+    seen = {}
+
+    def pipeline(prompt, **kwargs):
+        seen.update(kwargs, prompt=prompt)
+        return [{"generated_text": " a local answer "}]
+
+    monkeypatch.setattr(backend, "_load", lambda: pipeline)
+
+    assert await backend.generate("question", system_instruction="system", temperature=0) == "a local answer"
+    assert seen == {"prompt": "system\n\nquestion", "max_new_tokens": 8, "do_sample": False}
+
+
+@pytest.mark.asyncio
+async def test_study_guide_routes_topic_extraction_separately(monkeypatch):
+    main = RecordingBackend("main", "SUMMARY:\nSorting.\n\nKEY POINTS:\n- Merge sort\n- Quicksort")
+    fast = RecordingBackend("fast", "Sorting algorithms\nDivide and conquer")
+    router = LLMRouter({"main": main, "fast": fast}, default="main", routes={"study_guide.topics": "fast"})
+    monkeypatch.setattr(study_guide_module, "llm_router", router)
+
+    guide = await study_guide_service.generate_study_guide(
+        video_id="abc",
+        transcript=[{"text": "today we sort", "start": 0.0, "duration": 5.0}],
+        priority_segments=[{"start": 0, "end": 5}],
+        title="Sorting"
+    )
+
+    assert guide["key_topics"] == ["Sorting algorithms", "Divide and conquer"]
+    assert len(main.prompts) == 2  # segment analysis and the full guide
+    assert len(fast.prompts) == 1
@@ -0,0 +1,184 @@
+"""
+Tests for the LLM resilience layer against a fault-injecting backend
+tests/test_llm_resilience.py
+"""
+import asyncio
+import pytest
+
+from app.services.gemini_transport import LLMError, LLMRateLimitError, LLMServerError, LLMTimeoutError
+from app.services.llm_backend import LLMBackend, LLMRouter, StubBackend
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError, ResilienceLayer
+
+
+class FaultyBackend(LLMBackend):
+    """
+    Remote backend that plays a script of faults, one entry per call
+
+    Entries: an exception to raise, a float to sleep before answering,
+    or "hang" to never answer. Once the script runs out every call
+    answers immediately.
+    """
+
+    name = "faulty"
+    remote = True
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def _fault(self):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else 0.0
+        try:
+            if step == "hang":
+                await asyncio.Event().wait()
+            if isinstance(step, BaseException):
+                raise step
+            await asyncio.sleep(step)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def generate(self, prompt, system_instruction=None, temperature=0.7):
+        await self._fault()
+        return f"answer {self.calls}"
+
+    async def stream(self, prompt, system_instruction=None, temperature=0.7):
+        await self._fault()
+        for piece in ["answer ", str(self.calls)]:
+            yield piece
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_router(backend, fallback=None, **kwargs):
+    kwargs.setdefault("rng", lambda: 0.0)  # retry immediately
+    layer = ResilienceLayer(**kwargs)
+    backends = {"faulty": backend, "stub": StubBackend(lambda prompt: "offline answer")}
+    return LLMRouter(backends, default="faulty", resilience=layer, fallback=fallback), layer
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    backend = FaultyBackend(LLMServerError("unavailable", 503), LLMTimeoutError("slow"))
+    router, layer = make_router(backend, max_attempts=3)
+
+    assert await router.generate("study_guide.segment", "prompt") == "answer 3"
+    assert layer.retries == 2
+    assert layer.stats()["circuits"] == {"faulty": "closed"}
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    backend = FaultyBackend(LLMError("bad request", 400))
+    router, layer = make_router(backend, max_attempts=3)
+
+    with pytest.raises(LLMError):
+        await router.generate("study_guide.segment", "prompt")
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_a_hung_call():
+    backend = FaultyBackend("hang")
+    router, _ = make_router(backend, deadline_seconds=0.05)
+
+    with pytest.raises(LLMTimeoutError):
+        await router.generate("study_guide.segment", "prompt")
+    assert backend.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_after_p95():
+    backend = FaultyBackend(*([0.01] * 5), 5.0)
+    router, layer = make_router(backend, hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        await router.generate("study_guide.segment", "warm up")
+
+    started = asyncio.get_running_loop().time()
+    assert await router.generate("study_guide.segment", "prompt") == "answer 7"
+
+    assert asyncio.get_running_loop().time() - started < 1.0
+    assert (layer.hedges, layer.hedge_wins, backend.cancelled) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_breaker_fails_fast_then_probes():
+    clock = FakeClock()
+    backend = FaultyBackend(*[LLMServerError("down", 503)] * 3)
+    router, layer = make_router(
+        backend, max_attempts=1, breaker_failure_threshold=3, breaker_reset_seconds=30, clock=clock
+    )
+    for _ in range(3):
+        with pytest.raises(LLMServerError):
+            await router.generate("study_guide.segment", "prompt")
+
+    with pytest.raises(CircuitOpenError):
+        await router.generate("study_guide.segment", "prompt")
+    assert backend.calls == 3
+
+    clock.now = 31  # half-open: one probe goes through and closes the circuit
+    assert await router.generate("study_guide.segment", "prompt") == "answer 4"
+    assert layer.stats()["circuits"] == {"faulty": "closed"}
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_do_not_open_the_breaker():
+    backend = FaultyBackend(*[LLMRateLimitError("busy")] * 4)
+    router, layer = make_router(backend, max_attempts=5, breaker_failure_threshold=2)
+
+    assert await router.generate("study_guide.segment", "prompt") == "answer 5"
+    assert layer.stats()["circuits"] == {"faulty": "closed"}
+
+
+@pytest.mark.asyncio
+async def test_outage_serves_cached_answer_then_fallback_backend():
+    backend = FaultyBackend(0.0, *[LLMServerError("down", 503)] * 10)
+    router, layer = make_router(backend, fallback="stub", max_attempts=2, breaker_failure_threshold=2)
+
+    assert await router.generate("study_guide.topics", "seen before") == "answer 1"
+    # Both attempts fail and open the circuit; the last good answer is served
+    assert await router.generate("study_guide.topics", "seen before") == "answer 1"
+    assert layer.stats()["cached_fallbacks"] == 1
+    # Nothing cached for a new prompt, and the circuit is open: the fallback backend answers
+    assert await router.generate("study_guide.topics", "new prompt") == "offline answer"
+    assert backend.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_only_before_first_piece():
+    backend = FaultyBackend(LLMServerError("unavailable", 503))
+    router, layer = make_router(backend)
+
+    assert [piece async for piece in router.stream("chat", "prompt")] == ["answer ", "2"]
+    assert layer.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_deadline_cancels_a_hung_stream():
+    backend = FaultyBackend("hang")
+    router, _ = make_router(backend, deadline_seconds=0.05)
+
+    with pytest.raises(LLMTimeoutError):
+        async for _ in router.stream("chat", "prompt"):
+            pass
+    assert backend.cancelled == 1
+
+
+def test_half_open_breaker_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,130 @@
+"""
+Tests for the outbound LLM scheduler
+tests/test_llm_scheduler.py
+"""
+import asyncio
+import time
+import pytest
+
+from app.services.gemini_transport import LLMRateLimitError
+from app.services.llm_backend import LLMRouter, StubBackend
+from app.services.llm_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, LLMScheduler
+
+
+async def grant_order(scheduler, requests):
+    """Queue (label, priority, course_id) requests behind a held slot; return the order they run in"""
+    order = []
+
+    async def call(label, priority, course_id):
+        async with scheduler.slot(priority, course_id):
+            order.append(label)
+
+    await scheduler.acquire()
+    tasks = [asyncio.create_task(call(*request)) for request in requests]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_jump_the_background_queue():
+    scheduler = LLMScheduler(max_in_flight=1)
+    order = await grant_order(scheduler, [
+        ("guide-1", PRIORITY_BACKGROUND, 1),
+        ("guide-2", PRIORITY_BACKGROUND, 1),
+        ("chat", PRIORITY_INTERACTIVE, 2),
+    ])
+
+    assert order == ["chat", "guide-1", "guide-2"]
+
+
+@pytest.mark.asyncio
+async def test_courses_take_turns_within_a_priority_class():
+    scheduler = LLMScheduler(max_in_flight=1)
+    order = await grant_order(scheduler, [
+        ("a1", PRIORITY_BACKGROUND, "a"),
+        ("a2", PRIORITY_BACKGROUND, "a"),
+        ("a3", PRIORITY_BACKGROUND, "a"),
+        ("b1", PRIORITY_BACKGROUND, "b"),
+        ("c1", PRIORITY_BACKGROUND, "c"),
+    ])
+
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_request_bucket_paces_calls():
+    # 1200/min = one call every 50ms, with a burst of one
+    scheduler = LLMScheduler(requests_per_minute=1200, burst_seconds=0.05)
+    started = time.perf_counter()
+
+    async def call():
+        async with scheduler.slot():
+            pass
+
+    await asyncio.gather(*(call() for _ in range(4)))
+
+    assert time.perf_counter() - started >= 0.14
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_halves_rate_and_pauses_dispatch():
+    scheduler = LLMScheduler()
+
+    with pytest.raises(LLMRateLimitError):
+        async with scheduler.slot():
+            raise LLMRateLimitError("slow down", retry_after=0.1)
+
+    assert scheduler.rate_factor == 0.5
+    assert scheduler.stats()["rate_limited"] == 1
+
+    started = time.perf_counter()
+    async with scheduler.slot():
+        pass
+
+    assert time.perf_counter() - started >= 0.09
+    assert scheduler.rate_factor == 0.55  # additive recovery
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = LLMScheduler(max_in_flight=1)
+    await scheduler.acquire()
+    waiter = asyncio.create_task(scheduler.acquire(PRIORITY_BACKGROUND, 7))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == {"interactive": 0, "background": 1}
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release()
+
+    assert scheduler.stats()["queued"]["background"] == 0
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_router_schedules_only_remote_backends():
+    class RemoteStub(StubBackend):
+        remote = True
+
+    scheduler = LLMScheduler(max_in_flight=1)
+    router = LLMRouter(
+        {"remote": RemoteStub(), "stub": StubBackend()},
+        default="remote",
+        routes={"study_guide.topics": "stub"},
+        scheduler=scheduler,
+        interactive_call_sites={"chat"}
+    )
+    await scheduler.acquire()  # the only slot is taken
+
+    assert await router.generate("study_guide.topics", "offline") == await StubBackend().generate("offline")
+    chat = asyncio.create_task(router.generate("chat", "hello", course_id=3))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == {"interactive": 1, "background": 0}
+
+    scheduler.release()
+    assert (await chat).startswith("[stub")
+    assert router.priority_for("chat.followup") == PRIORITY_INTERACTIVE
+    assert router.priority_for("assessment.questions") == PRIORITY_BACKGROUND
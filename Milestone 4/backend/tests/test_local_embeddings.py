@@ -0,0 +1,81 @@
+"""
+Tests for the local sentence-transformers embedding backend
+tests/test_local_embeddings.py
+"""
+import sys
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_service import FakeEmbedder
+from app.services.gemini_client import gemini_client
+from app.services.gemini_transport import LLMError
+from app.services.local_embeddings import LocalEmbeddingModel
+
+
+class FakeSentenceTransformer:
+    """Stands in for a loaded SentenceTransformer"""
+
+    def __init__(self):
+        self.embedder = FakeEmbedder(dimension=16)
+        self.calls = []
+
+    def encode(self, texts, batch_size, normalize_embeddings, convert_to_numpy, show_progress_bar):
+        assert normalize_embeddings and convert_to_numpy
+        self.calls.append(list(texts))
+        return np.array([self.embedder.embed_text(t) for t in texts])
+
+    def get_sentence_embedding_dimension(self):
+        return 16
+
+
+class FakeLocalModel(LocalEmbeddingModel):
+    def _load(self):
+        self.loads = getattr(self, "loads", 0) + 1
+        return FakeSentenceTransformer()
+
+
+def test_prefixes_per_task_type_and_lazy_load():
+    model = FakeLocalModel("bge-small", query_prefix="query: ", document_prefix="passage: ")
+    assert model.dimension is None
+
+    model.embed(["merge sort"], task_type="retrieval_query")
+    model.embed(["merge sort"])
+
+    assert model._model.calls == [["query: merge sort"], ["passage: merge sort"]]
+    assert model.loads == 1 and model.dimension == 16
+
+
+def test_cache_name_identifies_runtime():
+    assert LocalEmbeddingModel("m").cache_name == "local/m@torch"
+    assert LocalEmbeddingModel("m", quantize=True).cache_name == "local/m@torch:int8"
+    assert LocalEmbeddingModel("m", backend="onnx", onnx_file="onnx/model_qint8.onnx").cache_name == (
+        "local/m@onnx:onnx/model_qint8.onnx"
+    )
+    with pytest.raises(ValueError):
+        LocalEmbeddingModel("m", backend="tensorrt")
+
+
+def test_missing_package_raises_llm_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+    with pytest.raises(LLMError):
+        LocalEmbeddingModel("m").warm_up()
+
+
+@pytest.mark.asyncio
+async def test_client_embeds_locally_in_sequential_batches(monkeypatch):
+    model = FakeLocalModel("bge-small")
+    monkeypatch.setattr(settings, "LOCAL_EMBEDDING_BATCH_SIZE", 2)
+    monkeypatch.setattr(gemini_client, "local_embeddings", model)
+    monkeypatch.setattr(gemini_client, "embedding_cache_model", model.cache_name)
+    monkeypatch.setattr(gemini_client, "embedding_cache", EmbeddingCache(max_entries=100))
+    monkeypatch.setattr(gemini_client, "_embedders", {})
+
+    vectors = await gemini_client.generate_embeddings(["a b", "c d", "e f"])
+    again = await gemini_client.generate_embeddings(["c d"])
+
+    assert model._model.calls == [["a b", "c d"], ["e f"]]
+    assert gemini_client._embedders["retrieval_document"].max_concurrency == 1
+    assert again == [vectors[1]]
+    assert len(vectors[0]) == 16
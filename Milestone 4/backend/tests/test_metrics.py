@@ -0,0 +1,19 @@
+"""
+Tests for in-process latency metrics
+tests/test_metrics.py
+"""
+from app.services.metrics import percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile(values, 0) == 1
+
+
+def test_percentile_of_a_small_window_is_not_the_max():
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,64 @@
+"""
+Tests for process-pool PDF parsing
+tests/test_pdf_parsing_service.py
+"""
+import pytest
+
+from app.services.pdf_parsing_service import PDFParsingService
+from app.services.text_extraction import iter_pdf_pages
+from benchmarks.synthetic_pdf import build_pdf, lecture_pages
+
+
+def test_shards_cover_every_page_once():
+    """Page ranges are contiguous, non-overlapping and at least shard_pages long"""
+    service = PDFParsingService(max_workers=4, shard_pages=10)
+
+    assert service._shards(7) == [(0, 7)]
+    assert service._shards(35) == [(0, 10), (10, 20), (20, 30), (30, 35)]
+    # Big documents get one shard per worker
+    assert service._shards(100) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+
+
+@pytest.mark.asyncio
+async def test_extract_pages_matches_sequential_parse(tmp_path):
+    """Sharded parsing returns the same pages, in order, as a sequential parse"""
+    path = tmp_path / "lecture.pdf"
+    path.write_bytes(build_pdf(lecture_pages(9, words_per_page=30)))
+    service = PDFParsingService(max_workers=2, shard_pages=2)
+
+    try:
+        pages = await service.extract_pages(str(path), "application/pdf")
+        prefix = await service.extract_text(str(path), "application/pdf", max_chars=40)
+    finally:
+        service.shutdown()
+
+    assert pages == list(iter_pdf_pages(str(path)))
+    assert [p.page_number for p in pages] == list(range(1, 10))
+    assert prefix == pages[0].text[:40]
+
+
+def test_iter_pages_streams_shards_in_order(tmp_path):
+    """Streaming parse yields the same pages as a sequential parse"""
+    path = tmp_path / "lecture.pdf"
+    path.write_bytes(build_pdf(lecture_pages(9, words_per_page=30)))
+    service = PDFParsingService(max_workers=2, shard_pages=2)
+
+    try:
+        pages = list(service.iter_pages(str(path), "application/pdf"))
+    finally:
+        service.shutdown()
+
+    assert pages == list(iter_pdf_pages(str(path)))
+
+
+@pytest.mark.asyncio
+async def test_extract_pages_plain_text(tmp_path):
+    """Plain-text documents skip the process pool"""
+    path = tmp_path / "notes.txt"
+    path.write_text("hello")
+    service = PDFParsingService(max_workers=1)
+
+    pages = await service.extract_pages(str(path), "text/plain")
+
+    assert [p.text for p in pages] == ["hello"]
+    assert service._executor is None
@@ -0,0 +1,44 @@
+"""
+Tests for the RAG retrieval evaluation harness
+tests/test_rag_eval.py
+"""
+import pytest
+
+from benchmarks.bench_rag import Configuration, build_embedder, compare, evaluate, retrieval_metrics
+from benchmarks.corpus import load_corpus, load_questions
+
+
+def test_retrieval_metrics():
+    ranked = [["a", "b", "c"], ["x", "y", "z"], ["q"]]
+    gold = [{"b", "d"}, {"x"}, set()]
+
+    metrics = retrieval_metrics(ranked, gold, top_k=2)
+
+    assert metrics["recall@2"] == pytest.approx((0.5 + 1.0) / 3)
+    assert metrics["hit@2"] == pytest.approx(2 / 3)
+    assert metrics["mrr"] == pytest.approx((0.5 + 1.0) / 3)
+    assert metrics["answerable"] == pytest.approx(2 / 3)
+
+
+def test_compare_flags_quality_and_latency_regressions():
+    baseline = [{"label": "a", "recall@5": 0.8, "mrr": 0.6, "query_p95_ms": 10.0}]
+    steady = [{"label": "a", "recall@5": 0.79, "mrr": 0.6, "query_p95_ms": 12.0}]
+    worse = [{"label": "a", "recall@5": 0.7, "mrr": 0.6, "query_p95_ms": 20.0}]
+
+    assert compare(steady, baseline) == []
+    assert len(compare(worse, baseline)) == 2
+    assert compare([{**worse[0], "label": "new"}], baseline) == []
+
+
+@pytest.mark.asyncio
+async def test_evaluate_reports_every_metric():
+    config = Configuration(strategy="heading", top_k=3, mode="hybrid", embedder="fake-64")
+    questions = load_questions()
+
+    result = await evaluate(config, load_corpus(), questions, build_embedder(config.embedder), repeats=1)
+
+    assert result["label"] == "heading/120/k3/hybrid/fake-64"
+    assert result["chunks"] > 0 and result["ingest_chunks_per_second"] > 0
+    assert 0 < result["query_p50_ms"] <= result["query_p95_ms"] <= result["query_p99_ms"]
+    assert 0.5 < result["hit@3"] <= 1.0
+    assert result["mrr"] <= result["hit@3"]
@@ -0,0 +1,287 @@
+"""
+Tests for RAGService ingestion internals
+tests/test_rag_service.py
+"""
+import time
+import uuid
+import chromadb
+import pytest
+from chromadb.api.client import SharedSystemClient
+from chromadb.config import Settings as ChromaSettings
+
+from app.config import settings
+from app.services.chunking import HeadingChunker
+from app.services.embedding_service import FakeEmbedder
+from app.services.gemini_client import gemini_client
+from app.services.rag_service import RAGService, chunk_hash, rag_service
+from app.services.text_extraction import iter_document_pages
+
+
+class RecordingCollection:
+    """Minimal stand-in for a ChromaDB collection that records add() calls"""
+
+    def __init__(self):
+        self.add_calls = []
+
+    def add(self, ids, embeddings, documents, metadatas):
+        assert len(ids) == len(embeddings) == len(documents) == len(metadatas)
+        self.add_calls.append(list(ids))
+
+
+def test_store_chunks_writes_in_bulk_batches():
+    """Chunks are written in batches of batch_size, in order"""
+    collection = RecordingCollection()
+    service = RAGService(collection=collection)
+    ids = [f"doc_1_chunk_{i}" for i in range(7)]
+
+    service._store_chunks(
+        ids,
+        [[0.0]] * 7,
+        ["text"] * 7,
+        [{"chunk_index": i} for i in range(7)],
+        batch_size=3
+    )
+
+    assert [len(call) for call in collection.add_calls] == [3, 3, 1]
+    assert [i for call in collection.add_calls for i in call] == ids
+
+
+@pytest.fixture
+def dedup_service(monkeypatch):
+    """RAGService on a throwaway Chroma collection with an offline embedder"""
+    collection = rag_service.client.get_or_create_collection(
+        name=f"test_{uuid.uuid4().hex[:8]}",
+        metadata={"hnsw:space": "cosine"}
+    )
+    fake = FakeEmbedder(dimension=32)
+
+    async def fake_generate_embeddings(texts, on_progress=None):
+        return await fake.embed_batch(texts) if texts else []
+
+    monkeypatch.setattr(gemini_client, "generate_embeddings", fake_generate_embeddings)
+    yield RAGService(collection=collection), collection, fake
+    rag_service.client.delete_collection(collection.name)
+
+
+def write_notes(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_process_document_reuses_embeddings_for_identical_chunks(dedup_service, tmp_path):
+    """Repeat uploads reuse embeddings; other courses only get new metadata"""
+    service, collection, fake = dedup_service
+    text = " ".join(f"word{i}" for i in range(30))
+    path = write_notes(tmp_path, "notes.txt", text)
+
+    first_ids = await service.process_document(path, "text/plain", document_id=1, course_id=10)
+    calls_after_first = fake.texts_embedded
+    count_after_first = collection.count()
+
+    # Same content, same course: no new embeddings, no new vectors
+    same_course_ids = await service.process_document(path, "text/plain", document_id=2, course_id=10)
+    assert same_course_ids == first_ids
+    assert collection.count() == count_after_first
+
+    # Same content, another course: embedding copied, stored with new course_id
+    other_course_ids = await service.process_document(path, "text/plain", document_id=3, course_id=20)
+    assert fake.texts_embedded == calls_after_first
+    assert collection.count() == 2 * count_after_first
+    stored = collection.get(ids=other_course_ids, include=["metadatas", "embeddings"])
+    assert {m["course_id"] for m in stored["metadatas"]} == {20}
+    original = collection.get(ids=first_ids, include=["embeddings"])
+    for copied, source in zip(stored["embeddings"], original["embeddings"]):
+        assert list(copied) == pytest.approx(list(source), abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_process_document_collapses_repeated_chunks(dedup_service, tmp_path):
+    """A chunk repeated inside one document is embedded and stored once"""
+    service, collection, fake = dedup_service
+    size = settings.RAG_CHUNK_SIZE
+    step = size - settings.RAG_CHUNK_OVERLAP
+    block = " ".join(["same"] * (step * 3 + settings.RAG_CHUNK_OVERLAP))
+    path = write_notes(tmp_path, "repeat.txt", block)
+
+    ids = await service.process_document(path, "text/plain", document_id=4, course_id=10)
+
+    assert len(ids) == 1
+    assert fake.texts_embedded == 1
+    assert collection.count() == 1
+
+
+@pytest.mark.asyncio
+async def test_process_document_streams_in_batches(dedup_service, tmp_path, monkeypatch):
+    """Chunks are handled a few at a time; repeats across batches are embedded and stored once"""
+    service, collection, fake = dedup_service
+    step = settings.RAG_CHUNK_SIZE - settings.RAG_CHUNK_OVERLAP
+    text = " ".join(f"word{i}" for i in range(step * 4))
+    path = write_notes(tmp_path, "notes.txt", f"{text} {text}")
+    monkeypatch.setattr(settings, "RAG_INGEST_BATCH_SIZE", 2)
+
+    ids = await service.process_document(path, "text/plain", document_id=8, course_id=10)
+
+    chunks = list(service.chunker.chunk(iter_document_pages(path, "text/plain")))
+    first_index = {}
+    for i, chunk in enumerate(chunks):
+        first_index.setdefault(chunk_hash(chunk.text), i)
+    assert len(chunks) > len(first_index)  # the second copy repeats the first
+    assert len(ids) == len(set(ids)) == len(first_index)
+    assert fake.texts_embedded == len(first_index)
+    stored = collection.get(ids=ids, include=["metadatas"])["metadatas"]
+    assert {m["chunk_hash"]: m["chunk_index"] for m in stored} == first_index
+
+
+@pytest.mark.asyncio
+async def test_process_document_stores_chunk_offsets(dedup_service, tmp_path):
+    """Chunk char/page offsets and headings are written to chunk metadata"""
+    _, collection, _ = dedup_service
+    service = RAGService(collection=collection, chunker=HeadingChunker(max_size=50))
+    path = write_notes(tmp_path, "sections.txt", "1. Intro\nSorting basics.\n\n2. Merge Sort\nSplit and merge.")
+
+    ids = await service.process_document(path, "text/plain", document_id=5, course_id=10)
+
+    stored = collection.get(ids=ids, include=["metadatas"])
+    by_heading = {m["heading"]: m for m in stored["metadatas"]}
+    assert set(by_heading) == {"1. Intro", "2. Merge Sort"}
+    assert by_heading["2. Merge Sort"]["char_start"] > by_heading["1. Intro"]["char_end"]
+    assert by_heading["1. Intro"]["page_start"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reindex_moves_metadata_of_reused_chunks(dedup_service, tmp_path):
+    """A reused chunk that moved within the document gets its new position"""
+    _, collection, fake = dedup_service
+    service = RAGService(collection=collection, chunker=HeadingChunker(max_size=50))
+    path = write_notes(tmp_path, "v1.txt", "1. Intro\nSorting basics.\n\n2. Merge Sort\nSplit and merge.")
+    first_ids = await service.process_document(path, "text/plain", document_id=6, course_id=10)
+    before = collection.get(ids=[first_ids[1]], include=["metadatas"])["metadatas"][0]
+
+    path = write_notes(tmp_path, "v2.txt", "2. Merge Sort\nSplit and merge.\n\n3. Heaps\nSift down.")
+    ids = await service.process_document(path, "text/plain", document_id=6, course_id=10)
+
+    assert ids[0] == first_ids[1]
+    assert fake.texts_embedded == 3
+    after = collection.get(ids=[ids[0]], include=["metadatas"])["metadatas"][0]
+    assert after["heading"] == "2. Merge Sort"
+    assert (before["chunk_index"], after["chunk_index"]) == (1, 0)
+    assert after["char_start"] < before["char_start"]
+
+
+@pytest.mark.asyncio
+async def test_shared_chunk_keeps_its_owner_metadata(dedup_service, tmp_path):
+    """A chunk reused by another document still describes the document that stored it"""
+    _, collection, _ = dedup_service
+    service = RAGService(collection=collection, chunker=HeadingChunker(max_size=50))
+    path = write_notes(tmp_path, "a.txt", "1. Intro\nSorting basics.\n\n2. Merge Sort\nSplit and merge.")
+    first_ids = await service.process_document(path, "text/plain", document_id=5, course_id=10)
+    before = collection.get(ids=first_ids, include=["metadatas"])["metadatas"]
+
+    path = write_notes(tmp_path, "b.txt", "2. Merge Sort\nSplit and merge.\n\n3. Heaps\nSift down.")
+    ids = await service.process_document(path, "text/plain", document_id=6, course_id=10)
+
+    assert ids[0] == first_ids[1]
+    assert collection.get(ids=first_ids, include=["metadatas"])["metadatas"] == before
+
+
+@pytest.fixture
+def offline_embeddings(monkeypatch):
+    fake = FakeEmbedder(dimension=32)
+
+    async def fake_generate_embeddings(texts, on_progress=None, task_type="retrieval_document"):
+        return await fake.embed_batch(texts) if texts else []
+
+    monkeypatch.setattr(gemini_client, "generate_embeddings", fake_generate_embeddings)
+    return fake
+
+
+def persistent_service(path):
+    client = chromadb.PersistentClient(path=str(path), settings=ChromaSettings(anonymized_telemetry=False))
+    return RAGService(client=client, collection_prefix="test")
+
+
+@pytest.mark.asyncio
+async def test_each_course_gets_its_own_collection(offline_embeddings, tmp_path):
+    """Chunks land in the course's collection and queries only search it"""
+    service = persistent_service(tmp_path / "chroma")
+    await service.process_document(write_notes(tmp_path, "a.txt", "Merge sort splits."), "text/plain", 1, course_id=10)
+    await service.process_document(write_notes(tmp_path, "b.txt", "Heaps are trees."), "text/plain", 2, course_id=20)
+
+    assert service.course_ids() == [10, 20]
+    results = await service.query("sorting", course_id=10, query_embedding=offline_embeddings.embed_text("x"))
+    assert [r["metadata"]["course_id"] for r in results] == [10]
+    assert await service.query("sorting", course_id=30, query_embedding=[0.0] * 32) == []
+    assert service.course_ids() == [10, 20]
+
+
+@pytest.mark.asyncio
+async def test_index_survives_restart(offline_embeddings, tmp_path):
+    """A new client on the same directory sees the stored chunks"""
+    path = tmp_path / "chroma"
+    ids = await persistent_service(path).process_document(
+        write_notes(tmp_path, "notes.txt", "Dijkstra finds shortest paths."), "text/plain", 1, course_id=7
+    )
+    SharedSystemClient.clear_system_cache()
+
+    restarted = persistent_service(path)
+    assert restarted.warm_up()["chunks"] == len(ids)
+    results = await restarted.query("paths", course_id=7, query_embedding=offline_embeddings.embed_text("x"))
+    assert results[0]["text"] == "Dijkstra finds shortest paths."
+
+
+def test_migrate_shared_collection(tmp_path):
+    """The old shared collection is split by course_id; re-running is a no-op"""
+    service = persistent_service(tmp_path / "chroma")
+    shared = service.client.get_or_create_collection(name="eduassist_documents")
+    shared.add(
+        ids=["doc_1_chunk_a", "doc_1_chunk_b", "doc_2_chunk_a"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+        documents=["a", "b", "c"],
+        metadatas=[{"course_id": 1}, {"course_id": 1}, {"course_id": 2}]
+    )
+
+    assert service.migrate_collection(shared, batch_size=2) == {1: 2, 2: 1}
+    service.migrate_collection(shared)
+
+    course_one = service._collection(1, create=False)
+    assert course_one.count() == 2
+    assert course_one.get(ids=["doc_1_chunk_b"])["documents"] == ["b"]
+    assert service._collection(2, create=False).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_hybrid_query_finds_exact_identifiers(offline_embeddings, tmp_path):
+    """An identifier the dense ranking misses is fused in with a distance"""
+    service = persistent_service(tmp_path / "chroma")
+    for document_id, text in enumerate([
+        "Lemma 2.4 covers the heap invariant.",
+        "Sorting lower bounds for comparison sorts.",
+        "Theorem 5.1 proves Dijkstra correct.",
+    ]):
+        await service.process_document(write_notes(tmp_path, f"{document_id}.txt", text), "text/plain", document_id, 3)
+    query_embedding = offline_embeddings.embed_text("Sorting lower bounds for comparison sorts.")
+
+    dense = await service.query("theorem 5.1", 3, top_k=1, query_embedding=query_embedding, mode="dense")
+    hybrid = await service.query("theorem 5.1", 3, top_k=2, query_embedding=query_embedding, mode="hybrid")
+
+    assert "Theorem 5.1" not in dense[0]["text"]
+    assert any("Theorem 5.1" in r["text"] for r in hybrid)
+    assert all(r["distance"] is not None and r["score"] > 0 for r in hybrid)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_query_falls_back_to_dense_when_over_budget(offline_embeddings, tmp_path, monkeypatch):
+    """A BM25 leg that misses the latency budget is dropped for that query"""
+    service = persistent_service(tmp_path / "chroma")
+    await service.process_document(write_notes(tmp_path, "a.txt", "Graphs and trees."), "text/plain", 1, 4)
+    monkeypatch.setattr(settings, "RAG_HYBRID_BUDGET_MS", 0.0)
+    load = service.lexical.loader
+    monkeypatch.setattr(service.lexical, "loader", lambda course_id: (time.sleep(0.05), load(course_id))[1])
+
+    results = await service.query("graphs", 4, query_embedding=offline_embeddings.embed_text("graphs"))
+
+    assert [r["text"] for r in results] == ["Graphs and trees."]
+    assert "score" not in results[0]
+    assert service.stats()["lexical_budget_misses"] == 1
@@ -0,0 +1,109 @@
+"""
+Tests for the RAG rerank stage
+tests/test_reranker.py
+"""
+import sys
+import pytest
+
+from app import schemas
+from app.config import settings
+from app.routers import knowledge
+from app.services.metrics import MetricsRegistry
+from app.services import reranker as reranker_module
+from app.services.reranker import (
+    CrossEncoderReranker, OverlapReranker, Reranker, RerankerError, RerankStage
+)
+
+
+class ScriptedReranker(Reranker):
+    name = "scripted"
+
+    def __init__(self, scores=None, error=None):
+        self.scores = scores
+        self.error = error
+
+    def score(self, query, candidates):
+        if self.error:
+            raise self.error
+        return self.scores[:len(candidates)]
+
+
+def doc(text, distance=0.3):
+    return {"id": text, "text": text, "metadata": {"text": text}, "distance": distance}
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(reranker_module, "metrics", registry)
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_keeps_best_scored_chunks(fresh_metrics):
+    stage = RerankStage(ScriptedReranker([0.1, 0.9, 0.5, 0.7]), top_n=2, token_budget=1000)
+
+    kept = await stage.rerank("q", [doc("a"), doc("b"), doc("c"), doc("d")])
+
+    assert [d["text"] for d in kept] == ["b", "d"]
+    assert kept[0]["rerank_score"] == 0.9
+    assert fresh_metrics.snapshot()["rag.rerank"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_budget_limits_context_but_keeps_best_chunk():
+    long_text = " ".join(["word"] * 50)
+    stage = RerankStage(ScriptedReranker([0.9, 0.8, 0.7]), top_n=3, token_budget=60)
+
+    kept = await stage.rerank("q", [doc(long_text), doc("short " + long_text), doc("tiny")])
+    assert len(kept) == 1
+
+    stage.token_budget = 1
+    assert len(await stage.rerank("q", [doc(long_text)])) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_reranker_keeps_retrieval_order():
+    stage = RerankStage(ScriptedReranker(error=RuntimeError("model missing")), top_n=2)
+
+    kept = await stage.rerank("q", [doc("a"), doc("b"), doc("c")])
+
+    assert [d["text"] for d in kept] == ["a", "b"]
+    assert "rerank_score" not in kept[0]
+
+
+def test_overlap_reranker_prefers_query_terms():
+    scores = OverlapReranker().score(
+        "theorem 4.7",
+        [doc("sorting lower bounds", distance=0.1), doc("theorem 4.7 states the bound", distance=0.4)]
+    )
+    assert scores[1] > scores[0]
+
+
+def test_cross_encoder_without_package_raises(monkeypatch):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+    with pytest.raises(RerankerError):
+        CrossEncoderReranker("cross-encoder/ms-marco-MiniLM-L-6-v2").score("q", [doc("a")])
+
+
+@pytest.mark.asyncio
+async def test_chat_prompt_uses_reranked_pool(monkeypatch):
+    requested = {}
+
+    async def query(query_text, course_id, top_k=None, query_embedding=None):
+        requested["top_k"] = top_k
+        return [doc(f"chunk {i}", distance=0.2) for i in range(top_k)]
+
+    monkeypatch.setattr(settings, "RAG_RERANK_ENABLED", True)
+    monkeypatch.setattr(settings, "RAG_RERANK_CANDIDATES", 8)
+    monkeypatch.setattr(knowledge.rag_service, "query", query)
+    monkeypatch.setattr(knowledge, "rerank_stage", RerankStage(ScriptedReranker([0, 0, 0, 0, 0, 0, 0, 1]), top_n=1))
+
+    prompt, confidence, sources = await knowledge._build_rag_prompt(
+        schemas.ChatQueryRequest(query="q", course_id=1), [1.0, 0.0]
+    )
+
+    assert requested["top_k"] == 8
+    assert "chunk 7" in prompt and "chunk 0" not in prompt
+    assert sources == {"documents": [{"text": "chunk 7"}]}
+    assert confidence == pytest.approx(0.8)
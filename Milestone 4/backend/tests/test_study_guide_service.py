@@ -0,0 +1,99 @@
+"""
+Tests for study guide generation (service level, offline)
+tests/test_study_guide_service.py
+"""
+import asyncio
+import pytest
+
+from app.config import settings
+from app.services import study_guide_service as study_guide_module
+from app.services.llm_backend import LLMBackend, LLMRouter
+from app.services.study_guide_service import study_guide_service
+
+TRANSCRIPT = [{"text": f"caption {i}", "start": float(i * 10), "duration": 10.0} for i in range(12)]
+SEGMENTS = [{"start": i * 10, "end": i * 10 + 5, "priority": "high"} for i in range(12)]
+
+
+class ScriptedBackend(LLMBackend):
+    """Answers by call site; segment calls take longer for earlier segments"""
+
+    def __init__(self, fail_segments=()):
+        self.fail_segments = set(fail_segments)
+        self.in_flight = 0
+        self.peak = 0
+        self.running = set()
+        self.overlapped = False
+
+    async def generate(self, prompt, system_instruction=None, temperature=0.7):
+        raise NotImplementedError
+
+    async def call(self, call_site, prompt):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.running.add(call_site)
+        if {"study_guide.guide", "study_guide.topics"} <= self.running:
+            self.overlapped = True
+        try:
+            if call_site == "study_guide.segment":
+                index = int(prompt.split("caption ")[-1].split()[0])
+                await asyncio.sleep(0.001 * (12 - index))
+                if index in self.fail_segments:
+                    raise RuntimeError("model unavailable")
+                return f"SUMMARY:\nPart {index}.\n\nKEY POINTS:\n- point {index}"
+            await asyncio.sleep(0.01)
+            return "# Guide" if call_site == "study_guide.guide" else "Topic A\nTopic B"
+        finally:
+            self.in_flight -= 1
+            self.running.discard(call_site)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    scripted = ScriptedBackend()
+
+    class Router(LLMRouter):
+        async def generate(self, call_site, prompt, system_instruction=None, temperature=0.7, course_id=None):
+            return await scripted.call(call_site, prompt)
+
+    monkeypatch.setattr(study_guide_module, "llm_router", Router({"scripted": scripted}, default="scripted"))
+    monkeypatch.setattr(settings, "STUDY_GUIDE_SEGMENT_CONCURRENCY", 3)
+    return scripted
+
+
+async def generate():
+    return await study_guide_service.generate_study_guide("vid", TRANSCRIPT, SEGMENTS, "Lecture")
+
+
+@pytest.mark.asyncio
+async def test_segments_run_concurrently_and_keep_order(backend):
+    guide = await generate()
+
+    assert backend.peak == 3
+    assert [seg["summary"] for seg in guide["segments"]] == [f"Part {i}." for i in range(12)]
+    assert guide["content"] == "# Guide"
+    assert guide["key_topics"] == ["Topic A", "Topic B"]
+
+
+@pytest.mark.asyncio
+async def test_guide_and_topics_are_generated_together(backend):
+    await generate()
+
+    assert backend.overlapped
+
+
+@pytest.mark.asyncio
+async def test_failed_segments_are_kept_but_left_out_of_the_guide(backend):
+    backend.fail_segments = {2, 5}
+    guide = await generate()
+
+    assert len(guide["segments"]) == 12
+    assert [seg["start_time"] for seg in guide["segments"] if seg.get("error")] == [20, 50]
+    assert guide["content"] == "# Guide"
+
+
+@pytest.mark.asyncio
+async def test_all_segments_failing_fails_the_guide(backend):
+    backend.fail_segments = set(range(12))
+
+    with pytest.raises(RuntimeError, match="All 12 segment analyses failed"):
+        await generate()
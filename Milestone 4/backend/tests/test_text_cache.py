@@ -0,0 +1,81 @@
+"""
+Tests for the content-addressed extracted text store
+tests/test_text_cache.py
+"""
+import os
+import time
+import pytest
+
+from app.services.pdf_parsing_service import PDFParsingService
+from app.services.text_cache import ExtractedTextStore, hash_bytes, hash_file
+from app.services.text_extraction import Page
+from benchmarks.synthetic_pdf import build_pdf, lecture_pages
+
+
+def test_store_round_trips_pages_and_offsets(tmp_path):
+    """Pages come back with the same numbers and text"""
+    store = ExtractedTextStore(str(tmp_path), max_bytes=10 ** 6)
+    pages = [Page(1, "first page\n"), Page(3, "third page ünïcode\n")]
+
+    store.put("abc", pages)
+
+    assert store.get("abc") == pages
+    assert store.get("missing") is None
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    """Entries not read recently are evicted first once over the size limit"""
+    store = ExtractedTextStore(str(tmp_path), max_bytes=10 ** 6)
+    payload = [Page(1, os.urandom(2000).hex())]  # incompressible
+    store.put("old", payload)
+    store.put("recent", payload)
+    entry_size = os.path.getsize(tmp_path / "old.json.gz")
+
+    # Make "old" the least recently used, then read "recent"
+    past = time.time() - 100
+    os.utime(tmp_path / "old.json.gz", (past, past))
+    os.utime(tmp_path / "recent.json.gz", (past + 1, past + 1))
+    store.get("recent")
+
+    store.max_bytes = 2 * entry_size + entry_size // 2
+    store.put("new", payload)
+
+    assert store.get("old") is None
+    assert store.get("recent") == payload
+    assert store.get("new") == payload
+
+
+def test_hash_file_matches_hash_bytes(tmp_path):
+    path = tmp_path / "doc.bin"
+    path.write_bytes(b"lecture notes" * 1000)
+
+    assert hash_file(str(path)) == hash_bytes(b"lecture notes" * 1000)
+
+
+@pytest.mark.asyncio
+async def test_parsing_service_reads_from_store_after_first_parse(tmp_path):
+    """The first parse populates the store; the second never reaches the parser"""
+    pdf_path = tmp_path / "lecture.pdf"
+    pdf_path.write_bytes(build_pdf(lecture_pages(3, words_per_page=20)))
+    store = ExtractedTextStore(str(tmp_path / "cache"), max_bytes=10 ** 6)
+    service = PDFParsingService(max_workers=1, text_store=store)
+
+    parse_calls = 0
+    original_parse = service._parse_pdf
+
+    async def counting_parse(source):
+        nonlocal parse_calls
+        parse_calls += 1
+        return await original_parse(source)
+
+    service._parse_pdf = counting_parse
+    try:
+        first = await service.extract_pages(str(pdf_path), "application/pdf")
+        second = await service.extract_pages(str(pdf_path), "application/pdf")
+        prefix = await service.extract_text(str(pdf_path), "application/pdf", max_chars=30)
+    finally:
+        service.shutdown()
+
+    assert parse_calls == 1
+    assert second == first
+    assert prefix == first[0].text[:30]
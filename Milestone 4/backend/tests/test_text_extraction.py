@@ -0,0 +1,57 @@
+"""
+Tests for streaming document text extraction
+tests/test_text_extraction.py
+"""
+import pytest
+
+from app.services.text_extraction import iter_document_pages, iter_pdf_pages, join_pages, Page
+from benchmarks.synthetic_pdf import build_pdf
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "lecture.pdf"
+    path.write_bytes(build_pdf(["Intro to sorting", "", "Merge sort splits the list"]))
+    return str(path)
+
+
+def test_iter_pdf_pages_from_path_skips_empty_pages(pdf_path):
+    """Pages stream from a file path with their page numbers"""
+    pages = list(iter_pdf_pages(pdf_path))
+
+    assert [p.page_number for p in pages] == [1, 3]
+    assert "sorting" in pages[0].text
+    assert "Merge sort" in pages[1].text
+
+
+def test_iter_pdf_pages_from_bytes(pdf_path):
+    """Raw bytes give the same pages as the file path"""
+    with open(pdf_path, "rb") as f:
+        from_bytes = list(iter_pdf_pages(f.read()))
+
+    assert from_bytes == list(iter_pdf_pages(pdf_path))
+
+
+def test_iter_document_pages_plain_text():
+    """Plain text is a single page"""
+    assert list(iter_document_pages(b"hello world", "text/plain")) == [Page(1, "hello world")]
+
+
+def test_iter_document_pages_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        list(iter_document_pages(b"data", "image/png"))
+
+
+def test_join_pages_stops_pulling_at_max_chars():
+    """With max_chars, later pages are never requested"""
+    pulled = []
+
+    def pages():
+        for i in range(1, 100):
+            pulled.append(i)
+            yield Page(i, "x" * 10)
+
+    text = join_pages(pages(), max_chars=25)
+
+    assert text == ("x" * 10 + "\n") * 2 + "xxx"
+    assert pulled == [1, 2, 3]
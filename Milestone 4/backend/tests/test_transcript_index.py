@@ -0,0 +1,73 @@
+"""
+Tests for the transcript time-range index
+tests/test_transcript_index.py
+"""
+import random
+
+from app.services import transcript_index
+from app.services.transcript_index import TranscriptIndex
+from app.services.youtube_service import youtube_service
+
+
+def linear_scan(transcript, start, end):
+    """The original O(n) overlap scan"""
+    return [e for e in transcript if e['start'] + e['duration'] >= start and e['start'] <= end]
+
+
+def random_transcript(count, seed=0):
+    """Captions with gaps and overlaps, like auto-generated ones"""
+    rng = random.Random(seed)
+    entries, t = [], 0.0
+    for i in range(count):
+        t += rng.uniform(0.0, 4.0)
+        entries.append({"text": f"c{i}", "start": round(t, 2), "duration": round(rng.uniform(0.5, 9.0), 2)})
+    return entries
+
+
+def random_ranges(transcript, count, seed=1):
+    rng = random.Random(seed)
+    last = transcript[-1]['start'] + 10
+    ranges = []
+    for _ in range(count):
+        start = rng.uniform(-5, last)
+        ranges.append((start, start + rng.uniform(0, 120)))
+    return ranges
+
+
+def test_lookup_matches_linear_scan():
+    transcript = random_transcript(400)
+    index = TranscriptIndex(transcript)
+
+    for start, end in random_ranges(transcript, 200):
+        assert index.entries_between(start, end) == linear_scan(transcript, start, end)
+
+
+def test_long_caption_spanning_later_entries_is_found():
+    transcript = [
+        {"text": "intro music", "start": 0.0, "duration": 100.0},
+        {"text": "hello", "start": 5.0, "duration": 2.0},
+        {"text": "welcome", "start": 50.0, "duration": 2.0},
+    ]
+
+    assert TranscriptIndex(transcript).text_between(60, 70) == "intro music"
+    assert youtube_service.extract_segment_transcript(transcript, 4, 6) == "intro music hello"
+
+
+def test_batch_lookup_uses_numpy_for_long_transcripts(monkeypatch):
+    transcript = random_transcript(300, seed=3)
+    ranges = random_ranges(transcript, 50, seed=4)
+    expected = [' '.join(e['text'] for e in linear_scan(transcript, s, e)) for s, e in ranges]
+
+    assert TranscriptIndex(transcript).texts_between(ranges) == expected
+    monkeypatch.setattr(transcript_index, "NUMPY_MIN_ENTRIES", 1)
+    assert TranscriptIndex(transcript).texts_between(ranges) == expected
+
+
+def test_unsorted_input_and_empty_transcript():
+    transcript = [
+        {"text": "b", "start": 10.0, "duration": 2.0},
+        {"text": "a", "start": 0.0, "duration": 2.0},
+    ]
+
+    assert TranscriptIndex(transcript).text_between(0, 20) == "a b"
+    assert TranscriptIndex([]).texts_between([(0, 10)]) == [""]
@@ -0,0 +1,128 @@
+"""
+Tests for the YouTube lookup cache
+tests/test_youtube_cache.py
+"""
+import threading
+import time
+import pytest
+
+from app.services import youtube_service as youtube_module
+from app.services.youtube_cache import SingleFlight, YouTubeCache
+from app.services.youtube_service import YouTubeService
+
+TTLS = {"metadata": 100.0, "captions": 10.0, "transcript": 100.0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_per_kind():
+    clock = FakeClock()
+    cache = YouTubeCache(TTLS, clock=clock)
+    cache.put("captions", "vid", False)
+    cache.put("metadata", "vid", {"title": "Sorting"})
+
+    clock.now += 11
+    assert cache.get("captions", "vid") is None
+    assert cache.get("metadata", "vid") == {"title": "Sorting"}
+
+
+def test_cache_survives_restart(tmp_path):
+    path = str(tmp_path / "youtube.db")
+    first = YouTubeCache(TTLS, db_path=path)
+    first.put("transcript", "vid:en", [{"text": "hi", "start": 0.0, "duration": 1.0}])
+    first.close()
+
+    second = YouTubeCache(TTLS, db_path=path)
+    assert second.get_or_fetch("transcript", "vid:en", lambda: pytest.fail("refetched")) == [
+        {"text": "hi", "start": 0.0, "duration": 1.0}
+    ]
+    second.close()
+
+
+def test_single_flight_shares_one_fetch_between_threads():
+    cache = YouTubeCache(TTLS)
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return {"title": "Graphs"}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch("metadata", "vid", fetch)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.flight.shared < 7:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [{"title": "Graphs"}] * 8
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(1)
+        raise ConnectionError("offline")
+
+    def call():
+        try:
+            flight.do("vid", failing)
+        except ConnectionError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flight.shared < 1:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert flight.do("vid", lambda: "online") == "online"
+
+
+def test_service_fetches_each_video_once(monkeypatch):
+    calls = {"transcript": 0, "list": 0}
+
+    class FakeApi:
+        @staticmethod
+        def get_transcript(video_id, languages):
+            calls["transcript"] += 1
+            return [{"text": "hello", "start": 0.0, "duration": 2.0}]
+
+        @staticmethod
+        def list_transcripts(video_id):
+            calls["list"] += 1
+            return ["en"]
+
+    monkeypatch.setattr(youtube_module, "YouTubeTranscriptApi", FakeApi)
+    service = YouTubeService(cache=YouTubeCache(TTLS))
+
+    for _ in range(3):
+        assert service.get_transcript("vid")[0]["text"] == "hello"
+    # A fetched transcript proves captions exist
+    assert service.check_captions_available("vid") is True
+    assert calls == {"transcript": 1, "list": 0}
+    assert service.cache.stats()["hits"] == 3